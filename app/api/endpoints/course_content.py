@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
 from app.core.auth import get_current_user
 from app.core.rate_limit import check_rate_limit
+from app.core.responses import PrerenderedJSONResponse
 from app.schemas.course_content import (
     CourseContent,
+    CourseOutline,
+    LessonContentResponse,
     CompleteLessonRequest,
     CompleteLessonResponse,
     ValidatePracticeRequest,
     ValidatePracticeResponse,
-    CourseProgress
+    CourseProgress,
+    ProgressSyncRequest,
+    ProgressSyncResponse,
+    PracticeAttemptsResponse,
+    CourseCertificateResponse
 )
 from app.services.course_content_service import CourseContentService
+from app.services.touch_buffer import touch_buffer
 import logging
 from uuid import UUID
 
@@ -42,8 +51,10 @@ async def get_course_content(
         # Check rate limit
         await check_rate_limit(request)
         
-        # Get course content
-        return await content_service.get_course_content(course_id, current_user.id)
+        # Get course content (already validated by the service, skip response_model re-validation)
+        content = await content_service.get_course_content(course_id, current_user.id)
+        touch_buffer.touch(current_user.id, course_id)
+        return PrerenderedJSONResponse.from_models(content, CourseContent)
         
     except Exception as e:
         raise HTTPException(
@@ -51,6 +62,82 @@ async def get_course_content(
             detail=f"An error occurred while getting course content: {str(e)}"
         )
 
+@router.get(
+    "/courses/{course_id}/outline",
+    response_model=CourseOutline,
+    summary="Get course outline",
+    description="Get modules and lessons of a course with completion flags, without lesson content. Requires authentication.",
+    tags=["Course Content"]
+)
+async def get_course_outline(
+    request: Request,
+    course_id: UUID,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the course outline for the current user.
+    
+    Args:
+        course_id: UUID of the course
+        
+    Returns:
+        CourseOutline: Modules, lesson titles, block counts and completed lessons
+    """
+    await check_rate_limit(request)
+    outline = await content_service.get_course_outline(course_id, current_user.id)
+    touch_buffer.touch(current_user.id, course_id)
+    return PrerenderedJSONResponse.from_models(outline, CourseOutline)
+
+def _lesson_etag(lesson_id: UUID, content_version: int) -> str:
+    # Weak: the identity, gzip and br bodies share it
+    return f'W/"{lesson_id}.{content_version}"'
+
+@router.get(
+    "/courses/{course_id}/lessons/{lesson_id}/content",
+    response_model=LessonContentResponse,
+    summary="Get lesson content",
+    description="Get one lesson with its content blocks. Supports If-None-Match. Requires authentication.",
+    tags=["Course Content"]
+)
+async def get_lesson_content(
+    request: Request,
+    course_id: UUID,
+    lesson_id: UUID,
+    if_none_match: Optional[str] = Header(None),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get one lesson's content.
+    
+    The ETag changes whenever the course content is edited; a matching
+    If-None-Match gets 304 without the lesson being loaded. The Link
+    header names the next lesson for the client to prefetch.
+    
+    Args:
+        course_id: UUID of the course
+        lesson_id: UUID of the lesson
+        
+    Returns:
+        LessonContentResponse: The lesson with its content blocks
+    """
+    await check_rate_limit(request)
+    content_version, placement = await content_service.get_lesson_version(course_id, lesson_id)
+    touch_buffer.touch(current_user.id, course_id)
+    headers = {
+        "ETag": _lesson_etag(lesson_id, content_version),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if placement["next_lesson_id"]:
+        headers["Link"] = f'</api/courses/{course_id}/lessons/{placement["next_lesson_id"]}/content>; rel="prefetch"'
+
+    # If-None-Match uses the weak comparison
+    if if_none_match and {headers["ETag"].removeprefix("W/"), "*"} & {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    snapshot = await content_service.get_lesson_snapshot(lesson_id, content_version, placement)
+    return await snapshot.to_response(request, headers)
+
 @router.post(
     "/courses/{course_id}/lessons/{lesson_id}/complete",
     response_model=CompleteLessonResponse,
@@ -138,6 +225,68 @@ async def validate_practice(
             detail=f"An error occurred while validating practice: {str(e)}"
         )
 
+@router.get(
+    "/courses/{course_id}/lessons/{lesson_id}/practice/{practice_id}/attempts",
+    response_model=PracticeAttemptsResponse,
+    summary="Get practice attempts",
+    description="Get the current user's latest attempts at a practice. Requires authentication.",
+    tags=["Course Content"]
+)
+async def get_practice_attempts(
+    request: Request,
+    course_id: UUID,
+    lesson_id: UUID,
+    practice_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the current user's attempts at a practice.
+    
+    Args:
+        course_id: UUID of the course
+        lesson_id: UUID of the lesson
+        practice_id: UUID of the practice
+        limit: Number of recent attempts to return
+        
+    Returns:
+        PracticeAttemptsResponse: Recent attempts (newest first) and the rollup of expired ones
+    """
+    try:
+        # Check rate limit
+        await check_rate_limit(request)
+        
+        # Get attempts
+        return await content_service.get_practice_attempts(practice_id, current_user.id, limit)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while getting practice attempts: {str(e)}"
+        )
+
+@router.get(
+    "/courses/{course_id}/certificate",
+    response_model=CourseCertificateResponse,
+    summary="Get course certificate",
+    description="Get the current user's certificate for a completed course. Requires authentication.",
+    tags=["Course Content"]
+)
+async def get_course_certificate(
+    course_id: UUID,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the current user's certificate for a course.
+    
+    Args:
+        course_id: UUID of the course
+        
+    Returns:
+        CourseCertificateResponse: The certificate and its download URL
+    """
+    return await content_service.get_certificate(course_id, current_user.id)
+
 @router.get(
     "/courses/{course_id}/progress",
     response_model=CourseProgress,
@@ -170,4 +319,40 @@ async def get_course_progress(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while getting course progress: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post(
+    "/progress/sync",
+    response_model=ProgressSyncResponse,
+    summary="Sync offline progress",
+    description="Apply a batch of lesson completions and practice answers recorded offline. Requires authentication.",
+    tags=["Course Content"]
+)
+async def sync_progress(
+    request: Request,
+    sync_request: ProgressSyncRequest,
+    current_user = Depends(get_current_user)
+):
+    """
+    Apply a batch of progress events for the current user.
+    
+    Args:
+        sync_request: ProgressSyncRequest with up to 500 events, possibly across courses
+        
+    Returns:
+        ProgressSyncResponse: Applied/duplicate/rejected counts and progress of every touched course
+    """
+    try:
+        # Check rate limit
+        await check_rate_limit(request)
+        
+        # Sync progress
+        return await content_service.sync_progress(current_user.id, sync_request)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while syncing progress: {str(e)}"
+        )
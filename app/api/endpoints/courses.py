@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from app.core.auth import get_current_admin_user, get_current_user
 from app.core.rate_limit import check_rate_limit
-from app.schemas.course import CourseCreate, CourseResponse
+from app.schemas.course import CourseCreate, CourseResponse, ContentUpdateResponse, LessonUpdate, ModuleUpdate
+from app.schemas.course_content import BlockReorderRequest, BlockReorderResponse, ContentBlockUpdate
+from app.schemas.enrollment import EnrollmentResponse
 from app.services.course_service import CourseService
+from app.services.enrollment_service import enrollment_service
 import logging
 from typing import List
+from uuid import UUID
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -25,9 +29,9 @@ async def get_courses(
         # Check rate limit
         await check_rate_limit(request)
         
-        # Get all courses
-        courses = await course_service.get_all_courses()
-        return courses
+        # Get all courses from the rendered snapshot (pre-compressed for the client's encoding)
+        snapshot = await course_service.get_courses_snapshot()
+        return await snapshot.to_response(request)
         
     except Exception as e:
         raise HTTPException(
@@ -78,4 +82,116 @@ async def create_course(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while creating the course: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+def _require_admin(current_user) -> None:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can edit course content"
+        )
+
+@router.patch(
+    "/courses/{course_id}/modules/{module_id}",
+    response_model=ContentUpdateResponse,
+    summary="Update a module",
+    description="Partially update a module; only the fields sent are changed. Requires admin privileges.",
+    tags=["Courses"]
+)
+async def update_module(
+    request: Request,
+    course_id: UUID,
+    module_id: UUID,
+    update: ModuleUpdate,
+    current_user = Depends(get_current_user)
+) -> ContentUpdateResponse:
+    await check_rate_limit(request)
+    _require_admin(current_user)
+    return await course_service.update_module(course_id, module_id, update)
+
+@router.patch(
+    "/courses/{course_id}/lessons/{lesson_id}",
+    response_model=ContentUpdateResponse,
+    summary="Update a lesson",
+    description="Partially update a lesson; only the fields sent are changed. Requires admin privileges.",
+    tags=["Courses"]
+)
+async def update_lesson(
+    request: Request,
+    course_id: UUID,
+    lesson_id: UUID,
+    update: LessonUpdate,
+    current_user = Depends(get_current_user)
+) -> ContentUpdateResponse:
+    await check_rate_limit(request)
+    _require_admin(current_user)
+    return await course_service.update_lesson(course_id, lesson_id, update)
+
+@router.patch(
+    "/courses/{course_id}/lessons/{lesson_id}/blocks/{block_id}",
+    response_model=ContentUpdateResponse,
+    summary="Update a content block",
+    description="Partially update a content block; only the fields sent are changed. Requires admin privileges.",
+    tags=["Courses"]
+)
+async def update_block(
+    request: Request,
+    course_id: UUID,
+    lesson_id: UUID,
+    block_id: UUID,
+    update: ContentBlockUpdate,
+    current_user = Depends(get_current_user)
+) -> ContentUpdateResponse:
+    await check_rate_limit(request)
+    _require_admin(current_user)
+    return await course_service.update_block(course_id, lesson_id, block_id, update)
+
+@router.put(
+    "/courses/{course_id}/lessons/{lesson_id}/blocks/order",
+    response_model=BlockReorderResponse,
+    summary="Reorder content blocks",
+    description="Set the order of a lesson's content blocks; only blocks that move are written. Requires admin privileges.",
+    tags=["Courses"]
+)
+async def reorder_blocks(
+    request: Request,
+    course_id: UUID,
+    lesson_id: UUID,
+    reorder: BlockReorderRequest,
+    current_user = Depends(get_current_user)
+) -> BlockReorderResponse:
+    await check_rate_limit(request)
+    _require_admin(current_user)
+    return await course_service.reorder_blocks(course_id, lesson_id, reorder.block_ids)
+
+@router.post(
+    "/courses/{course_id}/enroll",
+    response_model=EnrollmentResponse,
+    summary="Enroll in a course",
+    description="Enroll the current user in a course. Idempotent: 201 when enrolled now, 200 when already enrolled. Requires authentication.",
+    tags=["Courses"]
+)
+async def enroll(
+    request: Request,
+    response: Response,
+    course_id: UUID,
+    current_user = Depends(get_current_user)
+) -> EnrollmentResponse:
+    await check_rate_limit(request)
+    result = await enrollment_service.enroll(current_user.id, course_id)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    enrollment, created = result
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    return EnrollmentResponse(
+        id=enrollment.id,
+        user_id=enrollment.user_id,
+        course_id=enrollment.course_id,
+        status=enrollment.status,
+        progress=enrollment.progress,
+        started_at=enrollment.started_at,
+        created=created
+    )
@@ -0,0 +1,279 @@
+import asyncio
+import gzip
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # Brotli is optional, gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Content types worth compressing (prefix match, parameters ignored)
+DEFAULT_COMPRESSIBLE_TYPES: Tuple[str, ...] = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+    "text/",
+)
+
+# Never buffer or compress these, they must reach the client immediately
+NEVER_COMPRESS_TYPES: Tuple[str, ...] = ("text/event-stream",)
+
+def available_encodings() -> List[str]:
+    """Encodings supported by this process, in order of preference"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def negotiate_encoding(accept_encoding: Optional[str], supported: Iterable[str]) -> Optional[str]:
+    """
+    Pick the best content coding for an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        supported: Encodings we can produce, in order of preference
+
+    Returns:
+        str: Chosen encoding, or None if the response should stay uncompressed
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def is_compressible(content_type: Optional[str], compressible_types: Iterable[str]) -> bool:
+    """Check a Content-Type against the compressible allow-list"""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type.startswith(NEVER_COMPRESS_TYPES):
+        return False
+    return media_type.startswith(tuple(compressible_types))
+
+class _Compressor:
+    """Incremental compressor with a uniform interface for gzip and brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 produces a gzip container
+            self._impl = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._impl.process(data)
+        return self._impl.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._impl.finish()
+        return self._impl.flush()
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 9, brotli_quality: int = 11) -> bytes:
+    """Compress a complete body in one shot"""
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+class CompressionMiddleware:
+    """
+    gzip/brotli response compression.
+
+    - negotiates the encoding from Accept-Encoding (brotli preferred when installed)
+    - leaves small bodies (< minimum_size) and non-text content types alone
+    - passes through responses that already carry Content-Encoding, so
+      pre-compressed snapshot bodies are served as-is
+    - compresses streaming bodies chunk by chunk
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = tuple(compressible_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding"),
+            available_encodings()
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """Per-request state for CompressionMiddleware"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the start message until we know whether the body gets compressed
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or not is_compressible(
+                headers.get("content-type"), self.middleware.compressible_types
+            ):
+                self.passthrough = True
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        if self.passthrough:
+            await self._flush_start()
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Too small to be worth it
+                self.passthrough = True
+                await self._flush_start()
+                await self.downstream(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding,
+                self.middleware.gzip_level,
+                self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self._flush_start()
+                await self.downstream({"type": "http.response.body", "body": compressed})
+                return
+
+            await self._flush_start()
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self.downstream(self.start_message)
+            self.start_message = None
+
+class CompressedSnapshot:
+    """
+    A response body rendered once and compressed once per encoding.
+
+    Useful for cached payloads that are served many times: the expensive
+    high-quality compression runs on first use of each encoding (in a
+    worker thread, so the event loop keeps serving; concurrent first
+    requests share one run) and every later request gets the stored bytes
+    with Content-Encoding set, which CompressionMiddleware passes through
+    untouched.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str = "application/json",
+        minimum_size: int = 1024,
+        gzip_level: int = 9,
+        brotli_quality: int = 11
+    ) -> None:
+        self.body = body
+        self.media_type = media_type
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.created_at = time.monotonic()
+        self._encoded: Dict[str, bytes] = {}
+        self._compressing: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    async def encoded(self, encoding: str) -> bytes:
+        """Get (compressing on first use, off the event loop) the body for an encoding"""
+        if encoding in self._encoded:
+            return self._encoded[encoding]
+        future = self._compressing.get(encoding)
+        if future is None:
+            future = self._compressing[encoding] = asyncio.ensure_future(asyncio.to_thread(
+                compress_bytes, self.body, encoding, self.gzip_level, self.brotli_quality
+            ))
+        try:
+            data = await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._compressing.pop(encoding, None)
+        self._encoded[encoding] = data
+        return data
+
+    def age(self) -> float:
+        """Seconds since the snapshot was rendered"""
+        return time.monotonic() - self.created_at
+
+    async def to_response(self, request: Request, headers: Optional[dict] = None) -> Response:
+        """Build a response using the best encoding the client accepts"""
+        response_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+        encoding = None
+        if len(self.body) >= self.minimum_size:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"), available_encodings())
+
+        if encoding is None:
+            return Response(self.body, media_type=self.media_type, headers=response_headers)
+
+        response_headers["Content-Encoding"] = encoding
+        return Response(await self.encoded(encoding), media_type=self.media_type, headers=response_headers)
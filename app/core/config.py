@@ -17,6 +17,90 @@ class Settings(BaseSettings):
     # Telegram settings
     TELEGRAM_BOT_TOKEN: Optional[str] = None
     TELEGRAM_BOT_USERNAME: Optional[str] = None
+    TELEGRAM_CHAT_ID_CACHE_SIZE: int = 50000  # resolved @username -> chat id entries kept in memory
+    
+    # Telegram Bot API HTTP client (one pool shared by all sends, opened and closed with the app)
+    TELEGRAM_API_BASE_URL: str = "https://api.telegram.org/bot"
+    TELEGRAM_POOL_SIZE: int = 32  # max connections (HTTP/1.1) kept open to the Bot API
+    TELEGRAM_KEEPALIVE_EXPIRY: float = 60.0  # seconds an idle connection stays open
+    TELEGRAM_HTTP2: bool = True  # used when the h2 package is installed
+    TELEGRAM_CONNECT_TIMEOUT: float = 5.0
+    TELEGRAM_READ_TIMEOUT: float = 10.0
+    TELEGRAM_WRITE_TIMEOUT: float = 10.0
+    TELEGRAM_POOL_TIMEOUT: float = 5.0  # waiting for a free connection during bursts
+    
+    # Telegram webhook (inbound updates); the endpoint is disabled while no secret is set
+    TELEGRAM_WEBHOOK_SECRET: Optional[str] = None  # X-Telegram-Bot-Api-Secret-Token
+    TELEGRAM_WEBHOOK_URL: Optional[str] = None  # public URL of /api/telegram/webhook
+    TELEGRAM_UPDATE_QUEUE_SIZE: int = 1000  # updates waiting for a worker; beyond it Telegram gets 503 and retries
+    TELEGRAM_UPDATE_WORKERS: int = 4
+    TELEGRAM_BOT_CACHE_TTL_SECONDS: int = 30  # /today and /progress answers
+    
+    # Telegram broadcasts (bots may send ~30 messages/second in total)
+    TELEGRAM_BROADCAST_RATE: float = 25.0  # messages per second
+    TELEGRAM_BROADCAST_CONCURRENCY: int = 10  # sends in flight
+    TELEGRAM_BROADCAST_CHUNK_SIZE: int = 500  # recipients loaded from the DB at a time
+    TELEGRAM_BROADCAST_STALE_SECONDS: int = 120  # running job without heartbeat -> resumable
+    
+    # Practice attempts (monthly partitions on PostgreSQL)
+    PRACTICE_ATTEMPT_RETENTION_DAYS: int = 180  # older whole months are rolled up into per-practice summaries
+    PRACTICE_ATTEMPT_PARTITIONS_AHEAD: int = 2  # future monthly partitions created at startup
+    
+    # Certificates
+    CERTIFICATE_RENDER_WORKERS: int = 2  # processes rendering PDFs off the event loop
+    CERTIFICATE_ISSUE_CONCURRENCY: int = 4  # certificates issued at once (queue workers, bulk re-issue)
+    CERTIFICATE_QUEUE_SIZE: int = 1000
+    
+    # Local object storage (served under OBJECT_STORE_BASE_URL)
+    OBJECT_STORE_ROOT: str = "storage"
+    OBJECT_STORE_BASE_URL: str = "/files"  # set to an absolute URL so links in Telegram messages work
+    
+    # Response compression settings
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes, smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # on-the-fly compression, keep it cheap
+    
+    # Cached course list snapshot (rendered and pre-compressed once)
+    COURSE_SNAPSHOT_TTL_SECONDS: int = 60
+    COURSE_TREE_JSON_AGG: bool = True  # on PostgreSQL, build course trees in one json_agg query
+    
+    # Process-wide cache of Course, Lesson and ContentBlock rows (evicted on save/delete)
+    ENTITY_CACHE_SIZE: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: int = 300
+    ENTITY_CACHE_NEGATIVE_TTL_SECONDS: int = 30  # ids that were not found
+    
+    # Cache invalidation between uvicorn workers
+    CACHE_INVALIDATION_TRANSPORT: str = "auto"  # postgres (LISTEN/NOTIFY), loopback (this process only), auto, none
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_QUEUE_SIZE: int = 10000  # events waiting to be sent; on overflow workers drop all cached entries
+    
+    # Enrollments
+    BULK_ENROLL_CHUNK_SIZE: int = 1000  # users enrolled per INSERT (one progress line streamed per chunk)
+    BULK_ENROLL_MAX_USERS: int = 100000  # per request
+    
+    # Bulk user updates (admin)
+    BULK_USER_UPDATE_MAX_IDS: int = 10000  # explicit user IDs per request; use a filter for larger cohorts
+    BULK_USER_UPDATE_EVICT_MAX: int = 1000  # updates touching more users drop all cached principals instead
+    
+    # Admin exports (streamed, keyset-paginated)
+    EXPORT_CHUNK_SIZE: int = 5000  # rows per query; each chunk is its own short statement
+    EXPORT_GZIP_LEVEL: int = 6  # for ?gzip=true downloads
+    
+    # Course access touches (last_accessed_at), written behind in batches
+    TOUCH_FLUSH_INTERVAL_SECONDS: float = 5.0
+    TOUCH_BUFFER_MAX_ENTRIES: int = 50000  # (user, course) pairs held in memory; more are dropped until the next flush
+    
+    # Course outlines and per-lesson content (cached per content version, so edits never serve stale data)
+    COURSE_OUTLINE_CACHE_SIZE: int = 1000  # courses
+    LESSON_CONTENT_CACHE_SIZE: int = 5000  # rendered lessons
+    COURSE_CONTENT_CACHE_TTL_SECONDS: int = 600
+    
+    # Performance instrumentation
+    METRICS_ENABLED: bool = True  # exposes /metrics in the Prometheus text format
+    METRICS_LOG_SAMPLE_RATE: float = 0.01  # share of requests logged as structured JSON
+    SLOW_REQUEST_SECONDS: float = 1.0  # slower requests are always logged
+    N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request -> warning
+    DEBUG_QUERY_HEADERS: bool = False  # X-DB-Queries / X-Identity-Map-Saved response headers
     
     class Config:
         env_file = ".env"
@@ -41,6 +125,7 @@ TORTOISE_ORM = {
                 "app.models.event",
                 "app.models.task",
                 "app.models.calendar",
+                "app.models.broadcast",
                 "aerich.models"
             ],
             "default_connection": "default",
@@ -0,0 +1,128 @@
+from collections import Counter
+from typing import Any, Dict, Optional, Set, Type, TypeVar
+
+from functools import partial
+
+from tortoise.models import Model
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import registry
+
+M = TypeVar("M", bound=Model)
+
+ENTITY_CACHE_LOOKUPS = registry.counter(
+    "entity_cache_lookups_total",
+    "Entity cache lookups by model and result (hit, miss, negative_hit)",
+    ["model", "result"]
+)
+ENTITY_CACHE_INVALIDATIONS = registry.counter(
+    "entity_cache_invalidations_total",
+    "Entity cache entries dropped because the row changed",
+    ["model"]
+)
+
+_NOT_FOUND = object()
+
+class EntityCache:
+    """
+    Process-wide read-through cache of rarely changing rows, by (model, pk).
+
+    Registered models are evicted on save and delete through Tortoise
+    signals, in every worker (see ``app.core.invalidation``). Queryset
+    ``update()``/``delete()`` and bulk operations send no signals, so code
+    using them calls ``invalidate()`` itself. Ids that
+    do not exist are cached for ``negative_ttl`` seconds. Cached instances
+    are shared between requests: treat them as read-only, and query
+    directly when a row must be fresh inside a transaction.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.ENTITY_CACHE_SIZE,
+        ttl: float = settings.ENTITY_CACHE_TTL_SECONDS,
+        negative_ttl: float = settings.ENTITY_CACHE_NEGATIVE_TTL_SECONDS
+    ):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self._models: Set[type] = set()
+        self._counts: Counter = Counter()
+
+    def register(self, *models: Type[Model]) -> None:
+        """Cache these models and evict their entries whenever an instance is saved or deleted"""
+        for model in models:
+            if model in self._models:
+                continue
+            self._models.add(model)
+            invalidation_bus.track(model)
+            invalidation_bus.subscribe(model.__name__, partial(self._evict, model.__name__))
+
+    def caches(self, model: type) -> bool:
+        return model in self._models
+
+    @staticmethod
+    def _key(model: type, pk: Any) -> tuple:
+        return (model.__name__, str(pk))
+
+    async def get(self, model: Type[M], pk: Any) -> Optional[M]:
+        """``model.get_or_none(pk=pk)``, served from the cache when possible"""
+        if model not in self._models:
+            return await model.get_or_none(pk=pk)
+
+        key = self._key(model, pk)
+        cached = self._cache.get(key, None)
+        if cached is not None:
+            result = "negative_hit" if cached is _NOT_FOUND else "hit"
+            self._count(model, result)
+            return None if cached is _NOT_FOUND else cached
+
+        async def load() -> Any:
+            instance = await model.get_or_none(pk=pk)
+            return _NOT_FOUND if instance is None else instance
+
+        self._count(model, "miss")
+        generation = self._cache.generation
+        value = await self._cache.get_or_load(key, load)
+        if value is _NOT_FOUND:
+            # Not if the row was saved while it was being looked up
+            if self._cache.generation == generation:
+                self._cache.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+            return None
+        return value
+
+    def invalidate(self, model: type, pk: Any) -> None:
+        """Evict a row in this worker and the others"""
+        invalidation_bus.publish(model.__name__, pk)
+
+    def _evict(self, model_name: str, pk: Optional[str]) -> None:
+        if pk is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate((model_name, pk))
+        self._counts[(model_name, "invalidation")] += 1
+        ENTITY_CACHE_INVALIDATIONS.inc(model=model_name)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _count(self, model: type, result: str) -> None:
+        self._counts[(model.__name__, result)] += 1
+        ENTITY_CACHE_LOOKUPS.inc(model=model.__name__, result=result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and per-model hit/miss/negative_hit/invalidation counts"""
+        per_model: Dict[str, Dict[str, int]] = {}
+        for (model, result), count in self._counts.items():
+            per_model.setdefault(model, {})[result] = count
+        return {"size": len(self._cache), "models": per_model}
+
+def _register_reference_models(cache: EntityCache) -> None:
+    from app.models.course import Course, Lesson
+    from app.models.course_content import ContentBlock
+
+    cache.register(Course, Lesson, ContentBlock)
+
+# Create a global instance
+entity_cache = EntityCache()
+_register_reference_models(entity_cache)
@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+from typing import Any, Dict, Hashable, Optional, Tuple, Type, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from tortoise.models import Model
+
+from app.core.entity_cache import entity_cache
+from app.core.instrumentation import current_query_stats
+
+M = TypeVar("M", bound=Model)
+
+class IdentityMap:
+    """
+    Entities loaded during one request, by (model, primary key).
+
+    The first lookup of a key queries the database; later lookups of the
+    same key (from the auth dependency, the service, ...) get the same
+    instance back. Concurrent lookups of one key share a single query.
+    Not-found results are remembered too. Models held in the process-wide
+    entity cache (courses, lessons, content blocks) are loaded through it.
+    """
+
+    def __init__(self):
+        self._entities: Dict[Tuple[type, Hashable], "asyncio.Future[Optional[Model]]"] = {}
+        self.loaded = 0
+        self.saved = 0  # lookups answered without a query
+
+    async def get(self, model: Type[M], pk: Any) -> Optional[M]:
+        key = (model, str(pk))
+        future = self._entities.get(key)
+        if future is not None:
+            self.saved += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._entities[key] = future
+        self.loaded += 1
+        try:
+            instance = await entity_cache.get(model, pk)
+        except BaseException as e:
+            # Do not cache failures; let the next lookup retry
+            del self._entities[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        future.set_result(instance)
+        return instance
+
+    def add(self, instance: Model) -> None:
+        """Register an instance loaded (or created) elsewhere"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(instance)
+        self._entities[(type(instance), str(instance.pk))] = future
+
+    def discard(self, model: type, pk: Any) -> None:
+        self._entities.pop((model, str(pk)), None)
+
+_current_map: contextvars.ContextVar[Optional[IdentityMap]] = contextvars.ContextVar("identity_map", default=None)
+
+def current_identity_map() -> Optional[IdentityMap]:
+    return _current_map.get()
+
+async def get_entity(model: Type[M], pk: Any) -> Optional[M]:
+    """
+    ``model.get_or_none(pk=pk)`` through the request's identity map.
+
+    Outside a request (scripts, background workers) this is a plain query.
+    Use it for reads only: callers get a shared instance, so code that
+    needs a fresh row inside a transaction should query directly.
+    """
+    identity_map = _current_map.get()
+    if identity_map is None:
+        return await entity_cache.get(model, pk)
+    return await identity_map.get(model, pk)
+
+async def get_entities(*lookups: Tuple[Type[Model], Any]) -> list:
+    """
+    Several ``get_entity()`` lookups run concurrently.
+
+    Example:
+        user, course = await get_entities((User, user_id), (Course, course_id))
+    """
+    return list(await asyncio.gather(*(get_entity(model, pk) for model, pk in lookups)))
+
+def remember(instance: Model) -> None:
+    """Add an instance to the request's identity map, if there is one"""
+    identity_map = _current_map.get()
+    if identity_map is not None:
+        identity_map.add(instance)
+
+class IdentityMapMiddleware:
+    """
+    Give every HTTP request its own IdentityMap.
+
+    With ``debug_headers`` the response carries ``X-DB-Queries`` (statements
+    issued so far, when query instrumentation is on) and
+    ``X-Identity-Map-Saved`` (entity lookups served without a query).
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        identity_map = IdentityMap()
+        token = _current_map.set(identity_map)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-Identity-Map-Saved"] = str(identity_map.saved)
+                stats = current_query_stats()
+                if stats is not None:
+                    headers["X-DB-Queries"] = str(stats.query_count)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper if self.debug_headers else send)
+        finally:
+            _current_map.reset(token)
@@ -0,0 +1,234 @@
+import contextvars
+import functools
+import importlib
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter as StatementCounter
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.core.metrics import DEFAULT_COUNT_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+# Client methods that hit the database
+INSTRUMENTED_METHODS = (
+    "execute_query",
+    "execute_query_dict",
+    "execute_insert",
+    "execute_many",
+    "execute_script",
+)
+
+# Backends whose client classes should be instrumented (missing drivers are skipped)
+BACKEND_MODULES = (
+    "tortoise.backends.sqlite.client",
+    "tortoise.backends.asyncpg.client",
+    "tortoise.backends.psycopg.client",
+)
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"]
+)
+REQUESTS_TOTAL = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"]
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "Database queries issued per request",
+    ["method", "route"],
+    buckets=DEFAULT_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_time_seconds",
+    "Time spent in the database per request",
+    ["method", "route"]
+)
+N_PLUS_ONE_TOTAL = registry.counter(
+    "db_n_plus_one_suspected_total",
+    "Requests that repeated the same statement above the N+1 threshold",
+    ["method", "route"]
+)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:\?|\$\d+|%s)\s*,?)+\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_sql(query: str) -> str:
+    """
+    Reduce a statement to its shape so repeated executions group together.
+
+    Literals become ``?`` and placeholder lists such as ``IN (?,?,?)``
+    collapse to ``(...)``.
+    """
+    query = _LITERAL_RE.sub("?", query)
+    query = _PLACEHOLDER_LIST_RE.sub("(...)", query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+@dataclass
+class QueryStats:
+    """Database activity collected while a request (or a capture block) runs"""
+    query_count: int = 0
+    db_time: float = 0.0
+    statements: List[str] = field(default_factory=list)
+
+    def record(self, query: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        self.statements.append(query)
+
+    def repeated_statements(self, threshold: int) -> List[tuple]:
+        """Normalized statements executed at least ``threshold`` times, most frequent first"""
+        counts = StatementCounter(normalize_sql(q) for q in self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+# Stack of active collectors for the current task; every active one records each query
+_active_stats: contextvars.ContextVar[tuple] = contextvars.ContextVar("active_query_stats", default=())
+# Guards against counting a client method that delegates to another instrumented one
+_inside_query: contextvars.ContextVar[bool] = contextvars.ContextVar("inside_db_query", default=False)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the innermost active collector, if any"""
+    active = _active_stats.get()
+    return active[-1] if active else None
+
+def push_query_stats(stats: QueryStats) -> contextvars.Token:
+    """Start recording queries into ``stats`` (in addition to outer collectors)"""
+    return _active_stats.set(_active_stats.get() + (stats,))
+
+def pop_query_stats(token: contextvars.Token) -> None:
+    _active_stats.reset(token)
+
+def _wrap_client_method(method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(self, query, *args, **kwargs):
+        active = _active_stats.get()
+        if not active or _inside_query.get():
+            return await method(self, query, *args, **kwargs)
+
+        token = _inside_query.set(True)
+        started = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _inside_query.reset(token)
+            for stats in active:
+                stats.record(str(query), elapsed)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+def _all_subclasses(cls: type) -> List[type]:
+    result = []
+    for subclass in cls.__subclasses__():
+        result.append(subclass)
+        result.extend(_all_subclasses(subclass))
+    return result
+
+def instrument_tortoise() -> None:
+    """
+    Patch Tortoise database clients so every executed statement is counted
+    and timed against the active QueryStats collectors.
+
+    Safe to call more than once; already wrapped methods are left alone.
+    """
+    for module in BACKEND_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+
+    for client_class in [BaseDBAsyncClient, *_all_subclasses(BaseDBAsyncClient)]:
+        for name in INSTRUMENTED_METHODS:
+            method = client_class.__dict__.get(name)
+            if method is None or getattr(method, "__instrumented__", False):
+                continue
+            setattr(client_class, name, _wrap_client_method(method))
+
+class RequestMetricsMiddleware:
+    """
+    Per-request latency, DB query count and DB time.
+
+    Results go to the global metrics registry (exposed on /metrics), a
+    sample of requests is logged as one JSON line, and requests that
+    repeat the same statement ``n_plus_one_threshold`` times or more are
+    reported as suspected N+1 patterns.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_sample_rate: float = 0.0,
+        slow_request_seconds: float = 1.0,
+        n_plus_one_threshold: int = 5
+    ) -> None:
+        self.app = app
+        self.log_sample_rate = log_sample_rate
+        self.slow_request_seconds = slow_request_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = push_query_stats(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            pop_query_stats(token)
+            self._record(scope, status_code, elapsed, stats)
+
+    def _record(self, scope: Scope, status_code: int, elapsed: float, stats: QueryStats) -> None:
+        method = scope["method"]
+        route = scope.get("route")
+        # Route templates keep label cardinality bounded; unmatched paths share one label
+        route_path = getattr(route, "path", None) or "unmatched"
+
+        REQUEST_LATENCY.observe(elapsed, method=method, route=route_path)
+        REQUESTS_TOTAL.inc(method=method, route=route_path, status=str(status_code))
+        REQUEST_DB_QUERIES.observe(stats.query_count, method=method, route=route_path)
+        REQUEST_DB_TIME.observe(stats.db_time, method=method, route=route_path)
+
+        repeated = stats.repeated_statements(self.n_plus_one_threshold)
+        if repeated:
+            N_PLUS_ONE_TOTAL.inc(method=method, route=route_path)
+            sql, count = repeated[0]
+            logger.warning(
+                "Possible N+1 on %s %s: statement executed %d times: %s",
+                method, route_path, count, sql[:300]
+            )
+
+        if elapsed >= self.slow_request_seconds or random.random() < self.log_sample_rate:
+            logger.info(json.dumps({
+                "event": "request",
+                "method": method,
+                "route": route_path,
+                "path": scope.get("path"),
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "db_queries": stats.query_count,
+                "db_time_ms": round(stats.db_time * 1000, 2),
+            }))
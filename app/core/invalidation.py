@@ -0,0 +1,317 @@
+"""
+Cache invalidation between uvicorn workers.
+
+Every worker keeps its own in-process caches (entity cache, course list
+snapshot, user course lists, Telegram bot lookups). Writers ``publish(topic, key)`` when data changes;
+the bus runs the local handlers subscribed to the topic at once and sends
+the event to the other workers, whose handlers evict the same entries.
+
+On PostgreSQL events travel over ``LISTEN/NOTIFY`` on a dedicated
+connection; ``LoopbackTransport`` delivers them inside one process (tests,
+SQLite). Events are sent outside the writer's transaction, so another
+worker may reload a row just before the commit; cache TTLs bound that
+window. When events may have been lost (reconnect, full queue) every
+handler is called with ``key=None``, which drops everything it caches.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
+
+from tortoise import Tortoise
+from tortoise.models import Model
+from tortoise.signals import post_delete, post_save
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_EVENTS = registry.counter(
+    "cache_invalidation_events_total",
+    "Cache invalidation events by topic and direction (published, received)",
+    ["topic", "direction"]
+)
+INVALIDATION_RESETS = registry.counter(
+    "cache_invalidation_resets_total",
+    "Times every local cache was dropped because invalidation events may have been lost",
+    ["reason"]
+)
+
+Handler = Callable[[Optional[str]], None]
+Event = Tuple[str, Optional[str]]
+
+# Topic of the "drop everything" event
+RESET = "*"
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+class LoopbackTransport:
+    """
+    Delivers payloads to every transport started on the same hub,
+    including the sender. Several buses sharing a hub behave like workers.
+    """
+
+    _default_hub: List["LoopbackTransport"] = []
+
+    def __init__(self, hub: Optional[List["LoopbackTransport"]] = None):
+        self.hub = self._default_hub if hub is None else hub
+        self._on_message: Optional[Callable[[str], None]] = None
+
+    async def start(self, on_message: Callable[[str], None], on_reset: Callable[[str], None]) -> None:
+        self._on_message = on_message
+        self.hub.append(self)
+
+    async def send(self, payload: str) -> None:
+        loop = asyncio.get_running_loop()
+        for transport in list(self.hub):
+            loop.call_soon(transport._on_message, payload)
+
+    async def stop(self) -> None:
+        if self in self.hub:
+            self.hub.remove(self)
+
+class PostgresTransport:
+    """
+    ``LISTEN/NOTIFY`` on a connection of its own (not taken from the ORM pool).
+    A lost connection is re-established in the background.
+    """
+
+    def __init__(self, channel: str, connect_kwargs: Dict[str, Any], reconnect_delay: float = 1.0):
+        self.channel = channel
+        self.connect_kwargs = connect_kwargs
+        self.reconnect_delay = reconnect_delay
+        self._connection = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._on_message: Optional[Callable[[str], None]] = None
+        self._on_reset: Optional[Callable[[str], None]] = None
+        self._stopped = False
+
+    @classmethod
+    def from_tortoise(cls, channel: str, connection_name: str = "default") -> "PostgresTransport":
+        """Connect with the credentials of a Tortoise (asyncpg) connection"""
+        client = Tortoise.get_connection(connection_name)
+        connect_kwargs = {
+            "host": client.host, "port": client.port, "user": client.user,
+            "password": client.password, "database": client.database,
+        }
+        return cls(channel, connect_kwargs)
+
+    async def start(self, on_message: Callable[[str], None], on_reset: Callable[[str], None]) -> None:
+        self._on_message = on_message
+        self._on_reset = on_reset
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(**self.connect_kwargs)
+        await connection.add_listener(self.channel, self._notified)
+        connection.add_termination_listener(self._terminated)
+        self._connection = connection
+
+    def _notified(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._on_message(payload)
+
+    def _terminated(self, connection) -> None:
+        if self._stopped or connection is not self._connection:
+            return
+        logger.warning("Cache invalidation connection lost, reconnecting")
+        self._connection = None
+        if not self._reconnect_task or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning("Cache invalidation reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            # Events sent while we were away are lost
+            self._on_reset("reconnect")
+            return
+
+    async def send(self, payload: str) -> None:
+        async with self._lock:
+            if self._connection is None or self._connection.is_closed():
+                raise ConnectionError("cache invalidation connection is not open")
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+class InvalidationBus:
+    """
+    Publish/subscribe for cache invalidation.
+
+    Example:
+        invalidation_bus.subscribe("user_courses", evict_user_courses)
+        invalidation_bus.publish("user_courses", user_id)
+
+    ``publish()`` is synchronous and never waits for the network: events
+    are queued and a sender task batches them into as few notifications
+    as possible. Before ``start()`` (scripts) only local handlers run.
+    """
+
+    def __init__(self, queue_size: int = settings.CACHE_INVALIDATION_QUEUE_SIZE):
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.queue_size = queue_size
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._transport = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._overflow = False
+
+    @property
+    def running(self) -> bool:
+        return self._sender is not None
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Call ``handler(key)`` whenever ``topic`` changes (``key=None``: everything)"""
+        self._handlers[topic].append(handler)
+
+    def track(self, model: Type[Model], topic: Optional[str] = None, key: Callable[[Model], Any] = lambda instance: instance.pk) -> None:
+        """Publish ``(topic, key(instance))`` whenever an instance of ``model`` is saved or deleted"""
+        topic = topic or model.__name__
+
+        async def on_save(sender, instance, created, using_db, update_fields) -> None:
+            self.publish(topic, key(instance))
+
+        async def on_delete(sender, instance, using_db) -> None:
+            self.publish(topic, key(instance))
+
+        post_save(model)(on_save)
+        post_delete(model)(on_delete)
+
+    def publish(self, topic: str, key: Optional[Hashable] = None) -> None:
+        """Evict ``key`` of ``topic`` in this worker and, once started, in the others"""
+        key = None if key is None else str(key)
+        self._dispatch(topic, key)
+        INVALIDATION_EVENTS.inc(topic=topic, direction="published")
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait((topic, key))
+        except asyncio.QueueFull:
+            # Too many to send one by one; the others will drop everything instead
+            self._overflow = True
+
+    def _dispatch(self, topic: str, key: Optional[str]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Cache invalidation handler for %s failed", topic)
+
+    def reset(self, reason: str) -> None:
+        """Drop everything the local handlers cache"""
+        INVALIDATION_RESETS.inc(reason=reason)
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    async def start(self, transport: Any = None) -> None:
+        """Start listening (called from the app lifespan); the transport follows CACHE_INVALIDATION_TRANSPORT"""
+        if self.running:
+            return
+        transport = transport or self._default_transport()
+        if transport is None:
+            return
+        await transport.start(self._received, self.reset)
+        self._transport = transport
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._sender = asyncio.create_task(self._send_loop(), name="cache-invalidation")
+
+    @staticmethod
+    def _default_transport():
+        kind = settings.CACHE_INVALIDATION_TRANSPORT
+        if kind == "auto":
+            dialect = Tortoise.get_connection("default").capabilities.dialect
+            kind = "postgres" if dialect == "postgres" else "loopback"
+        if kind == "postgres":
+            return PostgresTransport.from_tortoise(settings.CACHE_INVALIDATION_CHANNEL)
+        if kind == "loopback":
+            return LoopbackTransport()
+        return None
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Send queued events (up to ``timeout`` seconds), then stop listening"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %s cache invalidation events on shutdown", self._queue.qsize())
+        self._sender.cancel()
+        await asyncio.gather(self._sender, return_exceptions=True)
+        await self._transport.stop()
+        self._sender = self._queue = self._transport = None
+
+    async def _send_loop(self) -> None:
+        while True:
+            events = [await self._queue.get()]
+            while not self._queue.empty():
+                events.append(self._queue.get_nowait())
+            batch = list(dict.fromkeys(events))
+            if self._overflow:
+                self._overflow = False
+                batch = [(RESET, None)]
+            try:
+                for payload in self._payloads(batch):
+                    await self._send(payload)
+            finally:
+                for _ in events:
+                    self._queue.task_done()
+
+    async def _send(self, payload: str) -> None:
+        try:
+            await self._transport.send(payload)
+        except Exception as e:
+            # The other workers miss this event; their TTLs still apply
+            logger.error("Failed to send cache invalidation events: %s", e)
+
+    def _payloads(self, events: List[Event]) -> List[str]:
+        """Events serialized into as few payloads as fit in one NOTIFY"""
+        payloads, batch = [], []
+        for event in events:
+            batch.append(event)
+            if len(batch) > 1 and len(self._encode(batch)) > MAX_PAYLOAD_BYTES:
+                payloads.append(self._encode(batch[:-1]))
+                batch = [event]
+        if batch:
+            payloads.append(self._encode(batch))
+        return payloads
+
+    def _encode(self, events: List[Event]) -> str:
+        return json.dumps({"origin": self.origin, "events": events}, separators=(",", ":"))
+
+    def _received(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation payload")
+            return
+        if message.get("origin") == self.origin:
+            return
+        for topic, key in message.get("events", ()):
+            INVALIDATION_EVENTS.inc(topic=topic, direction="received")
+            if topic == RESET:
+                self.reset("overflow")
+            else:
+                self._dispatch(topic, key)
+
+# Create a global instance
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.instrumentation import QueryStats, pop_query_stats, push_query_stats
+
+# Baseline query budgets per endpoint: (method, route template) -> max statements per request.
+# Measured against SQLite with the fixture data of app.scripts.check_query_budgets
+# (authenticated user, one course with 2 modules x 2 lessons, content blocks, progress).
+# Lower a budget when an optimization lands; raising one needs a reason in the commit.
+ENDPOINT_QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("GET", "/health"): 0,
+    # Authentication & profile
+    ("POST", "/api/auth/register"): 1,
+    ("POST", "/api/auth/login"): 1,
+    ("GET", "/api/auth/profile"): 1,
+    # Courses
+    ("GET", "/api/courses"): 4,
+    ("POST", "/api/courses"): 11,
+    ("PATCH", "/api/courses/{course_id}/modules/{module_id}"): 5,
+    ("PATCH", "/api/courses/{course_id}/lessons/{lesson_id}"): 5,
+    ("PATCH", "/api/courses/{course_id}/lessons/{lesson_id}/blocks/{block_id}"): 5,
+    ("PUT", "/api/courses/{course_id}/lessons/{lesson_id}/blocks/order"): 6,
+    ("GET", "/api/education/courses/"): 1,
+    ("GET", "/api/education/courses/{course_id}"): 2,
+    # Course content
+    ("GET", "/api/courses/{course_id}/content"): 6,
+    ("GET", "/api/courses/{course_id}/outline"): 6,
+    ("GET", "/api/courses/{course_id}/lessons/{lesson_id}/content"): 7,
+    ("POST", "/api/courses/{course_id}/lessons/{lesson_id}/complete"): 8,
+    ("POST", "/api/courses/{course_id}/lessons/{lesson_id}/practice/{practice_id}/validate"): 8,
+    ("GET", "/api/courses/{course_id}/lessons/{lesson_id}/practice/{practice_id}/attempts"): 3,
+    ("GET", "/api/courses/{course_id}/certificate"): 2,
+    ("GET", "/api/courses/{course_id}/progress"): 2,
+    ("POST", "/api/courses/{course_id}/enroll"): 6,
+    ("POST", "/api/progress/sync"): 9,
+    # Users & tasks
+    ("GET", "/users/"): 0,
+    ("POST", "/users/"): 0,
+    ("GET", "/users/{user_id}/courses"): 2,
+    ("GET", "/tasks/"): 0,
+    ("POST", "/tasks/"): 0,
+    # Calendar
+    ("POST", "/calendar/notes"): 2,
+    ("GET", "/calendar/notes"): 2,
+    ("GET", "/calendar/notes/today"): 2,
+    ("GET", "/calendar/notes/upcoming"): 2,
+    ("GET", "/calendar/notes/{note_id}"): 2,
+    ("PUT", "/calendar/notes/{note_id}"): 3,
+    ("DELETE", "/calendar/notes/{note_id}"): 3,
+    # Events
+    ("POST", "/events/"): 1,
+    ("GET", "/events/"): 1,
+    ("GET", "/events/{event_id}"): 1,
+    ("PUT", "/events/{event_id}/register"): 2,
+    ("DELETE", "/events/{event_id}"): 2,
+    # Administration
+    ("GET", "/api/admin/test-simple-auth"): 1,
+    ("GET", "/api/admin/test-auth"): 1,
+    ("GET", "/api/admin/dashboard"): 5,
+    ("GET", "/api/admin/users"): 3,
+    ("GET", "/api/admin/courses"): 3,
+    ("GET", "/api/admin/user-courses"): 5,
+    ("PUT", "/api/admin/users/{user_id}/admin"): 3,
+    ("POST", "/api/admin/users/bulk-update"): 3,
+    ("POST", "/api/admin/courses/{course_id}/enrollments"): 7,
+    ("GET", "/api/admin/export/{dataset}"): 3,
+    ("POST", "/api/admin/broadcasts"): 3,
+    ("GET", "/api/admin/broadcasts"): 2,
+    ("GET", "/api/admin/broadcasts/{broadcast_id}"): 2,
+    ("POST", "/api/admin/broadcasts/{broadcast_id}/resume"): 4,
+    ("POST", "/api/admin/broadcasts/{broadcast_id}/cancel"): 4,
+    # Telegram bot (the webhook only queues; replies are built by the update workers)
+    ("POST", "/api/telegram/webhook"): 0,
+    ("GET", "/api/telegram/link"): 1,
+}
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code issues more SQL statements than allowed"""
+
+    def __init__(self, label: str, budget: int, stats: QueryStats):
+        self.label = label
+        self.budget = budget
+        self.stats = stats
+        super().__init__(self._describe())
+
+    def _describe(self) -> str:
+        lines = [
+            f"{self.label or 'Block'} issued {self.stats.query_count} queries, budget is {self.budget}:"
+        ]
+        lines.extend(f"  {i}. {sql}" for i, sql in enumerate(self.stats.statements, 1))
+        repeated = self.stats.repeated_statements(2)
+        if repeated:
+            lines.append("Repeated statements (possible N+1):")
+            lines.extend(f"  {count}x {sql}" for sql, count in repeated)
+        return "\n".join(lines)
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Capture every SQL statement Tortoise issues inside the block.
+
+    Works for sync and async code alike (collection is contextvar based),
+    including queries run by tasks spawned from inside the block.
+    Requires ``instrument_tortoise()`` to have been called.
+
+    Example:
+        with capture_queries() as stats:
+            await client.get("/api/courses")
+        print(stats.query_count, stats.statements)
+    """
+    stats = QueryStats()
+    token = push_query_stats(stats)
+    try:
+        yield stats
+    finally:
+        pop_query_stats(token)
+
+@contextmanager
+def assert_max_queries(budget: int, label: str = "") -> Iterator[QueryStats]:
+    """
+    Fail with QueryBudgetExceeded if the block issues more than ``budget`` statements.
+
+    Example:
+        with assert_max_queries(4, "GET /api/courses"):
+            await client.get("/api/courses")
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.query_count > budget:
+        raise QueryBudgetExceeded(label, budget, stats)
+
+def budget_for(method: str, route: str) -> Optional[int]:
+    """Baseline budget of an endpoint, None when it has none"""
+    return ENDPOINT_QUERY_BUDGETS.get((method.upper(), route))
+
+@contextmanager
+def assert_endpoint_budget(method: str, route: str) -> Iterator[QueryStats]:
+    """assert_max_queries() with the baseline budget of an endpoint"""
+    budget = budget_for(method, route)
+    if budget is None:
+        raise KeyError(f"No query budget declared for {method.upper()} {route}")
+    with assert_max_queries(budget, f"{method.upper()} {route}") as stats:
+        yield stats
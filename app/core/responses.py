@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+# Project-wide default response class (see FastAPI(default_response_class=...))
+DefaultJSONResponse = ORJSONResponse
+
+@lru_cache(maxsize=None)
+def _adapter_for(type_: Any) -> TypeAdapter:
+    """Build (once) and cache a TypeAdapter for a response type"""
+    return TypeAdapter(type_)
+
+def render_json(value: Any, type_: Any) -> bytes:
+    """
+    Serialize already-validated Pydantic data straight to JSON bytes.
+
+    Output matches what FastAPI produces for ``response_model=type_``
+    (aliases applied, pydantic's datetime/UUID formats), so the fast path
+    is byte-compatible with the validated path.
+
+    Args:
+        value: Validated model instance or list of instances
+        type_: The response type, e.g. ``List[CourseResponse]``
+
+    Returns:
+        bytes: Rendered JSON document
+    """
+    return _adapter_for(type_).dump_json(value, by_alias=True)
+
+def parse_json(data: bytes, type_: Any) -> Any:
+    """
+    Validate a JSON document against a response type (the inverse of ``render_json``).
+
+    Parsing and validation both happen in pydantic-core, without building
+    intermediate Python dicts.
+    """
+    return _adapter_for(type_).validate_json(data)
+
+class PrerenderedJSONResponse(Response):
+    """
+    JSON response for bodies that were rendered ahead of time.
+
+    Returning a Response instance from a route makes FastAPI skip the
+    ``response_model`` validation and encoding step entirely, so service
+    functions that already hand back validated models (or cached bytes)
+    are not validated a second time.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: bytes,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(content=content, status_code=status_code, headers=headers, **kwargs)
+
+    @classmethod
+    def from_models(cls, value: Any, type_: Any, **kwargs: Any) -> "PrerenderedJSONResponse":
+        """Render validated models of ``type_`` and wrap them in a response"""
+        return cls(render_json(value, type_), **kwargs)
@@ -7,6 +7,7 @@ import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.identity_map import get_entity
 from app.models.user import User
 from app.schemas.user import UserInDB, TokenData
 # Import service later to avoid circular dependency if get_user is moved there
@@ -69,7 +70,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except jwt.PyJWTError:
         raise credentials_exception
     
-    user = await User.get_or_none(id=token_data.user_id)
+    # Through the identity map, so services asking for the same user skip the query
+    user = await get_entity(User, token_data.user_id)
     
     if user is None:
         raise credentials_exception
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+class LocalObjectStore:
+    """
+    Object storage on the local filesystem.
+
+    Objects are addressed by slash-separated keys ("certificates/<id>.pdf")
+    and served under ``base_url`` (mounted by app.main). Writes go to a
+    temporary file that is renamed into place, so readers never see a
+    partial object. File I/O runs in a thread to keep the event loop free.
+    """
+
+    def __init__(self, root: str = settings.OBJECT_STORE_ROOT, base_url: str = settings.OBJECT_STORE_BASE_URL):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    async def put(self, key: str, data: bytes) -> str:
+        """Store ``data`` under ``key`` (replacing it) and return its URL"""
+        await asyncio.to_thread(self._write, key, data)
+        return self.url(key)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.path(key).unlink, True)
+
+# Create a global instance
+object_store = LocalObjectStore()
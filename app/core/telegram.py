@@ -1,6 +1,12 @@
+import hashlib
+import hmac
 import re
+import time
+from functools import lru_cache
 from typing import Optional
 
+from app.core.config import settings
+
 def validate_telegram_id(telegram_id: str) -> tuple[bool, Optional[str]]:
     """
     Validate a Telegram ID or username.
@@ -27,4 +33,56 @@ def validate_telegram_id(telegram_id: str) -> tuple[bool, Optional[str]]:
             return False, "Telegram ID must be a positive number."
         return True, None
     except ValueError:
-        return False, "Telegram ID must be either a username starting with @ or a numeric ID." 
\ No newline at end of file
+        return False, "Telegram ID must be either a username starting with @ or a numeric ID."
+
+
+@lru_cache(maxsize=65536)
+def parse_telegram_id(telegram_id: str) -> tuple[Optional[int], Optional[str]]:
+    """
+    Split a stored Telegram ID into a numeric chat id or a username.
+    
+    Args:
+        telegram_id: Telegram ID or username (with or without @)
+        
+    Returns:
+        tuple: (chat_id, username)
+        - chat_id: int for numeric IDs, None for usernames
+        - username: lower-cased username without @, None for numeric IDs
+    """
+    clean_id = telegram_id.strip().lstrip('@')
+    try:
+        return int(clean_id), None
+    except ValueError:
+        # Telegram usernames are case-insensitive
+        return None, clean_id.lower()
+
+def _link_signature(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"telegram-link:{payload}".encode(), hashlib.sha256).hexdigest()[:32]
+
+def create_link_token(user_id: int, ttl_seconds: int = 900) -> str:
+    """
+    Signed, short-lived token for a t.me/<bot>?start=<token> account-linking link.
+    
+    Telegram limits start parameters to 64 characters of [A-Za-z0-9_-],
+    which rules out a JWT; this format is ``<user id>-<expiry>-<signature>`` in hex.
+    """
+    payload = f"{user_id:x}-{int(time.time()) + ttl_seconds:x}"
+    return f"{payload}-{_link_signature(payload)}"
+
+def verify_link_token(token: str) -> Optional[int]:
+    """
+    Check a token from create_link_token().
+    
+    Returns:
+        The user id, or None if the token is malformed, forged or expired
+    """
+    try:
+        user_hex, expires_hex, signature = token.split("-")
+        payload = f"{user_hex}-{expires_hex}"
+        if not hmac.compare_digest(signature, _link_signature(payload)):
+            return None
+        if int(expires_hex, 16) < time.time():
+            return None
+        return int(user_hex, 16)
+    except ValueError:
+        return None
@@ -1,4 +1,8 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from tortoise.contrib.fastapi import register_tortoise
 
@@ -9,14 +13,48 @@ from app.services.calendar.router import router as calendar_router
 from app.services.courses.router import router as courses_router
 from app.services.auth.router import router as auth_router
 from app.services.admin.router import router as admin_router
+from app.services.telegram_bot.router import router as telegram_bot_router
 from app.api.endpoints.courses import router as new_courses_router
 from app.api.endpoints.course_content import router as course_content_router
 from app.core.config import DATABASE_URL, TORTOISE_ORM
+from app.core.responses import DefaultJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.identity_map import IdentityMapMiddleware
+from app.core.invalidation import invalidation_bus
+from app.core.instrumentation import RequestMetricsMiddleware, instrument_tortoise
+from app.core.metrics import registry, PROMETHEUS_CONTENT_TYPE
+from app.core.config import settings
+from app.services.broadcast_service import broadcast_service
+from app.services.telegram_service import telegram_service
+from app.services.telegram_bot.service import update_dispatcher
+from app.services.practice_attempts_service import practice_attempt_store
+from app.services.certificate_service import certificate_service
+from app.services.touch_buffer import touch_buffer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # register_tortoise wraps this lifespan, so the ORM is ready here and still open on shutdown
+    await invalidation_bus.start()
+    await telegram_service.start()
+    await practice_attempt_store.start()
+    update_dispatcher.start()
+    certificate_service.start()
+    touch_buffer.start()
+    await broadcast_service.resume_interrupted()
+    yield
+    await broadcast_service.shutdown()
+    await certificate_service.stop()
+    await touch_buffer.stop()
+    await update_dispatcher.stop()
+    await telegram_service.stop()
+    await invalidation_bus.stop()
 
 app = FastAPI(
     title="Edu Events Platform API",
     description="API for managing educational events, users, and tasks",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
     docs_url="/docs",  
     redoc_url="/redoc",  
     swagger_ui_parameters={
@@ -62,6 +100,27 @@ app.add_middleware(
     allow_headers=["*"], 
 )
 
+# gzip/brotli for large JSON payloads (course lists, course content)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Request-scoped identity map: the user loaded by auth is reused by the services
+app.add_middleware(IdentityMapMiddleware, debug_headers=settings.DEBUG_QUERY_HEADERS)
+
+# Per-route latency, DB query counts and N+1 warnings (outermost, so it sees the full request)
+if settings.METRICS_ENABLED:
+    instrument_tortoise()
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        log_sample_rate=settings.METRICS_LOG_SAMPLE_RATE,
+        slow_request_seconds=settings.SLOW_REQUEST_SECONDS,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    )
+
 app.include_router(events_router, prefix="/events", tags=["Events"])
 app.include_router(users_router, prefix="/users", tags=["Users"])
 app.include_router(tasks_router, prefix="/tasks", tags=["Tasks"])
@@ -71,6 +130,11 @@ app.include_router(new_courses_router, prefix="/api", tags=["Courses"])
 app.include_router(course_content_router, prefix="/api", tags=["Course Content"])
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication & Profile"])
 app.include_router(admin_router, prefix="/api/admin", tags=["Administration"])
+app.include_router(telegram_bot_router, prefix="/api/telegram", tags=["Telegram"])
+
+# Files of the local object store (certificates)
+if settings.OBJECT_STORE_BASE_URL.startswith("/"):
+    app.mount(settings.OBJECT_STORE_BASE_URL, StaticFiles(directory=settings.OBJECT_STORE_ROOT, check_dir=False), name="files")
 
 # Initialize Tortoise ORM
 register_tortoise(
@@ -83,3 +147,10 @@ register_tortoise(
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled", status_code=404)
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,45 @@
+from tortoise import fields, models
+from enum import Enum
+
+class BroadcastAudience(str, Enum):
+    ALL = "all"  # every active user with a Telegram ID
+    COURSE = "course"  # users enrolled in (or progressing through) a course
+    ADMINS = "admins"
+
+class BroadcastStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class BroadcastJob(models.Model):
+    """Telegram broadcast to a selected audience, processed in chunks and resumable"""
+    id = fields.IntField(pk=True)
+    message = fields.TextField()
+    audience = fields.CharEnumField(BroadcastAudience, default=BroadcastAudience.ALL)
+    course_id = fields.UUIDField(null=True)  # for BroadcastAudience.COURSE
+    status = fields.CharEnumField(BroadcastStatus, default=BroadcastStatus.PENDING, index=True)
+
+    total_recipients = fields.IntField(default=0)
+    sent_count = fields.IntField(default=0)
+    failed_count = fields.IntField(default=0)
+    # Keyset cursor: every recipient with users.id <= last_user_id has been processed
+    last_user_id = fields.IntField(default=0)
+    error = fields.TextField(null=True)
+
+    created_by = fields.ForeignKeyField('models.User', related_name='broadcasts', null=True, on_delete=fields.SET_NULL)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+    # Refreshed while and after sending every chunk; a running job with a stale heartbeat
+    # belongs to a dead worker. The value last written also identifies the worker owning the job
+    heartbeat_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "broadcast_jobs"
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"Broadcast {self.id} ({self.status})"
@@ -31,6 +31,8 @@ class Course(models.Model):
     image_url = fields.CharField(max_length=500, null=True)
     cover_image = fields.CharField(max_length=500, null=True)
     is_active = fields.BooleanField(default=True)
+    # Bumped by every edit of the course's modules, lessons or content blocks
+    content_version = fields.IntField(default=1)
 
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -96,6 +98,8 @@ class UserCourse(models.Model):
     class Meta:
         table = "user_courses"
         unique_together = ("user", "course")
+        # Enrollments of a course (broadcast recipients, certificate re-issue)
+        indexes = (("course", "user"),)
     
     def __str__(self):
         return f"{self.user.username} - {self.course.title}"
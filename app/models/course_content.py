@@ -3,6 +3,8 @@ from tortoise.contrib.pydantic import pydantic_model_creator
 from enum import Enum
 from uuid import UUID
 
+from app.models.course import CourseStatus
+
 class ContentBlockType(str, Enum):
     HEADING = "heading"
     PARAGRAPH = "paragraph"
@@ -11,10 +13,15 @@ class ContentBlockType(str, Enum):
     IMAGE = "image"
     PRACTICE = "practice"
 
+# Spacing of block positions: a block moved between two neighbours takes a
+# position in the gap, so only that block's row changes
+BLOCK_POSITION_GAP = 1024
+
 class ContentBlock(models.Model):
     id = fields.UUIDField(pk=True)
     type = fields.CharEnumField(ContentBlockType)
     lesson = fields.ForeignKeyField('models.Lesson', related_name='content_blocks')
+    position = fields.BigIntField(default=0)
     
     # Heading fields
     level = fields.IntField(null=True)
@@ -43,6 +50,8 @@ class ContentBlock(models.Model):
 
     class Meta:
         table = "content_blocks"
+        ordering = ["position", "id"]
+        indexes = (("lesson", "position"),)
 
 class UserProgress(models.Model):
     id = fields.UUIDField(pk=True)
@@ -58,6 +67,38 @@ class UserProgress(models.Model):
     class Meta:
         table = "user_progress"
         unique_together = (("user", "course"),)
+        indexes = (("course", "user"),)
+
+class CourseProgressSummary(models.Model):
+    """
+    Read model of a user's progress in a course, one row per (user, course).
+
+    Written by app.services.progress_service on lesson completion, practice
+    validation and certificate issue; progress pages read it instead of
+    joining UserProgress, UserCourse and Certificate.
+    """
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField('models.User', related_name='progress_summaries')
+    course = fields.ForeignKeyField('models.Course', related_name='progress_summaries')
+    status = fields.CharEnumField(CourseStatus, default=CourseStatus.IN_PROGRESS)
+    percent = fields.FloatField(default=0.0)
+    lessons_done = fields.IntField(default=0)
+    lessons_total = fields.IntField(default=0)
+    practices_done = fields.IntField(default=0)
+    completed_lessons = fields.JSONField(default=list)  # List of lesson IDs (as strings)
+    completed_practices = fields.JSONField(default=list)  # List of practice IDs (as strings)
+    last_lesson = fields.ForeignKeyField('models.Lesson', null=True, on_delete=fields.SET_NULL)
+    has_certificate = fields.BooleanField(default=False)
+    started_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "course_progress_summaries"
+        unique_together = (("user", "course"),)
+        indexes = (
+            ("user", "status", "updated_at"),  # a user's course list, in-progress first, latest first
+            ("course", "percent"),  # users who completed a course
+        )
 
 class UserPracticeAttempt(models.Model):
     id = fields.UUIDField(pk=True)
@@ -66,7 +107,31 @@ class UserPracticeAttempt(models.Model):
     answer = fields.TextField()
     is_correct = fields.BooleanField()
     feedback = fields.TextField(null=True)
+    client_event_id = fields.CharField(max_length=100, null=True)  # set for attempts sent through progress sync
     created_at = fields.DatetimeField(auto_now_add=True)
 
     class Meta:
-        table = "user_practice_attempts" 
\ No newline at end of file
+        table = "user_practice_attempts"
+        # On PostgreSQL the table is partitioned by month on created_at
+        # (see app.services.practice_attempts_service)
+        indexes = (
+            ("user", "practice", "created_at"),
+            ("practice", "user", "created_at"),  # attempts of a practice (statistics, deleting the block)
+            ("user", "client_event_id"),  # replayed sync events
+        )
+
+class PracticeAttemptSummary(models.Model):
+    """Attempts of a user at a practice that were rolled up and removed by the retention job"""
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField('models.User', related_name='practice_attempt_summaries')
+    practice = fields.ForeignKeyField('models.ContentBlock', related_name='attempt_summaries')
+    attempts = fields.IntField(default=0)
+    correct_attempts = fields.IntField(default=0)
+    first_attempt_at = fields.DatetimeField(null=True)
+    first_correct_at = fields.DatetimeField(null=True)
+    last_attempt_at = fields.DatetimeField(null=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "practice_attempt_summaries"
+        unique_together = (("user", "practice"),) 
\ No newline at end of file
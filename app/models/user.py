@@ -19,6 +19,7 @@ class User(models.Model):
     is_active = fields.BooleanField(default=True) # Keep for enabling/disabling users
     is_admin = fields.BooleanField(default=False)
     telegram_id = fields.CharField(max_length=255, null=True, unique=True) # New field for Telegram ID
+    telegram_chat_id = fields.BigIntField(null=True) # Numeric chat id resolved from telegram_id
     created_at = fields.DatetimeField(auto_now_add=True)
     # Add updated_at for tracking profile updates
     updated_at = fields.DatetimeField(auto_now=True)
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from app.models.broadcast import BroadcastAudience, BroadcastStatus
+
+class BroadcastCreate(BaseModel):
+    """Schema for starting a Telegram broadcast"""
+    message: str = Field(..., min_length=1, max_length=4096)  # Bot API message limit
+    audience: BroadcastAudience = BroadcastAudience.ALL
+    course_id: Optional[UUID] = None
+
+    @model_validator(mode="after")
+    def check_course(self) -> "BroadcastCreate":
+        if self.audience == BroadcastAudience.COURSE and self.course_id is None:
+            raise ValueError("course_id is required for the 'course' audience")
+        return self
+
+class BroadcastJobResponse(BaseModel):
+    """Schema for returning broadcast progress"""
+    id: int
+    message: str
+    audience: BroadcastAudience
+    course_id: Optional[UUID] = None
+    status: BroadcastStatus
+    total_recipients: int
+    sent_count: int
+    failed_count: int
+    last_user_id: int
+    error: Optional[str] = None
+    created_by_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
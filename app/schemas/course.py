@@ -76,6 +76,22 @@ class ModuleResponse(ModuleBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class ModuleUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+
+class LessonUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    type: Optional[LessonType] = None
+    content: Optional[str] = Field(None, min_length=1)
+
+class ContentUpdateResponse(BaseModel):
+    """Result of a partial update of a module, lesson or content block"""
+    id: UUID
+    course_id: UUID
+    content_version: int
+    updated_fields: List[str]
+    updated_at: datetime
+
 class CourseCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
     description: str = Field(..., min_length=1, max_length=500)
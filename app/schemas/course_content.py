@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 from typing import List, Optional, Union
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from uuid import UUID
 
@@ -29,6 +29,7 @@ class ContentBlockBase(BaseModel):
 
 class ContentBlockResponse(ContentBlockBase):
     id: UUID
+    position: int
     created_at: datetime
     updated_at: datetime
 
@@ -58,21 +59,49 @@ class ModuleContent(BaseModel):
 class CourseContent(BaseModel):
     id: UUID
     title: str
+    content_version: int
     modules: List[ModuleContent]
 
     model_config = {
         "from_attributes": True
     }
 
+class OutlineLesson(BaseModel):
+    id: UUID
+    title: str
+    type: str
+    blocks_count: int
+    completed: bool = False
+
+class OutlineModule(BaseModel):
+    id: UUID
+    title: str
+    lessons: List[OutlineLesson]
+
+class CourseOutline(BaseModel):
+    """Course structure without lesson bodies; lessons are loaded one at a time"""
+    id: UUID
+    title: str
+    content_version: int
+    progress: float
+    lessons_total: int
+    modules: List[OutlineModule]
+
+class LessonContentResponse(LessonContent):
+    type: str
+    module_id: UUID
+    content_version: int
+    next_lesson_id: Optional[UUID] = None  # worth prefetching once this lesson is shown
+
 class CompleteLessonRequest(BaseModel):
-    user_id: UUID
+    user_id: int
 
 class CompleteLessonResponse(BaseModel):
     success: bool
     message: str
 
 class ValidatePracticeRequest(BaseModel):
-    user_id: UUID
+    user_id: int
     answer: str
 
 class ValidatePracticeResponse(BaseModel):
@@ -89,4 +118,94 @@ class CourseProgress(BaseModel):
 
     model_config = {
         "from_attributes": True
-    } 
\ No newline at end of file
+    } 
+class ProgressEventType(str, Enum):
+    LESSON_COMPLETED = "lesson_completed"
+    PRACTICE_ANSWERED = "practice_answered"
+
+class ProgressEvent(BaseModel):
+    type: ProgressEventType
+    course_id: UUID
+    lesson_id: UUID
+    practice_id: Optional[UUID] = None  # required for practice_answered
+    answer: Optional[str] = None  # required for practice_answered
+    occurred_at: datetime  # client time of the event
+    client_event_id: Optional[str] = Field(None, max_length=100)  # makes replays of the same event idempotent
+
+    @field_validator("occurred_at")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        # Naive client times are taken as UTC so a batch always sorts
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+class ProgressSyncRequest(BaseModel):
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=500)
+
+class RejectedProgressEvent(BaseModel):
+    index: int
+    detail: str
+
+class SyncedCourseProgress(CourseProgress):
+    course_id: UUID
+
+class ProgressSyncResponse(BaseModel):
+    applied: int
+    duplicates: int
+    rejected: List[RejectedProgressEvent]
+    courses: List[SyncedCourseProgress]
+
+class PracticeAttemptResponse(BaseModel):
+    id: UUID
+    answer: str
+    is_correct: bool
+    feedback: Optional[str] = None
+    created_at: datetime
+
+class PracticeAttemptRollup(BaseModel):
+    attempts: int
+    correct_attempts: int
+    first_attempt_at: Optional[datetime] = None
+    first_correct_at: Optional[datetime] = None
+    last_attempt_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class PracticeAttemptsResponse(BaseModel):
+    practice_id: UUID
+    attempts: List[PracticeAttemptResponse]  # newest first
+    rolled_up: Optional[PracticeAttemptRollup] = None  # older attempts compacted by the retention job
+
+class CourseCertificateResponse(BaseModel):
+    id: UUID
+    course_id: UUID
+    issued_at: datetime
+    url: Optional[str] = None  # None while the PDF is being generated
+
+class ContentBlockUpdate(BaseModel):
+    """Partial update of a content block: only the fields sent are changed"""
+    type: Optional[ContentBlockType] = None
+    level: Optional[int] = None
+    text: Optional[str] = None
+    language: Optional[str] = Field(None, max_length=50)
+    code: Optional[str] = None
+    video_id: Optional[str] = Field(None, max_length=100)
+    src: Optional[HttpUrl] = None
+    alt: Optional[str] = Field(None, max_length=255)
+    practice_id: Optional[UUID] = None
+    description: Optional[str] = None
+    task_type: Optional[str] = Field(None, max_length=50)
+    validation_regex: Optional[str] = Field(None, max_length=255)
+    placeholder: Optional[str] = Field(None, max_length=255)
+
+class BlockReorderRequest(BaseModel):
+    block_ids: List[UUID] = Field(..., min_length=1)  # every block of the lesson, in the new order
+
+class BlockPosition(BaseModel):
+    id: UUID
+    position: int
+
+class BlockReorderResponse(BaseModel):
+    content_version: int
+    moved: List[BlockPosition]  # only the blocks whose position changed
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.course import CourseStatus
+
+class EnrollmentResponse(BaseModel):
+    """Schema for returning an enrollment"""
+    id: UUID
+    user_id: int
+    course_id: UUID
+    status: CourseStatus
+    progress: float
+    started_at: datetime
+    created: bool  # False when the user was already enrolled
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkEnrollRequest(BaseModel):
+    """Schema for enrolling many users into a course"""
+    user_ids: List[int] = Field(..., min_length=1, max_length=settings.BULK_ENROLL_MAX_USERS)
+
+class BulkEnrollChunk(BaseModel):
+    """One line of the bulk enrollment stream (per chunk of user IDs)"""
+    chunk: int
+    requested: int
+    enrolled: int
+    already_enrolled: int
+    unknown_user_ids: List[int] = []
+    error: Optional[str] = None
+
+class BulkEnrollSummary(BaseModel):
+    """Last line of the bulk enrollment stream"""
+    done: bool = True
+    requested: int
+    enrolled: int
+    already_enrolled: int
+    unknown_users: int
+    failed_chunks: int
@@ -0,0 +1,12 @@
+from enum import Enum
+
+class ExportDataset(str, Enum):
+    """Tables available for admin export"""
+    USERS = "users"
+    ENROLLMENTS = "enrollments"
+    PROGRESS = "progress"
+
+class ExportFormat(str, Enum):
+    """Output format of an export (one record per line / row)"""
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict, EmailStr, HttpUrl
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, HttpUrl, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
+from app.core.config import settings
 from app.models.user import UserRole
 
 # Optional stats schema (can be added later)
@@ -63,3 +65,48 @@ class UserProfile(BaseModel):
     class Config:
         orm_mode = True # Needed to map from User ORM model
         use_enum_values = True # Serialize enum to its value
+
+# Schemas for bulk user updates (admin)
+class BulkUserFilter(BaseModel):
+    """Selects users for a bulk update; all given conditions must match"""
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+    course_id: Optional[UUID] = Field(None, description="Users enrolled in this course")
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "BulkUserFilter":
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("at least one filter condition is required")
+        return self
+
+class BulkUserChanges(BaseModel):
+    """Fields set on every selected user"""
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "BulkUserChanges":
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("at least one change is required")
+        return self
+
+class BulkUserUpdate(BaseModel):
+    """Schema for updating many users at once, by IDs or by a filter"""
+    user_ids: Optional[List[int]] = Field(None, min_length=1, max_length=settings.BULK_USER_UPDATE_MAX_IDS)
+    filter: Optional[BulkUserFilter] = None
+    changes: BulkUserChanges
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "BulkUserUpdate":
+        if (self.user_ids is None) == (self.filter is None):
+            raise ValueError("exactly one of user_ids and filter is required")
+        return self
+
+class BulkUserUpdateResponse(BaseModel):
+    """Result of a bulk user update"""
+    updated: int
+    skipped_self: bool = False  # the requesting admin matched and was left unchanged
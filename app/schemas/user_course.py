@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Optional, Literal
 from enum import Enum
+from uuid import UUID
 
 class CourseFilterStatus(str, Enum):
     COMPLETED = "completed"
@@ -10,7 +11,7 @@ class CourseFilterStatus(str, Enum):
 
 class UserCourseResponse(BaseModel):
     """Схема для ответа с курсом пользователя"""
-    id: int
+    id: UUID
     title: str
     coverImage: str
     status: Literal["completed", "in_progress"]
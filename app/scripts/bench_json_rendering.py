@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for course list rendering.
+
+Compares the three ways a course tree can reach the client:
+
+- stdlib:      validate in the service, re-validate against response_model,
+               render with the stdlib json encoder (the old behaviour)
+- orjson:      same double validation, rendered with ORJSONResponse
+- prerendered: validate once in the service, dump JSON bytes directly
+
+Usage:
+    python -m app.scripts.bench_json_rendering --modules 50 --lessons 10
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import render_json
+from app.schemas.course import CourseResponse
+from app.services.course_service import COURSE_LIST_TYPE, CourseService
+
+def build_course(modules: int, lessons: int, content_size: int) -> SimpleNamespace:
+    """Build an ORM-like course object with prefetched modules and lessons"""
+    now = datetime.now(timezone.utc)
+    content = ("print('hello world')\n" * (content_size // 21 + 1))[:content_size]
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        title="Benchmark course",
+        description="Synthetic course used for rendering benchmarks",
+        full_description="Long description " * 20,
+        level="beginner",
+        duration="8 weeks",
+        image_url="https://example.com/image.png",
+        cover_image=None,
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+        modules=[
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                title=f"Module {m}",
+                lessons_count=lessons,
+                created_at=now,
+                updated_at=now,
+                lessons=[
+                    SimpleNamespace(
+                        id=uuid.uuid4(),
+                        title=f"Lesson {m}.{l}",
+                        type="theory",
+                        content=content,
+                        created_at=now,
+                        updated_at=now
+                    )
+                    for l in range(lessons)
+                ]
+            )
+            for m in range(modules)
+        ]
+    )
+
+def validate(courses: list) -> List[CourseResponse]:
+    """Service-side validation, shared by all variants"""
+    return [CourseResponse.model_validate(CourseService._course_to_dict(c)) for c in courses]
+
+async def run(modules: int, lessons: int, content_size: int, rounds: int) -> None:
+    courses = [build_course(modules, lessons, content_size)]
+    field = create_model_field(name="Response_get_courses", type_=COURSE_LIST_TYPE, mode="serialization")
+
+    async def via_response_model(response_class) -> bytes:
+        content = await serialize_response(field=field, response_content=validate(courses))
+        return response_class(content).body
+
+    async def prerendered() -> bytes:
+        return render_json(validate(courses), COURSE_LIST_TYPE)
+
+    variants = {
+        "stdlib": lambda: via_response_model(JSONResponse),
+        "orjson": lambda: via_response_model(ORJSONResponse),
+        "prerendered": prerendered,
+    }
+
+    print(f"Course: {modules} modules x {lessons} lessons, {content_size} bytes of content per lesson")
+    baseline = None
+    for name, variant in variants.items():
+        body = await variant()  # warm-up, also gives the payload size
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await variant()
+        per_call = (time.perf_counter() - started) / rounds * 1000
+        baseline = baseline or per_call
+        print(f"  {name:<12} {per_call:8.2f} ms/request  {len(body) / 1024:8.1f} KiB  x{baseline / per_call:.2f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument("--content-size", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.modules, args.lessons, args.content_size, args.rounds))
+
+if __name__ == "__main__":
+    main()
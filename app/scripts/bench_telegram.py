@@ -0,0 +1,147 @@
+"""
+Throughput of the Telegram notification pipeline against a simulated Bot API.
+
+Drives the calendar flows that notify users (create, update and delete a
+note, then request the daily reminder) through the ASGI app, with
+``telegram_service`` sending through app.services.telegram_fake instead of
+the real API. Each flow runs twice:
+
+    reference  the fake answers instantly and never throttles
+    simulated  the fake adds --latency/--jitter, enforces --rate-limit
+               (429 with retry_after) and fails --failure-rate of the calls
+
+and the report shows delivered messages per second, 429s and failures, the
+delay from the start of a request until its message reaches the API, and
+how much the Telegram calls add to the latency of each endpoint.
+
+Usage:
+    python -m app.scripts.bench_telegram --users 50 --rounds 4 --latency 0.08
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from app.scripts.harness import create_user, running_app, token_headers, use_database
+from app.scripts.run_benchmarks import client_pool, percentile
+
+FLOWS = ["create", "update", "delete", "daily_reminder"]
+
+@dataclass
+class RunResult:
+    name: str
+    elapsed: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {flow: [] for flow in FLOWS})
+    delays: List[float] = field(default_factory=list)  # request start -> message accepted by the API
+    stats: Dict = field(default_factory=dict)
+
+async def run_flows(app, fake, users, rounds: int, concurrency: int, name: str) -> RunResult:
+    """Every user performs ``rounds`` create/update/delete/daily-reminder cycles"""
+    result = RunResult(name)
+    clients = client_pool(app)
+    queue: asyncio.Queue = asyncio.Queue()
+    for user in users:
+        queue.put_nowait(user)
+    base_date = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    async def timed(flow: str, chat_id: int, send) -> dict:
+        seen = len(fake.by_chat[chat_id])
+        started = time.perf_counter()
+        response = await send()
+        result.latencies[flow].append(time.perf_counter() - started)
+        result.requests += 1
+        result.errors += response.status_code >= 400
+        result.delays.extend(m.received_at - started for m in fake.by_chat[chat_id][seen:])
+        return response.json() if response.status_code < 400 else {}
+
+    async def worker(n: int) -> None:
+        client = clients[n % len(clients)]
+        while not queue.empty():
+            user = queue.get_nowait()
+            headers = token_headers(user)
+            for r in range(rounds):
+                note = await timed("create", user.telegram_chat_id, lambda: client.post(
+                    "/calendar/notes", headers=headers,
+                    json={"title": f"Bench note {user.id}.{r}", "date": (base_date + timedelta(minutes=r)).isoformat(),
+                          "description": "Created by the Telegram benchmark"}))
+                if "id" in note:
+                    await timed("update", user.telegram_chat_id, lambda: client.put(
+                        f"/calendar/notes/{note['id']}", headers=headers, json={"title": f"Renamed {user.id}.{r}"}))
+                    await timed("delete", user.telegram_chat_id, lambda: client.delete(
+                        f"/calendar/notes/{note['id']}", headers=headers))
+                await timed("daily_reminder", user.telegram_chat_id, lambda: client.post(
+                    "/calendar/notifications/daily-reminder", headers=headers))
+
+    fake.reset()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    finally:
+        for client in clients:
+            await client.aclose()
+    result.elapsed = time.perf_counter() - started
+    result.stats = fake.stats()
+    return result
+
+def ms(values: List[float], pct: float) -> str:
+    return f"{percentile(values, pct) * 1000:.1f}"
+
+def report(reference: RunResult, simulated: RunResult) -> None:
+    for run in (reference, simulated):
+        delivered = run.stats["delivered"]
+        responses = run.stats["responses"]
+        print(f"[{run.name}] {run.requests} requests ({run.errors} errors) in {run.elapsed:.2f}s")
+        print(f"  messages delivered: {delivered} ({delivered / run.elapsed:.1f}/s), "
+              f"429: {responses.get(429, 0)}, failures: {responses.get(500, 0) + responses.get(403, 0)}, "
+              f"max concurrent API calls: {run.stats['max_in_flight']}")
+        if run.delays:
+            print(f"  delay request start -> API: p50 {ms(run.delays, 50)} ms, "
+                  f"p95 {ms(run.delays, 95)} ms, max {max(run.delays) * 1000:.1f} ms")
+
+    print(f"\n{'endpoint':<16}{'ref p50':>10}{'sim p50':>10}{'ref p95':>10}{'sim p95':>10}{'added (mean)':>15}")
+    for flow in FLOWS:
+        ref, sim = reference.latencies[flow], simulated.latencies[flow]
+        if not ref or not sim:
+            continue
+        added = (statistics.fmean(sim) - statistics.fmean(ref)) * 1000
+        print(f"{flow:<16}{ms(ref, 50):>10}{ms(sim, 50):>10}{ms(ref, 95):>10}{ms(sim, 95):>10}{added:>12.1f} ms")
+
+async def run(args: argparse.Namespace) -> None:
+    use_database(args.db_url)
+    from app.main import app
+    from app.services.telegram_fake import FakeTelegramRequest, fake_bot
+
+    fake = FakeTelegramRequest(latency=0.0, rate_limit=None, seed=args.seed)
+    async with running_app(app, bot=fake_bot(fake)):
+        users = [
+            await create_user(f"tg{n}@bench.example", telegram_id=str(50_000_000 + n), telegram_chat_id=50_000_000 + n)
+            for n in range(args.users)
+        ]
+        reference = await run_flows(app, fake, users, args.rounds, args.concurrency, "reference")
+
+        fake.latency, fake.jitter = args.latency, args.jitter
+        fake.rate_limit, fake.failure_rate = args.rate_limit, args.failure_rate
+        simulated = await run_flows(app, fake, users, args.rounds, args.concurrency, "simulated")
+
+    report(reference, simulated)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite://:memory:")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=4, help="create/update/delete/reminder cycles per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds per Bot API call")
+    parser.add_argument("--jitter", type=float, default=0.04)
+    parser.add_argument("--rate-limit", type=float, default=30.0, help="messages/second before Telegram answers 429")
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Check every endpoint against its declared SQL query budget.
+
+Boots the app in-process on an in-memory SQLite database, seeds a small
+fixture (users, one course with modules/lessons/content blocks, progress,
+calendar notes, events), calls each endpoint once while capturing the
+statements Tortoise issues, and compares the count with
+app.core.query_budget.ENDPOINT_QUERY_BUDGETS.
+
+Every call is seeded to take its success path, so an endpoint answering
+with another status than expected (any 2xx unless the call says otherwise)
+fails the check as well: a 404 or 422 would measure the wrong code path.
+Exits with status 1 when an endpoint exceeds its budget, answers with an
+unexpected status, or exists without a declared budget.
+
+Usage:
+    python -m app.scripts.check_query_budgets [-v]
+"""
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.scripts.harness import create_user, running_app, token_headers, use_database
+
+# Endpoints deliberately not exercised (they talk to external services)
+SKIPPED_ENDPOINTS = {
+    ("POST", "/api/admin/test-telegram"),
+    ("POST", "/calendar/notes/{note_id}/remind"),
+    ("POST", "/calendar/notifications/daily-reminder"),
+}
+
+WEBHOOK_SECRET = "budget-check-secret"
+
+@dataclass
+class Call:
+    method: str
+    route: str
+    path: str
+    auth: Optional[str] = "student"  # "student", "other", "admin" or None
+    json: Any = None
+    data: Any = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    expect: Optional[int] = None  # exact status expected; any 2xx when None
+
+@dataclass
+class Result:
+    call: Call
+    status: int
+    queries: int
+    budget: Optional[int]
+    statements: List[str]
+
+    @property
+    def status_ok(self) -> bool:
+        if self.call.expect is not None:
+            return self.status == self.call.expect
+        return 200 <= self.status < 300
+
+    @property
+    def ok(self) -> bool:
+        return self.budget is not None and self.queries <= self.budget and self.status_ok
+
+async def seed() -> Dict[str, Any]:
+    """Create the fixture data and return the ids the calls need"""
+    from app.models.broadcast import BroadcastAudience, BroadcastJob, BroadcastStatus
+    from app.models.calendar import CalendarNote
+    from app.models.course import Certificate, Course, CourseLevel, CourseModule, Lesson, LessonType, UserCourse
+    from app.models.course_content import ContentBlock, ContentBlockType, UserProgress
+    from app.models.event import Event
+    from app.services.progress_service import progress_projection
+
+    admin = await create_user("admin@example.com", is_admin=True, name="Admin")
+    student = await create_user("student@example.com", name="Student")
+    other = await create_user("other@example.com", name="Other")
+
+    course = await Course.create(
+        title="Fixture course",
+        description="Course used by the query budget check",
+        full_description="Full description",
+        level=CourseLevel.BEGINNER,
+        duration="2 weeks"
+    )
+    lessons = []
+    for m in range(2):
+        module = await CourseModule.create(title=f"Module {m}", lessons_count=2, course=course)
+        for l in range(2):
+            lesson = await Lesson.create(title=f"Lesson {m}.{l}", type=LessonType.THEORY, content="Text", module=module)
+            await ContentBlock.create(type=ContentBlockType.HEADING, lesson=lesson, position=1024, level=1, text="Heading")
+            await ContentBlock.create(type=ContentBlockType.CODE, lesson=lesson, position=2048, language="python", code="print(1)")
+            lessons.append(lesson)
+    practice = await ContentBlock.create(
+        type=ContentBlockType.PRACTICE,
+        lesson=lessons[0],
+        position=3072,
+        description="Type 42",
+        validation_regex=r"^42$"
+    )
+
+    await UserProgress.create(user=student, course=course, completed_lessons=[], completed_practices=[])
+    user_course = await UserCourse.create(user=student, course=course, progress=25.0)
+    await Certificate.create(user_course=user_course)
+    await progress_projection.rebuild()
+
+    now = datetime.now(timezone.utc)
+    note = await CalendarNote.create(title="Fixture note", date=now + timedelta(hours=1))
+    await CalendarNote.create(title="Note to delete", date=now + timedelta(hours=2))
+    event = await Event.create(title="Fixture event", start_date=now, end_date=now + timedelta(hours=2))
+    await Event.create(title="Event to delete", start_date=now, end_date=now + timedelta(hours=2))
+
+    # Admins only: the fixture admins have no Telegram ID, so resuming sends nothing
+    broadcast_to_cancel = await BroadcastJob.create(message="Pending", audience=BroadcastAudience.ADMINS)
+    broadcast_to_resume = await BroadcastJob.create(
+        message="Cancelled",
+        audience=BroadcastAudience.ADMINS,
+        status=BroadcastStatus.CANCELLED
+    )
+
+    return {
+        "admin": admin,
+        "student": student,
+        "other": other,
+        "course_id": str(course.id),
+        "lesson_id": str(lessons[0].id),
+        "practice_id": str(practice.id),
+        "module_id": str(module.id),
+        "block_ids": [str(block_id) for block_id in await ContentBlock.filter(lesson=lessons[0]).values_list("id", flat=True)],
+        "note_id": note.id,
+        "note_to_delete": note.id + 1,
+        "event_id": event.id,
+        "event_to_delete": event.id + 1,
+        "broadcast_to_cancel": broadcast_to_cancel.id,
+        "broadcast_to_resume": broadcast_to_resume.id,
+    }
+
+def build_calls(ids: Dict[str, Any]) -> List[Call]:
+    course, lesson, practice = ids["course_id"], ids["lesson_id"], ids["practice_id"]
+    student_id, other_id = ids["student"].id, ids["other"].id
+    now = datetime.now(timezone.utc)
+    new_course = {
+        "title": "Budget course",
+        "description": "Created by the budget check",
+        "fullDescription": "Full description",
+        "level": "beginner",
+        "duration": "1 week",
+        "modules": [
+            {"title": "M1", "lessons": [{"title": "L1", "type": "theory", "content": "c"},
+                                        {"title": "L2", "type": "video", "content": "c"}]},
+            {"title": "M2", "lessons": [{"title": "L3", "type": "theory", "content": "c"}]},
+        ],
+    }
+    window = {"start_date": (now - timedelta(days=1)).isoformat(), "end_date": (now + timedelta(days=1)).isoformat()}
+    lesson_route = "/api/courses/{course_id}/lessons/{lesson_id}"
+
+    return [
+        Call("GET", "/health", "/health", auth=None),
+        Call("POST", "/api/auth/register", "/api/auth/register", auth=None,
+             json={"email": "new@example.com", "password": "password123", "telegram_id": "123456"}),
+        Call("POST", "/api/auth/login", "/api/auth/login", auth=None,
+             data={"username": "student@example.com", "password": "password123"}),
+        Call("GET", "/api/auth/profile", "/api/auth/profile"),
+        Call("GET", "/api/courses", "/api/courses"),
+        Call("POST", "/api/courses", "/api/courses", auth="admin", json=new_course),
+        Call("GET", "/api/education/courses/", "/api/education/courses/", auth=None),
+        Call("GET", "/api/education/courses/{course_id}", f"/api/education/courses/{course}", auth=None),
+        Call("GET", "/api/courses/{course_id}/content", f"/api/courses/{course}/content"),
+        Call("GET", "/api/courses/{course_id}/outline", f"/api/courses/{course}/outline"),
+        Call("GET", lesson_route + "/content", f"/api/courses/{course}/lessons/{lesson}/content"),
+        Call("PATCH", "/api/courses/{course_id}/modules/{module_id}", f"/api/courses/{course}/modules/{ids['module_id']}",
+             auth="admin", json={"title": "Renamed module"}),
+        Call("PATCH", lesson_route, f"/api/courses/{course}/lessons/{lesson}", auth="admin", json={"content": "Edited"}),
+        Call("PATCH", lesson_route + "/blocks/{block_id}", f"/api/courses/{course}/lessons/{lesson}/blocks/{practice}",
+             auth="admin", json={"placeholder": "42"}),
+        Call("PUT", lesson_route + "/blocks/order", f"/api/courses/{course}/lessons/{lesson}/blocks/order",
+             auth="admin", json={"block_ids": ids["block_ids"][-1:] + ids["block_ids"][:-1]}),
+        Call("POST", lesson_route + "/complete", f"/api/courses/{course}/lessons/{lesson}/complete",
+             json={"user_id": student_id}),
+        Call("POST", lesson_route + "/practice/{practice_id}/validate",
+             f"/api/courses/{course}/lessons/{lesson}/practice/{practice}/validate",
+             json={"user_id": student_id, "answer": "42"}),
+        Call("GET", lesson_route + "/practice/{practice_id}/attempts",
+             f"/api/courses/{course}/lessons/{lesson}/practice/{practice}/attempts"),
+        Call("GET", "/api/courses/{course_id}/certificate", f"/api/courses/{course}/certificate"),
+        Call("GET", "/api/courses/{course_id}/progress", f"/api/courses/{course}/progress"),
+        # Not enrolled yet, so the enrollment is actually created
+        Call("POST", "/api/courses/{course_id}/enroll", f"/api/courses/{course}/enroll", auth="other", expect=201),
+        Call("POST", "/api/progress/sync", "/api/progress/sync", json={"events": [
+            {"type": "lesson_completed", "course_id": course, "lesson_id": lesson, "occurred_at": now.isoformat()},
+            {"type": "practice_answered", "course_id": course, "lesson_id": lesson, "practice_id": practice,
+             "answer": "42", "occurred_at": now.isoformat()},
+        ]}),
+        Call("GET", "/users/", "/users/", auth=None),
+        Call("POST", "/users/", "/users/", auth=None),
+        Call("GET", "/users/{user_id}/courses", f"/users/{student_id}/courses"),
+        Call("GET", "/tasks/", "/tasks/", auth=None),
+        Call("POST", "/tasks/", "/tasks/", auth=None),
+        Call("POST", "/calendar/notes", "/calendar/notes",
+             json={"title": "New note", "date": (now + timedelta(hours=3)).isoformat()}),
+        Call("GET", "/calendar/notes", "/calendar/notes", params=window),
+        Call("GET", "/calendar/notes/today", "/calendar/notes/today"),
+        Call("GET", "/calendar/notes/upcoming", "/calendar/notes/upcoming"),
+        Call("GET", "/calendar/notes/{note_id}", f"/calendar/notes/{ids['note_id']}"),
+        Call("PUT", "/calendar/notes/{note_id}", f"/calendar/notes/{ids['note_id']}", json={"title": "Renamed"}),
+        Call("DELETE", "/calendar/notes/{note_id}", f"/calendar/notes/{ids['note_to_delete']}"),
+        Call("POST", "/events/", "/events/", auth=None,
+             json={"title": "New event", "start_date": now.isoformat(), "end_date": (now + timedelta(hours=1)).isoformat()}),
+        Call("GET", "/events/", "/events/", auth=None),
+        Call("GET", "/events/{event_id}", f"/events/{ids['event_id']}", auth=None),
+        Call("PUT", "/events/{event_id}/register", f"/events/{ids['event_id']}/register", auth=None),
+        Call("DELETE", "/events/{event_id}", f"/events/{ids['event_to_delete']}", auth=None),
+        Call("GET", "/api/admin/test-simple-auth", "/api/admin/test-simple-auth"),
+        Call("GET", "/api/admin/test-auth", "/api/admin/test-auth", auth="admin"),
+        Call("GET", "/api/admin/dashboard", "/api/admin/dashboard", auth="admin"),
+        Call("GET", "/api/admin/users", "/api/admin/users", auth="admin"),
+        Call("GET", "/api/admin/courses", "/api/admin/courses", auth="admin"),
+        Call("GET", "/api/admin/user-courses", "/api/admin/user-courses", auth="admin"),
+        Call("PUT", "/api/admin/users/{user_id}/admin", f"/api/admin/users/{other_id}/admin", auth="admin"),
+        Call("POST", "/api/admin/users/bulk-update", "/api/admin/users/bulk-update", auth="admin",
+             json={"filter": {"course_id": str(course)}, "changes": {"is_active": True}}),
+        Call("POST", "/api/admin/courses/{course_id}/enrollments", f"/api/admin/courses/{course}/enrollments", auth="admin",
+             json={"user_ids": [student_id, other_id, 10**9]}),
+        Call("GET", "/api/admin/export/{dataset}", "/api/admin/export/enrollments", auth="admin",
+             params={"format": "csv", "course_id": str(course)}),
+        # The fixture admins have no Telegram ID, so this broadcast has no recipients and sends nothing
+        Call("POST", "/api/admin/broadcasts", "/api/admin/broadcasts", auth="admin",
+             json={"message": "Budget check", "audience": "admins"}),
+        Call("GET", "/api/admin/broadcasts", "/api/admin/broadcasts", auth="admin"),
+        Call("GET", "/api/admin/broadcasts/{broadcast_id}", f"/api/admin/broadcasts/{ids['broadcast_to_cancel']}",
+             auth="admin"),
+        Call("POST", "/api/admin/broadcasts/{broadcast_id}/cancel",
+             f"/api/admin/broadcasts/{ids['broadcast_to_cancel']}/cancel", auth="admin"),
+        Call("POST", "/api/admin/broadcasts/{broadcast_id}/resume",
+             f"/api/admin/broadcasts/{ids['broadcast_to_resume']}/resume", auth="admin"),
+        Call("GET", "/api/telegram/link", "/api/telegram/link"),
+        Call("POST", "/api/telegram/webhook", "/api/telegram/webhook", auth=None,
+             headers={"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET},
+             json={"update_id": 1, "message": {"message_id": 1, "date": 0, "text": "hello",
+                                               "chat": {"id": 1, "type": "private"}}}),
+    ]
+
+def uncovered_endpoints(app, calls: List[Call]) -> List[Tuple[str, str]]:
+    """Routes of the app that are neither budgeted nor skipped"""
+    from fastapi.routing import APIRoute
+    from app.core.query_budget import ENDPOINT_QUERY_BUDGETS
+
+    covered = {(c.method, c.route) for c in calls} | set(ENDPOINT_QUERY_BUDGETS) | SKIPPED_ENDPOINTS
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.include_in_schema:
+            continue
+        for method in sorted(route.methods):
+            if (method, route.path) not in covered:
+                missing.append((method, route.path))
+    return missing
+
+async def run(verbose: bool) -> int:
+    use_database("sqlite://:memory:")
+    from app.core.config import settings
+    from app.main import app
+    from app.core.instrumentation import instrument_tortoise
+    from app.core.query_budget import budget_for, capture_queries
+
+    instrument_tortoise()
+    settings.TELEGRAM_WEBHOOK_SECRET = WEBHOOK_SECRET
+    results: List[Result] = []
+
+    async with running_app(app) as client:
+        ids = await seed()
+        headers = {
+            "student": token_headers(ids["student"]),
+            "other": token_headers(ids["other"]),
+            "admin": token_headers(ids["admin"]),
+            None: {},
+        }
+        calls = build_calls(ids)
+
+        for call in calls:
+            with capture_queries() as stats:
+                response = await client.request(
+                    call.method,
+                    call.path,
+                    headers={**headers[call.auth], **call.headers},
+                    json=call.json,
+                    data=call.data,
+                    params=call.params
+                )
+            results.append(Result(call, response.status_code, stats.query_count,
+                                  budget_for(call.method, call.route), stats.statements))
+
+    failures = 0
+    for result in results:
+        budget = "-" if result.budget is None else str(result.budget)
+        verdict = "ok" if result.ok else "FAIL"
+        failures += not result.ok
+        print(f"{verdict:<5} {result.status:>3} {result.queries:>3}/{budget:<3} {result.call.method:<6} {result.call.route}")
+        if verbose or not result.ok:
+            for i, sql in enumerate(result.statements, 1):
+                print(f"        {i}. {sql[:200]}")
+
+    missing = uncovered_endpoints(app, calls)
+    for method, path in missing:
+        print(f"FAIL  no query budget declared for {method} {path}")
+
+    total = failures + len(missing)
+    print(f"\n{len(results)} endpoints checked, {total} problem(s)")
+    return 1 if total else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the statements of every call")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.verbose)))
+
+if __name__ == "__main__":
+    main()
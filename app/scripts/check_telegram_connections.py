@@ -0,0 +1,158 @@
+"""
+Connection reuse check for the Telegram Bot API client.
+
+Starts a local HTTP/1.1 stand-in for the Bot API (keep-alive, fixed latency
+per call) that counts TCP connections, then points a bot built by
+app.services.telegram_service.build_bot() at it and sends bursts of
+messages through TelegramService:
+
+    - a burst never opens more connections than the pool size
+    - later bursts reuse the pooled connections (no new connections)
+    - TelegramService.stop() closes every connection
+
+For comparison the same bursts are sent with python-telegram-bot's default
+pool of one connection. Exits with status 1 when a check fails.
+
+Usage:
+    python -m app.scripts.check_telegram_connections --messages 100 --pool-size 16
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, Tuple
+from urllib.parse import parse_qs
+
+from app.services.telegram_service import TelegramService, build_bot
+
+TOKEN = "123456:LOCAL-STAND-IN"
+
+class StandInBotAPI:
+    """Minimal Bot API over HTTP/1.1 keep-alive that counts connections"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections_opened = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.requests = 0
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections_opened += 1
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                status, payload = self._respond(request_line.decode("latin-1").split()[1], body)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: keep-alive\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    @staticmethod
+    def _respond(path: str, body: bytes) -> Tuple[str, bytes]:
+        method = path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Stand-in", "username": "stand_in_bot"}
+        elif method == "sendMessage":
+            # python-telegram-bot posts parameters form-encoded
+            params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+            result = {"message_id": 1, "date": int(time.time()),
+                      "chat": {"id": int(params["chat_id"]), "type": "private"}, "text": params.get("text", "")}
+        else:
+            return "404 Not Found", json.dumps({"ok": False, "error_code": 404, "description": "Not Found"}).encode()
+        return "200 OK", json.dumps({"ok": True, "result": result}).encode()
+
+async def send_bursts(service: TelegramService, api: StandInBotAPI, messages: int, bursts: int):
+    """Send ``bursts`` bursts of ``messages`` concurrent messages; yield per-burst stats"""
+    results = []
+    for burst in range(bursts):
+        opened_before = api.connections_opened
+        started = time.perf_counter()
+        sent = await asyncio.gather(*(
+            service.send_message(str(1000 + n), f"Burst {burst} message {n}") for n in range(messages)
+        ))
+        results.append({
+            "burst": burst,
+            "sent": sum(sent),
+            "seconds": round(time.perf_counter() - started, 3),
+            "new_connections": api.connections_opened - opened_before,
+        })
+    return results
+
+async def measure(pool_size: int, args: argparse.Namespace) -> Tuple[list, StandInBotAPI]:
+    api = StandInBotAPI(args.latency)
+    port = await api.start()
+    service = TelegramService(bot=build_bot(
+        token=TOKEN,
+        base_url=f"http://127.0.0.1:{port}/bot",
+        pool_size=pool_size,
+        http_version="1.1"  # the stand-in speaks plain HTTP/1.1
+    ))
+    try:
+        await service.start()
+        bursts = await send_bursts(service, api, args.messages, args.bursts)
+        await service.stop()
+        await asyncio.sleep(0.05)  # let the server notice the closed sockets
+    finally:
+        await api.stop()
+    return bursts, api
+
+async def run(args: argparse.Namespace) -> int:
+    failures = []
+    for label, pool_size in (("ptb default", 1), ("configured", args.pool_size)):
+        bursts, api = await measure(pool_size, args)
+        print(f"[{label}] pool size {pool_size}: {api.connections_opened} connection(s) for "
+              f"{api.requests} requests, max {api.max_open_connections} open at once")
+        for b in bursts:
+            print(f"  burst {b['burst']}: {b['sent']}/{args.messages} sent in {b['seconds']}s, "
+                  f"{b['new_connections']} new connection(s)")
+        if api.max_open_connections > pool_size:
+            failures.append(f"{label}: {api.max_open_connections} connections open, pool size is {pool_size}")
+        if any(b["new_connections"] for b in bursts[1:]):
+            failures.append(f"{label}: later bursts opened new connections instead of reusing the pool")
+        if any(b["sent"] != args.messages for b in bursts):
+            failures.append(f"{label}: not every message was sent")
+        if api.open_connections:
+            failures.append(f"{label}: {api.open_connections} connection(s) still open after stop()")
+
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    return 1 if failures else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100, help="messages per burst")
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--pool-size", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the stand-in takes per call")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
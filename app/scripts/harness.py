@@ -0,0 +1,66 @@
+"""
+Helpers for running the API in-process against a throwaway database.
+
+Used by the query budget check and the benchmark scripts:
+
+    use_database("sqlite://:memory:")   # before the app starts
+    from app.main import app
+    async with running_app(app) as client:
+        headers = token_headers(user)
+        await client.get("/api/courses", headers=headers)
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+from telegram import Bot
+
+from app.core.config import TORTOISE_ORM
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+
+# Hash once, bcrypt is deliberately slow
+_PASSWORD_HASH_CACHE: Dict[str, str] = {}
+
+def use_database(db_url: str = "sqlite://:memory:") -> None:
+    """
+    Point the ORM config at another database.
+
+    Mutates the shared TORTOISE_ORM dict in place, so it must run before
+    the application lifespan starts. The aerich model is dropped because
+    the migration tool is not needed (and may not be installed) here.
+    """
+    TORTOISE_ORM["connections"]["default"] = db_url
+    app_config = TORTOISE_ORM["apps"]["models"]
+    app_config["models"] = [m for m in app_config["models"] if m != "aerich.models"]
+
+@asynccontextmanager
+async def running_app(app, bot: Optional[Bot] = None) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Run the app lifespan (ORM init, schema generation) and yield an in-process client
+
+    Telegram calls go to ``bot``, by default a simulated Bot API, so nothing
+    is ever sent to real users.
+    """
+    from app.services.telegram_fake import fake_bot
+    from app.services.telegram_service import telegram_service
+
+    real_bot, telegram_service.bot = telegram_service.bot, bot or fake_bot()
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                yield client
+    finally:
+        telegram_service.bot = real_bot
+
+async def create_user(email: str, password: str = "password123", **fields) -> User:
+    """Create a user directly in the database"""
+    if password not in _PASSWORD_HASH_CACHE:
+        _PASSWORD_HASH_CACHE[password] = get_password_hash(password)
+    return await User.create(email=email, hashed_password=_PASSWORD_HASH_CACHE[password], **fields)
+
+def token_headers(user: User) -> Dict[str, str]:
+    """Authorization headers for a user, without going through /login"""
+    token = create_access_token(data={"sub": str(user.id), "admin": user.is_admin})
+    return {"Authorization": f"Bearer {token}"}
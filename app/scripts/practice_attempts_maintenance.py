@@ -0,0 +1,40 @@
+"""
+Retention job for practice attempts; run daily (cron or a scheduled task).
+
+Creates the upcoming monthly partitions of user_practice_attempts
+(PostgreSQL), then rolls every whole month older than
+PRACTICE_ATTEMPT_RETENTION_DAYS up into practice_attempt_summaries
+(attempt count, correct attempts, first correct time per user and
+practice) and drops those months.
+
+Usage:
+    python -m app.scripts.practice_attempts_maintenance [--retention-days 180]
+"""
+import argparse
+import asyncio
+
+from tortoise import Tortoise
+
+from app.core.config import TORTOISE_ORM, settings
+from app.services.practice_attempts_service import PracticeAttemptStore
+
+async def run(args: argparse.Namespace) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        store = PracticeAttemptStore(retention_days=args.retention_days)
+        partitions = await store.ensure_partitions()
+        if partitions:
+            print(f"Partitions present: {', '.join(partitions)}")
+        result = await store.roll_up()
+        print(f"Rolled up {result['attempts']} attempts from {result['months']} month(s) "
+              f"into {result['summaries']} summaries")
+    finally:
+        await Tortoise.close_connections()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=int, default=settings.PRACTICE_ATTEMPT_RETENTION_DAYS)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Rebuild the course progress summaries (course_progress_summaries) from
+user_progress, user_courses and certificates.
+
+Run once after applying the migration that creates the table, and after
+importing progress or enrollments directly into the database.
+
+Usage:
+    python -m app.scripts.rebuild_progress_summaries [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import time
+
+from tortoise import Tortoise
+
+from app.core.config import TORTOISE_ORM
+from app.services.progress_service import progress_projection
+
+async def run(batch_size: int) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        started = time.perf_counter()
+        written = await progress_projection.rebuild(batch_size=batch_size)
+        print(f"Rebuilt {written} progress summaries in {time.perf_counter() - started:.1f}s")
+    finally:
+        await Tortoise.close_connections()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="users per batch")
+    asyncio.run(run(parser.parse_args().batch_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Re-issue the certificates of a course in parallel.
+
+Regenerates the PDF of every certificate of the course (e.g. after the
+course was renamed) and issues missing certificates to users who have
+completed it. PDFs are rendered in a process pool, --concurrency
+certificates at a time.
+
+Usage:
+    python -m app.scripts.reissue_certificates <course_id> [--concurrency 8]
+"""
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+from tortoise import Tortoise
+
+from app.core.config import TORTOISE_ORM, settings
+from app.services.certificate_service import certificate_service
+from app.services.telegram_service import telegram_service
+
+async def run(args: argparse.Namespace) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    await telegram_service.start()
+    certificate_service.start()
+    try:
+        started = time.perf_counter()
+        result = await certificate_service.reissue_course(args.course_id, args.concurrency)
+        print(f"{result['issued']} of {result['users']} certificates issued, {result['failed']} failed "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        await certificate_service.stop()
+        await telegram_service.stop()
+        await Tortoise.close_connections()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("course_id", type=UUID)
+    parser.add_argument("--concurrency", type=int, default=settings.CERTIFICATE_ISSUE_CONCURRENCY * 2)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Load scenarios for the core endpoints, driven in-process through the ASGI app.
+
+Scenarios:
+    course_content  GET /api/courses/{id}/content  (CourseContentService.get_course_content)
+    user_courses    GET /users/{id}/courses         (get_user_courses_service)
+    calendar_notes  GET /calendar/notes             (list_calendar_notes, 7 day window)
+    rate_limit      check_rate_limit() called directly with many distinct clients
+
+Each scenario reports throughput, p50/p95/p99 latency and SQL queries per
+request, and is compared with a stored baseline: a p95 more than
+``--tolerance`` slower, or more queries per request, counts as a regression.
+
+Usage:
+    # seed a database once, then benchmark it
+    python -m app.scripts.seed_benchmark_data --db-url sqlite://bench.sqlite3 --scale 0.01
+    python -m app.scripts.run_benchmarks --db-url sqlite://bench.sqlite3
+    python -m app.scripts.run_benchmarks --db-url sqlite://bench.sqlite3 --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.scripts.harness import running_app, token_headers, use_database
+
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+# Distinct client addresses, so the per-IP rate limiter does not throttle the driver
+CLIENT_POOL_SIZE = 64
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    throughput: float  # requests per second
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: float
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+async def drive(
+    name: str,
+    call: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int
+) -> ScenarioResult:
+    """
+    Run ``requests`` calls with at most ``concurrency`` in flight.
+
+    ``call(i)`` performs request number i and returns False on error.
+    """
+    from app.core.query_budget import capture_queries
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            with capture_queries() as stats:
+                started = time.perf_counter()
+                ok = await call(i)
+                latencies.append(time.perf_counter() - started)
+            queries.append(stats.query_count)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return ScenarioResult(
+        name=name,
+        requests=requests,
+        errors=errors,
+        throughput=round(requests / elapsed, 1),
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        queries_per_request=round(statistics.fmean(queries), 2) if queries else 0.0
+    )
+
+def client_pool(app) -> List[httpx.AsyncClient]:
+    return [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, client=(f"10.0.{n // 256}.{n % 256}", 40000)),
+            base_url="http://testserver"
+        )
+        for n in range(CLIENT_POOL_SIZE)
+    ]
+
+async def rate_limit_scenario(requests: int, distinct_clients: int) -> ScenarioResult:
+    """check_rate_limit() under a store that already tracks many clients"""
+    from starlette.requests import Request
+    from app.core.rate_limit import check_rate_limit, rate_limit_store
+
+    rate_limit_store.clear()
+
+    def request_from(n: int) -> Request:
+        return Request({
+            "type": "http",
+            "method": "GET",
+            "path": "/api/courses",
+            "headers": [],
+            "query_string": b"",
+            "server": ("testserver", 80),
+            "scheme": "http",
+            "client": (f"172.16.{n // 256 % 256}.{n % 256}", 40000),
+        })
+
+    prepared = [request_from(n) for n in range(distinct_clients)]
+    for request in prepared:
+        await check_rate_limit(request)
+
+    async def call(i: int) -> bool:
+        await check_rate_limit(prepared[i % distinct_clients])
+        return True
+
+    result = await drive("rate_limit", call, requests, concurrency=1)
+    rate_limit_store.clear()
+    return result
+
+async def run(args: argparse.Namespace) -> List[ScenarioResult]:
+    use_database(args.db_url)
+    from app.main import app
+    from app.core.instrumentation import instrument_tortoise
+    from app.models.course import Course
+    from app.models.course_content import UserProgress
+    from app.models.user import User
+    from app.scripts.seed_benchmark_data import DatasetConfig, seed
+
+    instrument_tortoise()
+    rng = random.Random(args.seed)
+    results: List[ScenarioResult] = []
+
+    async with running_app(app):
+        if args.seed_scale:
+            await seed(DatasetConfig(seed=args.seed).scaled(args.seed_scale))
+
+        course_ids = await Course.all().limit(20).values_list("id", flat=True)
+        # Users with enrollments, so the user_courses scenario returns real pages
+        user_ids = await UserProgress.all().limit(200).values_list("user_id", flat=True)
+        users = {u.id: u for u in await User.filter(id__in=set(user_ids))}
+        if not course_ids or not users:
+            raise SystemExit("Database is empty, seed it first (see --help)")
+        headers = {uid: token_headers(user) for uid, user in users.items()}
+        user_list = list(users)
+        clients = client_pool(app)
+        window_start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        def pick(i: int):
+            return clients[i % len(clients)], rng.choice(user_list)
+
+        async def course_content(i: int) -> bool:
+            client, uid = pick(i)
+            response = await client.get(f"/api/courses/{rng.choice(course_ids)}/content", headers=headers[uid])
+            return response.status_code == 200
+
+        async def user_courses(i: int) -> bool:
+            client, uid = pick(i)
+            response = await client.get(f"/users/{uid}/courses", params={"limit": 10}, headers=headers[uid])
+            return response.status_code == 200
+
+        async def calendar_notes(i: int) -> bool:
+            client, uid = pick(i)
+            start = window_start + timedelta(days=rng.randint(-25, 20))
+            response = await client.get("/calendar/notes", headers=headers[uid], params={
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=7)).isoformat()
+            })
+            return response.status_code == 200
+
+        scenarios: Dict[str, Callable[[int], Awaitable[bool]]] = {
+            "course_content": course_content,
+            "user_courses": user_courses,
+            "calendar_notes": calendar_notes,
+        }
+        try:
+            for name, call in scenarios.items():
+                if args.only and name not in args.only:
+                    continue
+                await drive(name, call, min(args.warmup, args.requests), args.concurrency)
+                results.append(await drive(name, call, args.requests, args.concurrency))
+        finally:
+            for client in clients:
+                await client.aclose()
+
+    if not args.only or "rate_limit" in args.only:
+        results.append(await rate_limit_scenario(args.requests * 10, args.rate_limit_clients))
+    return results
+
+def compare(results: List[ScenarioResult], baseline: Dict[str, dict], tolerance: float) -> int:
+    """Print results next to the baseline and count regressions"""
+    regressions = 0
+    header = f"{'scenario':<16}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>7}{'errors':>8}  vs baseline"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        note = ""
+        base = baseline.get(r.name)
+        if base:
+            p95_change = (r.p95_ms - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+            note = f"p95 {p95_change:+.0%}, q/req {r.queries_per_request - base['queries_per_request']:+.2f}"
+            if p95_change > tolerance or r.queries_per_request > base["queries_per_request"]:
+                regressions += 1
+                note += "  REGRESSION"
+        print(f"{r.name:<16}{r.throughput:>9}{r.p50_ms:>9}{r.p95_ms:>9}{r.p99_ms:>9}"
+              f"{r.queries_per_request:>7}{r.errors:>8}  {note}")
+        regressions += r.errors > 0
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite://bench.sqlite3")
+    parser.add_argument("--seed-scale", type=float, default=None,
+                        help="seed a dataset of this scale first (e.g. 0.001 with an in-memory database)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate-limit-clients", type=int, default=10_000)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update({r.name: asdict(r) for r in results})
+        baseline["_meta"] = {
+            "db_url": args.db_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{regressions} regression(s) against {args.baseline}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Deterministic large-dataset generator for benchmarks.
+
+The full-size dataset matches production-like volumes:
+100k users, 500 courses x 20 modules x 15 lessons x 10 content blocks,
+1M progress rows (with matching enrollments and progress summaries) and 50k
+calendar notes.
+``--scale`` shrinks the number of users, courses, progress rows and notes
+while keeping the shape of each course, so per-course payloads stay realistic.
+
+The same seed always produces the same rows (ids included), so benchmark
+runs are comparable across machines and commits.
+
+Usage:
+    python -m app.scripts.seed_benchmark_data --db-url sqlite://bench.sqlite3 --scale 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from tortoise import Tortoise
+
+from app.core.config import TORTOISE_ORM
+from app.core.security import get_password_hash
+from app.scripts.harness import use_database
+
+BLOCK_TYPES = ["heading", "paragraph", "paragraph", "code", "paragraph", "image", "code", "video", "paragraph", "practice"]
+LESSON_TYPES = ["theory", "theory", "practice", "video"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+
+@dataclass
+class DatasetConfig:
+    users: int = 100_000
+    courses: int = 500
+    modules_per_course: int = 20
+    lessons_per_module: int = 15
+    blocks_per_lesson: int = 10
+    progress_rows: int = 1_000_000
+    calendar_notes: int = 50_000
+    seed: int = 42
+    batch_size: int = 5_000
+
+    def scaled(self, scale: float) -> "DatasetConfig":
+        """Shrink the population while keeping the shape of each course"""
+        users = max(10, int(self.users * scale))
+        courses = max(2, int(self.courses * scale))
+        return DatasetConfig(
+            users=users,
+            courses=courses,
+            modules_per_course=self.modules_per_course,
+            lessons_per_module=self.lessons_per_module,
+            blocks_per_lesson=self.blocks_per_lesson,
+            progress_rows=min(max(10, int(self.progress_rows * scale)), users * courses),
+            calendar_notes=max(10, int(self.calendar_notes * scale)),
+            seed=self.seed,
+            batch_size=self.batch_size
+        )
+
+class _Ids:
+    """Deterministic UUID source"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def next(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+async def _bulk(model, rows: List, batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        await model.bulk_create(rows[start:start + batch_size])
+
+async def seed(config: DatasetConfig, log=print) -> Dict[str, List]:
+    """
+    Insert the dataset into the current Tortoise connection.
+
+    Returns:
+        dict: ids of the generated users, courses and lessons (for load scenarios)
+    """
+    from app.models.calendar import CalendarNote
+    from app.models.course import Course, CourseModule, Lesson, UserCourse
+    from app.models.course_content import BLOCK_POSITION_GAP, ContentBlock, CourseProgressSummary, UserProgress
+    from app.models.user import User
+
+    rng = random.Random(config.seed)
+    ids = _Ids(rng)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    password_hash = get_password_hash("benchmark-password")
+    lesson_text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16
+    code_text = "def solve(values):\n    return sorted(set(values))\n" * 4
+    started = time.perf_counter()
+
+    users = [
+        User(
+            id=i + 1,
+            email=f"user{i + 1}@bench.example",
+            hashed_password=password_hash,
+            name=f"User {i + 1}",
+            telegram_id=str(10_000_000 + i) if i % 3 == 0 else None,
+            telegram_chat_id=10_000_000 + i if i % 3 == 0 else None
+        )
+        for i in range(config.users)
+    ]
+    await _bulk(User, users, config.batch_size)
+    log(f"users: {len(users)} ({time.perf_counter() - started:.1f}s)")
+
+    course_ids, lesson_counts, course_lessons = [], [], {}
+    for c in range(config.courses):
+        course = Course(
+            id=ids.next(),
+            title=f"Benchmark course {c + 1}",
+            description=f"Course {c + 1} of the benchmark dataset",
+            full_description=lesson_text,
+            level=LEVELS[c % len(LEVELS)],
+            duration=f"{4 + c % 8} weeks",
+            image_url=f"https://cdn.example.com/courses/{c + 1}.png"
+        )
+        await course.save()
+        modules, lessons, blocks = [], [], []
+        for m in range(config.modules_per_course):
+            module = CourseModule(id=ids.next(), title=f"Module {m + 1}",
+                                  lessons_count=config.lessons_per_module, course_id=course.id)
+            modules.append(module)
+            for l in range(config.lessons_per_module):
+                lesson = Lesson(id=ids.next(), title=f"Lesson {m + 1}.{l + 1}",
+                                type=LESSON_TYPES[l % len(LESSON_TYPES)], content=lesson_text, module_id=module.id)
+                lessons.append(lesson)
+                for b in range(config.blocks_per_lesson):
+                    kind = BLOCK_TYPES[b % len(BLOCK_TYPES)]
+                    block = ContentBlock(id=ids.next(), type=kind, lesson_id=lesson.id,
+                                         position=(b + 1) * BLOCK_POSITION_GAP)
+                    if kind == "heading":
+                        block.level, block.text = 2, f"Section {b + 1}"
+                    elif kind == "paragraph":
+                        block.text = lesson_text
+                    elif kind == "code":
+                        block.language, block.code = "python", code_text
+                    elif kind == "video":
+                        block.video_id = f"video{b}"
+                    elif kind == "image":
+                        block.src, block.alt = "https://cdn.example.com/img.png", "diagram"
+                    else:
+                        block.description, block.validation_regex = "Type the answer", r"^\d+$"
+                    blocks.append(block)
+        await _bulk(CourseModule, modules, config.batch_size)
+        await _bulk(Lesson, lessons, config.batch_size)
+        await _bulk(ContentBlock, blocks, config.batch_size)
+        course_ids.append(course.id)
+        lesson_counts.append(len(lessons))
+        course_lessons[course.id] = [lesson.id for lesson in lessons]
+    log(f"courses: {len(course_ids)} with {sum(lesson_counts)} lessons ({time.perf_counter() - started:.1f}s)")
+
+    # Progress rows: user i % users, spread over distinct courses per user
+    progress, enrollments, summaries = [], [], []
+    for i in range(config.progress_rows):
+        user_index = i % config.users
+        course_index = (i // config.users + user_index * 7) % config.courses
+        course_id = course_ids[course_index]
+        lessons = course_lessons[course_id]
+        done = lessons[:rng.randint(0, len(lessons))]
+        percent = len(done) / len(lessons) * 100
+        progress.append(UserProgress(
+            id=ids.next(),
+            user_id=user_index + 1,
+            course_id=course_id,
+            completed_lessons=[str(l) for l in done],
+            completed_practices=[],
+            progress=percent,
+            last_accessed_lesson_id=done[-1] if done else None
+        ))
+        enrollments.append(UserCourse(
+            id=ids.next(),
+            user_id=user_index + 1,
+            course_id=course_id,
+            progress=percent,
+            status="completed" if percent >= 100 else "in_progress",
+            completed_at=now if percent >= 100 else None
+        ))
+        summaries.append(CourseProgressSummary(
+            user_id=user_index + 1,
+            course_id=course_id,
+            status="completed" if percent >= 100 else "in_progress",
+            percent=percent,
+            lessons_done=len(done),
+            lessons_total=len(lessons),
+            completed_lessons=[str(l) for l in done],
+            completed_practices=[],
+            last_lesson_id=done[-1] if done else None
+        ))
+        if len(progress) >= config.batch_size:
+            await UserProgress.bulk_create(progress)
+            await UserCourse.bulk_create(enrollments)
+            await CourseProgressSummary.bulk_create(summaries)
+            progress, enrollments, summaries = [], [], []
+    if progress:
+        await UserProgress.bulk_create(progress)
+        await UserCourse.bulk_create(enrollments)
+        await CourseProgressSummary.bulk_create(summaries)
+    log(f"progress rows: {config.progress_rows} ({time.perf_counter() - started:.1f}s)")
+
+    notes = [
+        CalendarNote(
+            title=f"Note {n + 1}",
+            description="Benchmark note",
+            date=now + timedelta(minutes=rng.randint(-30 * 24 * 60, 30 * 24 * 60)),
+            is_important=n % 5 == 0
+        )
+        for n in range(config.calendar_notes)
+    ]
+    await _bulk(CalendarNote, notes, config.batch_size)
+    log(f"calendar notes: {len(notes)} ({time.perf_counter() - started:.1f}s)")
+
+    return {
+        "user_ids": [u.id for u in users],
+        "course_ids": course_ids,
+        "lesson_ids": [lid for cid in course_ids for lid in course_lessons[cid]],
+    }
+
+async def _main(args: argparse.Namespace) -> None:
+    use_database(args.db_url)
+    config = DatasetConfig(seed=args.seed).scaled(args.scale)
+    print(f"Seeding {args.db_url}: {asdict(config)}")
+    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+    try:
+        await seed(config)
+    finally:
+        await Tortoise.close_connections()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite://bench.sqlite3")
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of the full dataset (e.g. 0.01)")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(_main(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Register (or remove) the bot webhook with Telegram.
+
+Points Telegram at TELEGRAM_WEBHOOK_URL (the public URL of
+/api/telegram/webhook) with TELEGRAM_WEBHOOK_SECRET as the secret token
+that the endpoint checks on every update.
+
+Usage:
+    python -m app.scripts.set_telegram_webhook
+    python -m app.scripts.set_telegram_webhook --delete
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.services.telegram_service import build_bot
+
+async def run(args: argparse.Namespace) -> int:
+    bot = build_bot()
+    async with bot:
+        if args.delete:
+            await bot.delete_webhook()
+            print("Webhook removed")
+            return 0
+        if not settings.TELEGRAM_WEBHOOK_URL or not settings.TELEGRAM_WEBHOOK_SECRET:
+            print("TELEGRAM_WEBHOOK_URL and TELEGRAM_WEBHOOK_SECRET must be set")
+            return 1
+        await bot.set_webhook(
+            url=settings.TELEGRAM_WEBHOOK_URL,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            allowed_updates=["message"],
+            max_connections=args.max_connections
+        )
+        info = await bot.get_webhook_info()
+        print(f"Webhook set to {info.url} (pending updates: {info.pending_update_count})")
+    return 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delete", action="store_true", help="remove the webhook instead")
+    parser.add_argument("--max-connections", type=int, default=40, help="parallel webhook deliveries Telegram may open")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from datetime import datetime, timezone
 from typing import List, Optional
+from uuid import UUID
+import orjson
 from pydantic import BaseModel
+from tortoise.expressions import Q, Subquery
 
+from app.core.config import settings
+from app.core.identity_map import current_identity_map
+from app.core.invalidation import invalidation_bus
 from app.core.security import get_admin_user, get_current_user
 from app.models.user import User
 from app.models.course import Course
-from app.models.user_course import UserCourse, Certificate
+from app.models.course import UserCourse, Certificate
+from app.models.broadcast import BroadcastAudience, BroadcastJob
+from app.schemas.broadcast import BroadcastCreate, BroadcastJobResponse
+from app.schemas.enrollment import BulkEnrollRequest
+from app.schemas.export import ExportDataset, ExportFormat
+from app.schemas.user import BulkUserUpdate, BulkUserUpdateResponse
 from app.services.telegram_service import telegram_service
+from app.services.broadcast_service import broadcast_service
+from app.services.enrollment_service import enrollment_service
+from app.services.export_service import export_service
 
 router = APIRouter()
 security = HTTPBearer()
@@ -233,4 +249,249 @@ async def toggle_admin_status(
         "email": user.email,
         "is_admin": user.is_admin,
         "message": f"Статус администратора {'назначен' if user.is_admin else 'снят'}"
-    } 
\ No newline at end of file
+    }
+
+def _bulk_user_query(request: BulkUserUpdate) -> Q:
+    if request.user_ids is not None:
+        return Q(id__in=request.user_ids)
+    conditions = request.filter.model_dump(exclude_none=True, exclude={"course_id", "created_after", "created_before"})
+    query = Q(**conditions)
+    if request.filter.course_id is not None:
+        query &= Q(id__in=Subquery(UserCourse.filter(course_id=request.filter.course_id).values("user_id")))
+    if request.filter.created_after is not None:
+        query &= Q(created_at__gte=request.filter.created_after)
+    if request.filter.created_before is not None:
+        query &= Q(created_at__lt=request.filter.created_before)
+    return query
+
+@router.post("/users/bulk-update", response_model=BulkUserUpdateResponse, summary="Массовое изменение пользователей")
+async def bulk_update_users(
+    request: BulkUserUpdate,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Изменяет активность, права администратора и роль у многих пользователей
+    одним запросом UPDATE
+    
+    Требует прав администратора
+    
+    Пользователи выбираются по списку ID (**user_ids**) или по фильтру
+    (**filter**: роль, активность, права администратора, запись на курс,
+    дата регистрации). Собственная учетная запись не изменяется.
+    
+    - **changes**: Новые значения is_active, is_admin и/или role
+    """
+    query = _bulk_user_query(request)
+    if request.user_ids is not None:
+        skipped_self = admin_user.id in request.user_ids
+    else:
+        skipped_self = await User.filter(query, id=admin_user.id).exists()
+
+    changes = request.changes.model_dump(exclude_none=True)
+    updated = await User.filter(query).exclude(id=admin_user.id).update(
+        **changes, updated_at=datetime.now(timezone.utc)
+    )
+
+    # Кэшированные данные пользователей (привязка чатов бота) сбрасываются во всех воркерах
+    if updated:
+        if request.user_ids is not None and len(request.user_ids) <= settings.BULK_USER_UPDATE_EVICT_MAX:
+            identity_map = current_identity_map()
+            for user_id in request.user_ids:
+                if identity_map is not None:
+                    identity_map.discard(User, user_id)
+                invalidation_bus.publish("user", user_id)
+        else:
+            invalidation_bus.publish("user")
+
+    return BulkUserUpdateResponse(updated=updated, skipped_self=skipped_self)
+
+@router.post(
+    "/courses/{course_id}/enrollments",
+    summary="Массовая запись пользователей на курс",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def bulk_enroll(
+    course_id: UUID,
+    request: BulkEnrollRequest,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Записывает пользователей на курс порциями (одна вставка на порцию)
+    
+    Требует прав администратора
+    
+    Ответ - NDJSON: по строке на каждую порцию (записано, уже были записаны,
+    неизвестные ID пользователей) и итоговая строка с `"done": true`.
+    Повторная запись безопасна: уже записанные пользователи пропускаются.
+    
+    - **course_id**: ID курса
+    - **user_ids**: ID пользователей
+    """
+    if not await enrollment_service.course_exists(course_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Курс с ID {course_id} не найден"
+        )
+
+    async def lines():
+        async for result in enrollment_service.bulk_enroll(course_id, request.user_ids):
+            yield orjson.dumps(result.model_dump()) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+EXPORT_MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv; charset=utf-8"}
+
+@router.get(
+    "/export/{dataset}",
+    summary="Выгрузка пользователей, записей на курсы или прогресса",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}, "application/gzip": {}}}}
+)
+async def export_dataset(
+    dataset: ExportDataset,
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    course_id: Optional[UUID] = None,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Выгружает таблицу целиком потоком, без пагинации на стороне клиента
+    
+    Требует прав администратора
+    
+    Строки читаются порциями по ключу (без OFFSET и без одной длинной
+    транзакции) и сразу отправляются клиенту.
+    
+    - **dataset**: users, enrollments или progress
+    - **format**: ndjson (по умолчанию) или csv
+    - **gzip**: Отдать файл .gz (иначе сжатие - по Accept-Encoding)
+    - **course_id**: Только записи (или пользователи) этого курса
+    """
+    if course_id is not None and not await enrollment_service.course_exists(course_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Курс с ID {course_id} не найден"
+        )
+
+    filename = f"{dataset.value}.{format.value}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_service.stream(dataset, format, course_id=course_id, gzip=gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _get_broadcast_or_404(broadcast_id: int) -> BroadcastJob:
+    job = await BroadcastJob.get_or_none(id=broadcast_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Рассылка с ID {broadcast_id} не найдена"
+        )
+    return job
+
+@router.post(
+    "/broadcasts",
+    response_model=BroadcastJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Запуск рассылки в Telegram"
+)
+async def create_broadcast(
+    request: BroadcastCreate,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Создает рассылку и запускает ее отправку в фоне
+    
+    Требует прав администратора
+    
+    - **message**: Текст сообщения
+    - **audience**: Получатели: all (все пользователи с Telegram ID), course (записанные на курс), admins
+    - **course_id**: ID курса для audience=course
+    
+    Получатели читаются из БД порциями и получают сообщения с ограничением
+    скорости бота; прогресс доступен через GET /broadcasts/{broadcast_id}
+    """
+    if request.audience == BroadcastAudience.COURSE and not await Course.exists(id=request.course_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Курс с ID {request.course_id} не найден"
+        )
+    return await broadcast_service.create_job(
+        message=request.message,
+        audience=request.audience,
+        course_id=request.course_id,
+        created_by=admin_user
+    )
+
+@router.get("/broadcasts", response_model=List[BroadcastJobResponse], summary="Получение списка рассылок")
+async def list_broadcasts(
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    limit: Optional[int] = 20,
+    offset: Optional[int] = 0
+):
+    """
+    Получает последние рассылки (новые первыми)
+    
+    Требует прав администратора
+    """
+    return await BroadcastJob.all().offset(offset).limit(limit)
+
+@router.get("/broadcasts/{broadcast_id}", response_model=BroadcastJobResponse, summary="Получение прогресса рассылки")
+async def get_broadcast(
+    broadcast_id: int,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Получает статус и счетчики отправки рассылки
+    
+    Требует прав администратора
+    """
+    return await _get_broadcast_or_404(broadcast_id)
+
+@router.post("/broadcasts/{broadcast_id}/resume", response_model=BroadcastJobResponse, summary="Возобновление рассылки")
+async def resume_broadcast(
+    broadcast_id: int,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Продолжает прерванную, остановленную или завершившуюся ошибкой рассылку
+    с последнего сохраненного получателя
+    
+    Требует прав администратора
+    """
+    job = await _get_broadcast_or_404(broadcast_id)
+    if not await broadcast_service.resume(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Рассылка {broadcast_id} уже выполняется или завершена"
+        )
+    await job.refresh_from_db()
+    return job
+
+@router.post("/broadcasts/{broadcast_id}/cancel", response_model=BroadcastJobResponse, summary="Остановка рассылки")
+async def cancel_broadcast(
+    broadcast_id: int,
+    admin_user: User = Depends(get_admin_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """
+    Останавливает рассылку после текущей порции получателей
+    
+    Требует прав администратора
+    """
+    job = await _get_broadcast_or_404(broadcast_id)
+    if not await broadcast_service.cancel(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Рассылка {broadcast_id} уже завершена"
+        )
+    await job.refresh_from_db()
+    return job
@@ -4,7 +4,7 @@ from tortoise.exceptions import DoesNotExist, IntegrityError
 from app.models.user import User
 from app.schemas.auth import UserRegistrationInput
 from app.core.security import get_password_hash, verify_password
-from app.core.telegram import validate_telegram_id
+from app.core.telegram import parse_telegram_id, validate_telegram_id
 
 async def get_user_by_email(email: str) -> Optional[User]:
     """Fetch a user by their email address."""
@@ -42,7 +42,9 @@ async def create_user(user_data: UserRegistrationInput) -> User:
             email=user_data.email,
             hashed_password=hashed_pass,
             name=user_data.name,
-            telegram_id=user_data.telegram_id
+            telegram_id=user_data.telegram_id,
+            # Numeric IDs are chat ids already; usernames are resolved once the user writes to the bot
+            telegram_chat_id=parse_telegram_id(user_data.telegram_id)[0]
         )
         return user
     except IntegrityError as e:
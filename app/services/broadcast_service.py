@@ -0,0 +1,328 @@
+import asyncio
+import contextvars
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from telegram.error import Forbidden, RetryAfter, TelegramError
+from tortoise import timezone
+from tortoise.expressions import F, Q, Subquery
+from tortoise.queryset import QuerySet
+
+from app.core.config import settings
+from app.models.broadcast import BroadcastAudience, BroadcastJob, BroadcastStatus
+from app.models.course import UserCourse
+from app.models.course_content import UserProgress
+from app.models.user import User
+from app.services.telegram_service import telegram_service
+
+logger = logging.getLogger(__name__)
+
+# How often one message is retried after Telegram answers 429 (flood control)
+MAX_FLOOD_RETRIES = 3
+
+class TokenBucket:
+    """
+    Async token bucket: at most ``rate`` acquisitions per second, bursts up to ``capacity``.
+
+    ``pause()`` stops every caller for a while, which is how a 429 with
+    retry_after from Telegram is honoured for the whole bot, not one send.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    delay = error.retry_after
+    return delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
+
+class BroadcastService:
+    """
+    Sends one message to many Telegram users.
+
+    Recipients are streamed from the database in keyset chunks ordered by
+    user id; each chunk is sent with bounded concurrency under a shared rate
+    limit, then the job's counters and cursor (``last_user_id``) are saved.
+    A job interrupted by a crash or restart resumes after the last saved
+    chunk, so at most one chunk can be delivered twice.
+
+    The heartbeat_at written by a worker is its claim on the job: it is
+    refreshed while a chunk is being sent and every later write is a
+    compare-and-set on it, so a worker whose job was taken over (or
+    cancelled and resumed) stops instead of sending alongside the new owner.
+    """
+
+    def __init__(
+        self,
+        rate: float = settings.TELEGRAM_BROADCAST_RATE,
+        concurrency: int = settings.TELEGRAM_BROADCAST_CONCURRENCY,
+        chunk_size: int = settings.TELEGRAM_BROADCAST_CHUNK_SIZE,
+        stale_seconds: int = settings.TELEGRAM_BROADCAST_STALE_SECONDS
+    ):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.stale_seconds = stale_seconds
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def recipients(job: BroadcastJob) -> QuerySet[User]:
+        """Users the broadcast goes to (active, with a resolved Telegram chat id)"""
+        # Users known only by an unresolved @username cannot be messaged, so they are not selected
+        query = User.filter(is_active=True, telegram_chat_id__isnull=False)
+        if job.audience == BroadcastAudience.ADMINS:
+            query = query.filter(is_admin=True)
+        elif job.audience == BroadcastAudience.COURSE:
+            # Enrolled, or progressing through the course without an enrollment row
+            query = query.filter(
+                Q(id__in=Subquery(UserCourse.filter(course_id=job.course_id).values("user_id")))
+                | Q(id__in=Subquery(UserProgress.filter(course_id=job.course_id).values("user_id")))
+            )
+        return query
+
+    async def create_job(
+        self,
+        message: str,
+        audience: BroadcastAudience,
+        course_id: Optional[UUID] = None,
+        created_by: Optional[User] = None
+    ) -> BroadcastJob:
+        """Store a pending broadcast with its recipient count and start sending it"""
+        job = BroadcastJob(message=message, audience=audience, course_id=course_id, created_by=created_by)
+        job.total_recipients = await self.recipients(job).count()
+        await job.save()
+        self.start(job.id)
+        return job
+
+    def is_running(self, job_id: int) -> bool:
+        task = self._tasks.get(job_id)
+        return task is not None and not task.done()
+
+    def start(self, job_id: int) -> bool:
+        """Run the job in the background of this process; False if it already runs here"""
+        if self.is_running(job_id):
+            return False
+        # Fresh context: the job outlives the request and must not count towards its metrics
+        task = asyncio.create_task(self._run(job_id), name=f"broadcast-{job_id}", context=contextvars.Context())
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return True
+
+    def is_stale(self, job: BroadcastJob) -> bool:
+        """Running job whose worker stopped sending heartbeats"""
+        return job.heartbeat_at is None or job.heartbeat_at < timezone.now() - timedelta(seconds=self.stale_seconds)
+
+    async def _claim(self, job: BroadcastJob) -> bool:
+        """
+        Mark the job as running by this process.
+
+        Compare-and-set on heartbeat_at, so when several workers try to resume
+        the same job only one of them wins.
+        """
+        query = BroadcastJob.filter(id=job.id, status__in=[BroadcastStatus.PENDING, BroadcastStatus.RUNNING])
+        if job.heartbeat_at is None:
+            query = query.filter(heartbeat_at__isnull=True)
+        else:
+            query = query.filter(heartbeat_at=job.heartbeat_at)
+        now = timezone.now()
+        claimed = await query.update(status=BroadcastStatus.RUNNING, heartbeat_at=now, started_at=job.started_at or now)
+        if claimed != 1:
+            return False
+        job.heartbeat_at = now
+        return True
+
+    def _owned(self, job: BroadcastJob) -> QuerySet[BroadcastJob]:
+        """The job row, as long as it still carries the heartbeat this worker wrote last"""
+        return BroadcastJob.filter(id=job.id, heartbeat_at=job.heartbeat_at)
+
+    async def _heartbeat(self, job: BroadcastJob, **values) -> bool:
+        """Refresh the heartbeat (and store ``values``); False once the job was cancelled or taken over"""
+        now = timezone.now()
+        updated = await self._owned(job).filter(status=BroadcastStatus.RUNNING).update(heartbeat_at=now, **values)
+        if updated:
+            job.heartbeat_at = now
+        return bool(updated)
+
+    async def _keep_alive(self, job: BroadcastJob, stop: asyncio.Event) -> None:
+        """Refresh the heartbeat until ``stop`` is set, so a slow chunk does not look abandoned"""
+        interval = max(1.0, self.stale_seconds / 3)
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            if not await self._heartbeat(job):
+                return
+
+    async def _run(self, job_id: int) -> None:
+        job = await BroadcastJob.get_or_none(id=job_id)
+        if job is None:
+            return
+        if job.status == BroadcastStatus.RUNNING and not self.is_stale(job):
+            logger.info("Broadcast %s is running in another worker", job_id)
+            return
+        if not await self._claim(job):
+            logger.info("Broadcast %s was claimed by another worker", job_id)
+            return
+
+        logger.info("Broadcast %s started at user id > %s (%s recipients)", job_id, job.last_user_id, job.total_recipients)
+        cursor = job.last_user_id
+        try:
+            while True:
+                rows: List[Tuple[int, str, int]] = await (
+                    self.recipients(job)
+                    .filter(id__gt=cursor)
+                    .order_by("id")
+                    .limit(self.chunk_size)
+                    .values_list("id", "telegram_id", "telegram_chat_id")
+                )
+                if not rows:
+                    break
+                stop = asyncio.Event()
+                keep_alive = asyncio.create_task(self._keep_alive(job, stop))
+                try:
+                    sent, failed = await self._send_chunk(job.message, rows)
+                finally:
+                    # Let a heartbeat in flight finish, so job.heartbeat_at matches the row
+                    stop.set()
+                    await keep_alive
+                cursor = rows[-1][0]
+                still_running = await self._save_progress(job, sent, failed, cursor)
+                if not still_running:
+                    logger.info("Broadcast %s stopped at user id %s (cancelled or taken over)", job_id, cursor)
+                    return
+
+            await self._owned(job).filter(status=BroadcastStatus.RUNNING).update(
+                status=BroadcastStatus.COMPLETED,
+                finished_at=timezone.now()
+            )
+            logger.info("Broadcast %s completed", job_id)
+        except asyncio.CancelledError:
+            # Shutdown: keep status RUNNING so the job is resumed from its cursor
+            raise
+        except Exception as e:
+            logger.exception("Broadcast %s failed at user id %s", job_id, cursor)
+            await self._owned(job).update(
+                status=BroadcastStatus.FAILED,
+                error=str(e),
+                finished_at=timezone.now()
+            )
+
+    async def _save_progress(self, job: BroadcastJob, sent: int, failed: int, cursor: int) -> bool:
+        """Store counters, cursor and heartbeat; False once the job is no longer running here"""
+        counters = dict(
+            sent_count=F("sent_count") + sent,
+            failed_count=F("failed_count") + failed,
+            last_user_id=cursor
+        )
+        if await self._heartbeat(job, **counters):
+            return True
+        # Cancelled meanwhile: still account for what this chunk delivered. A job taken
+        # over by another worker is left alone, that worker resends from the old cursor
+        await self._owned(job).update(**counters)
+        return False
+
+    async def _send_chunk(self, message: str, rows: List[Tuple[int, str, int]]) -> Tuple[int, int]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(telegram_id: str, chat_id: int) -> bool:
+            async with semaphore:
+                return await self._deliver(telegram_id, chat_id, message)
+
+        results = await asyncio.gather(*(send(telegram_id, chat_id) for _, telegram_id, chat_id in rows))
+        sent = sum(results)
+        return sent, len(results) - sent
+
+    async def _deliver(self, telegram_id: str, chat_id: int, message: str) -> bool:
+        for _ in range(MAX_FLOOD_RETRIES + 1):
+            await self.bucket.acquire()
+            try:
+                await telegram_service.deliver(telegram_id, message, chat_id)
+                return True
+            except RetryAfter as e:
+                delay = _retry_after_seconds(e)
+                logger.warning("Telegram flood control, pausing broadcasts for %.1fs", delay)
+                self.bucket.pause(delay)
+            except Forbidden:
+                # The user blocked the bot or never started it
+                return False
+            except TelegramError as e:
+                logger.warning("Broadcast message to %s failed: %s", telegram_id, e)
+                return False
+        return False
+
+    async def resume(self, job: BroadcastJob) -> bool:
+        """
+        Continue a failed, cancelled or abandoned job from its cursor.
+
+        Returns:
+            bool: False if the job is completed or still running somewhere
+        """
+        if job.status == BroadcastStatus.COMPLETED or self.is_running(job.id):
+            return False
+        if job.status == BroadcastStatus.RUNNING and not self.is_stale(job):
+            return False
+        if job.status in (BroadcastStatus.FAILED, BroadcastStatus.CANCELLED):
+            await BroadcastJob.filter(id=job.id, status=job.status).update(
+                status=BroadcastStatus.PENDING,
+                error=None,
+                finished_at=None,
+                heartbeat_at=None
+            )
+        return self.start(job.id)
+
+    async def cancel(self, job: BroadcastJob) -> bool:
+        """Stop a pending or running job after its current chunk"""
+        return bool(await BroadcastJob.filter(
+            id=job.id,
+            status__in=[BroadcastStatus.PENDING, BroadcastStatus.RUNNING]
+        ).update(status=BroadcastStatus.CANCELLED, finished_at=timezone.now()))
+
+    async def resume_interrupted(self) -> List[int]:
+        """Restart pending jobs and running jobs abandoned by a dead worker (called on startup)"""
+        jobs = await BroadcastJob.filter(status__in=[BroadcastStatus.PENDING, BroadcastStatus.RUNNING])
+        resumed = [job.id for job in jobs if job.status == BroadcastStatus.PENDING or self.is_stale(job)]
+        for job_id in resumed:
+            self.start(job_id)
+        if resumed:
+            logger.info("Resuming broadcasts %s", resumed)
+        return resumed
+
+    async def shutdown(self) -> None:
+        """Stop local jobs and release them so the next process resumes them immediately"""
+        job_ids = list(self._tasks)
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        if job_ids:
+            await BroadcastJob.filter(id__in=job_ids, status=BroadcastStatus.RUNNING).update(heartbeat_at=None)
+
+# Create a global instance
+broadcast_service = BroadcastService()
@@ -30,6 +30,7 @@ async def create_calendar_note(
             try:
                 await telegram_service.send_calendar_notification(
                     telegram_id=current_user.telegram_id,
+                    chat_id=current_user.telegram_chat_id,
                     note_title=note.title,
                     note_date=note.date.strftime("%d.%m.%Y %H:%M"),
                     note_description=note.description,
@@ -74,6 +75,7 @@ async def update_calendar_note(
             try:
                 await telegram_service.send_calendar_notification(
                     telegram_id=current_user.telegram_id,
+                    chat_id=current_user.telegram_chat_id,
                     note_title=note.title,
                     note_date=note.date.strftime("%d.%m.%Y %H:%M"),
                     note_description=note.description,
@@ -160,6 +162,7 @@ async def send_note_reminder(
         # Отправляем напоминание
         success = await telegram_service.send_calendar_notification(
             telegram_id=current_user.telegram_id,
+            chat_id=current_user.telegram_chat_id,
             note_title=note.title,
             note_date=note.date.strftime("%d.%m.%Y %H:%M"),
             note_description=note.description,
@@ -209,6 +212,7 @@ async def send_daily_reminder(
         # Отправляем ежедневное напоминание
         success = await telegram_service.send_daily_reminder(
             telegram_id=current_user.telegram_id,
+            chat_id=current_user.telegram_chat_id,
             notes_count=len(notes),
             upcoming_notes=upcoming_notes
         )
@@ -265,6 +269,7 @@ async def delete_calendar_note(
             try:
                 await telegram_service.send_calendar_notification(
                     telegram_id=current_user.telegram_id,
+                    chat_id=current_user.telegram_chat_id,
                     note_title=note_title,
                     note_date=note_date,
                     note_description=note_description,
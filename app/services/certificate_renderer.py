@@ -0,0 +1,112 @@
+"""
+Certificate rendering to PDF.
+
+Pure functions with no app imports, so they can run in a worker process
+(see app.services.certificate_service). The PDF is written by hand with
+the standard Helvetica fonts, which need no font files but only cover
+Windows-1252: Cyrillic names and titles are transliterated.
+"""
+from typing import Dict, List
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595  # A4 landscape, points
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_BOLD_FACTOR = 1.06  # Helvetica-Bold is slightly wider
+
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+def transliterate(text: str) -> str:
+    out = []
+    for char in text:
+        latin = _CYRILLIC.get(char.lower())
+        if latin is None:
+            out.append(char)
+        elif char.isupper():
+            out.append(latin.capitalize())
+        else:
+            out.append(latin)
+    return "".join(out)
+
+def _encode(text: str) -> bytes:
+    raw = transliterate(text).encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    width = sum(
+        _HELVETICA_WIDTHS[ord(c) - 32] if 32 <= ord(c) <= 126 else 556
+        for c in transliterate(text)
+    )
+    return width * size / 1000 * (_BOLD_FACTOR if bold else 1.0)
+
+def _fit(text: str, size: float, bold: bool, max_width: float) -> float:
+    """Largest font size up to ``size`` at which ``text`` fits ``max_width``"""
+    width = text_width(text, size, bold)
+    return size if width <= max_width else max(10.0, size * max_width / width)
+
+def _centered(text: str, y: float, size: float, bold: bool = False) -> bytes:
+    size = _fit(text, size, bold, PAGE_WIDTH - 120)
+    x = (PAGE_WIDTH - text_width(text, size, bold)) / 2
+    font = b"/F2" if bold else b"/F1"
+    return b"BT %s %.1f Tf %.1f %.1f Td (%s) Tj ET\n" % (font, size, x, y, _encode(text))
+
+def render_certificate_pdf(data: Dict[str, str]) -> bytes:
+    """
+    Render a one-page certificate.
+
+    Args:
+        data: ``name``, ``course``, ``issued`` (display date) and ``certificate_id``
+
+    Returns:
+        bytes: The PDF document
+    """
+    content = b"".join([
+        b"0.18 0.31 0.56 RG 6 w 24 24 794 547 re S\n",
+        b"0.6 0.7 0.85 RG 1.5 w 36 36 770 523 re S\n",
+        b"0.18 0.31 0.56 rg\n",
+        _centered("CERTIFICATE OF COMPLETION", 470, 34, bold=True),
+        b"0.2 0.2 0.2 rg\n",
+        _centered("This certifies that", 400, 16),
+        _centered(data["name"], 350, 30, bold=True),
+        _centered("has successfully completed the course", 300, 16),
+        _centered(data["course"], 250, 24, bold=True),
+        _centered(f"Issued {data['issued']}", 160, 13),
+        b"0.5 0.5 0.5 rg\n",
+        _centered(f"Certificate ID {data['certificate_id']}", 70, 9),
+    ])
+
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Title (%s) /Producer (Edu Events Platform) >>" % _encode(f"Certificate - {data['course']}"),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, len(objects), xref
+    )
+    return bytes(pdf)
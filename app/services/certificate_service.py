@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from tortoise.exceptions import IntegrityError
+
+from app.core.config import settings
+from app.core.entity_cache import entity_cache
+from app.core.storage import LocalObjectStore, object_store
+from app.models.course import Certificate, Course, CourseStatus, UserCourse
+from app.models.course_content import CourseProgressSummary
+from app.models.user import User
+from app.services.certificate_renderer import render_certificate_pdf
+from app.services.progress_service import progress_projection
+from app.services.telegram_service import telegram_service
+
+logger = logging.getLogger(__name__)
+
+# How long a worker that lost the race to create a certificate waits for the winner's PDF
+CONCURRENT_ISSUE_WAIT_SECONDS = 10.0
+CONCURRENT_ISSUE_POLL_SECONDS = 0.25
+
+class CertificateService:
+    """
+    Issues course certificates in the background.
+
+    Completing a course only enqueues ``(user_id, course_id)``; queue
+    workers create the Certificate, render the PDF in a process pool (so
+    rendering never blocks the event loop), store it in the object store,
+    mark the progress summary and notify the user in Telegram.
+    ``reissue_course()`` regenerates every certificate of a course in
+    parallel, e.g. after the course was renamed.
+    """
+
+    def __init__(
+        self,
+        store: LocalObjectStore = object_store,
+        render_workers: int = settings.CERTIFICATE_RENDER_WORKERS,
+        concurrency: int = settings.CERTIFICATE_ISSUE_CONCURRENCY,
+        queue_size: int = settings.CERTIFICATE_QUEUE_SIZE
+    ):
+        self.store = store
+        self.render_workers = render_workers
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: Set[Tuple[int, UUID]] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and DB connections is unsafe
+        return ProcessPoolExecutor(self.render_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def start(self) -> None:
+        """Start the render processes and queue workers (called from the app lifespan)"""
+        if self.running:
+            return
+        self._executor = self._new_executor()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"certificates-{n}")
+            for n in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Finish queued certificates (up to ``timeout`` seconds), then stop"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %s queued certificates on shutdown", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def enqueue(self, user_id: int, course_id: UUID) -> bool:
+        """
+        Queue certificate issue for a completed course.
+
+        Returns:
+            bool: False if the service is not running or the queue is full
+        """
+        key = (user_id, course_id)
+        if key in self._pending:
+            return True
+        if not self.running:
+            logger.warning("Certificate service is not running, not issuing for user %s course %s", user_id, course_id)
+            return False
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            logger.error("Certificate queue is full, not issuing for user %s course %s", user_id, course_id)
+            return False
+        self._pending.add(key)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            user_id, course_id = await self._queue.get()
+            try:
+                await self.issue(user_id, course_id)
+            except Exception:
+                logger.exception("Failed to issue certificate for user %s course %s", user_id, course_id)
+            finally:
+                self._pending.discard((user_id, course_id))
+                self._queue.task_done()
+
+    async def render(self, data: Dict[str, str]) -> bytes:
+        """Render in the process pool, or in a thread when the service is not started (scripts)"""
+        if not self._executor:
+            return await asyncio.to_thread(render_certificate_pdf, data)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, render_certificate_pdf, data)
+        except BrokenProcessPool:
+            # A render process died; replace the pool so later certificates still render
+            logger.error("Certificate render pool is broken, restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            raise
+
+    async def issue(self, user_id: int, course_id: UUID, reissue: bool = False, notify: bool = True) -> Optional[Certificate]:
+        """
+        Issue (or with ``reissue`` regenerate) the certificate of a user for a course.
+
+        Returns:
+            Optional[Certificate]: The certificate, None if the user or course does not
+                exist. Its ``certificate_url`` is None if another worker issuing it
+                concurrently has not stored the PDF within ``CONCURRENT_ISSUE_WAIT_SECONDS``
+        """
+        user = await User.get_or_none(id=user_id)
+        course = await entity_cache.get(Course, course_id)
+        if not user or not course:
+            return None
+
+        now = datetime.now(timezone.utc)
+        user_course, _ = await UserCourse.get_or_create(
+            user_id=user_id,
+            course_id=course_id,
+            defaults={"progress": 100.0, "status": CourseStatus.COMPLETED, "completed_at": now}
+        )
+        certificate = await Certificate.get_or_none(user_course_id=user_course.id)
+        if certificate and certificate.certificate_url and not reissue:
+            return certificate
+        first_issue = certificate is None or not certificate.certificate_url
+        if certificate is None:
+            try:
+                certificate = await Certificate.create(user_course_id=user_course.id)
+            except IntegrityError:
+                # Issued concurrently by another worker
+                return await self._wait_for_pdf(user_course.id)
+
+        pdf = await self.render({
+            "name": user.name or user.email,
+            "course": course.title,
+            "issued": certificate.issued_at.strftime("%d.%m.%Y"),
+            "certificate_id": str(certificate.id),
+        })
+        certificate.certificate_url = await self.store.put(f"certificates/{certificate.id}.pdf", pdf)
+        await certificate.save(update_fields=["certificate_url"])
+
+        user_course.progress = 100.0
+        user_course.status = CourseStatus.COMPLETED
+        user_course.completed_at = user_course.completed_at or now
+        user_course.certificate_id = str(certificate.id)
+        await user_course.save(update_fields=["progress", "status", "completed_at", "certificate_id", "last_accessed_at"])
+        await progress_projection.certificate_issued(user_id, course_id)
+
+        if first_issue and notify and user.telegram_id:
+            await telegram_service.send_certificate_notification(
+                user.telegram_id, course.title, certificate.certificate_url, chat_id=user.telegram_chat_id
+            )
+        logger.info("Issued certificate %s for user %s course %s", certificate.id, user_id, course_id)
+        return certificate
+
+    @staticmethod
+    async def _wait_for_pdf(user_course_id: int) -> Certificate:
+        """The certificate another worker is issuing, once its PDF is stored (or still pending after the wait)"""
+        deadline = time.monotonic() + CONCURRENT_ISSUE_WAIT_SECONDS
+        while True:
+            certificate = await Certificate.get(user_course_id=user_course_id)
+            if certificate.certificate_url or time.monotonic() >= deadline:
+                return certificate
+            await asyncio.sleep(CONCURRENT_ISSUE_POLL_SECONDS)
+
+    async def reissue_course(self, course_id: UUID, concurrency: Optional[int] = None) -> Dict[str, int]:
+        """
+        Regenerate the certificates of a course, and issue missing ones for
+        users who completed it, ``concurrency`` at a time. Only users getting
+        their first certificate are notified.
+
+        Returns:
+            Dict[str, int]: Counts of issued and failed certificates
+        """
+        certified = set(await Certificate.filter(user_course__course_id=course_id).values_list("user_course__user_id", flat=True))
+        completed = await CourseProgressSummary.filter(course_id=course_id, percent__gte=100).values_list("user_id", flat=True)
+        user_ids = sorted(certified | set(completed))
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        result = {"users": len(user_ids), "issued": 0, "failed": 0}
+
+        async def reissue(user_id: int) -> None:
+            async with semaphore:
+                try:
+                    await self.issue(user_id, course_id, reissue=True, notify=user_id not in certified)
+                    result["issued"] += 1
+                except Exception:
+                    logger.exception("Failed to re-issue certificate for user %s course %s", user_id, course_id)
+                    result["failed"] += 1
+
+        await asyncio.gather(*(reissue(user_id) for user_id in user_ids))
+        return result
+
+# Create a global instance
+certificate_service = CertificateService()
@@ -1,15 +1,39 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException, status
-from app.models.course import Course, CourseModule, Lesson
-from app.models.course_content import ContentBlock, UserProgress, UserPracticeAttempt
+from tortoise.functions import Count
+from tortoise.transactions import in_transaction
+from app.models.course import Certificate, Course, CourseModule, Lesson
+from app.models.course_content import ContentBlock, ContentBlockType, UserProgress, UserPracticeAttempt
 from app.models.user import User
+from app.core.cache import TTLCache
+from app.core.entity_cache import entity_cache
+from app.core.identity_map import get_entities, get_entity
+from app.core.compression import CompressedSnapshot
+from app.core.config import settings
+from app.core.responses import parse_json, render_json
+from app.services.course_tree import fetch_course_content_json, json_tree_available
+from app.services.certificate_service import certificate_service
+from app.services.practice_attempts_service import practice_attempt_store
+from app.services.progress_service import progress_projection
 from app.schemas.course_content import (
     CourseContent,
+    CourseOutline,
+    LessonContentResponse,
     CompleteLessonRequest,
     CompleteLessonResponse,
     ValidatePracticeRequest,
     ValidatePracticeResponse,
-    CourseProgress
+    CourseProgress,
+    ProgressEventType,
+    ProgressSyncRequest,
+    ProgressSyncResponse,
+    RejectedProgressEvent,
+    SyncedCourseProgress,
+    PracticeAttemptsResponse,
+    PracticeAttemptRollup,
+    CourseCertificateResponse
 )
 import logging
 import traceback
@@ -18,14 +42,30 @@ from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
+CONTENT_BLOCK_FIELDS = (
+    "id", "type", "position", "level", "text", "language", "code", "video_id", "src", "alt",
+    "practice_id", "description", "task_type", "validation_regex", "placeholder", "created_at", "updated_at"
+)
+
 class CourseContentService:
-    async def get_course_content(self, course_id: UUID, user_id: UUID) -> CourseContent:
+    def __init__(self):
+        # Both caches are keyed by the course's content_version, which every edit bumps
+        self._outlines = TTLCache(
+            maxsize=settings.COURSE_OUTLINE_CACHE_SIZE,
+            ttl=settings.COURSE_CONTENT_CACHE_TTL_SECONDS
+        )
+        self._lessons = TTLCache(
+            maxsize=settings.LESSON_CONTENT_CACHE_SIZE,
+            ttl=settings.COURSE_CONTENT_CACHE_TTL_SECONDS
+        )
+
+    async def get_course_content(self, course_id: UUID, user_id: int) -> CourseContent:
         """
         Get course content with progress tracking.
         
         Args:
             course_id: UUID of the course
-            user_id: UUID of the user
+            user_id: ID of the user
             
         Returns:
             CourseContent: Course content with all modules and lessons
@@ -35,13 +75,23 @@ class CourseContentService:
         """
         try:
             # Check if user is enrolled in the course
-            user = await User.get_or_none(id=user_id)
+            user = await get_entity(User, user_id)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User not found"
                 )
             
+            if json_tree_available():
+                # One round trip on PostgreSQL (see app.services.course_tree)
+                tree = await fetch_course_content_json(course_id)
+                if tree is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Course not found"
+                    )
+                return parse_json(tree, CourseContent)
+            
             # Get course with all relationships
             course = await Course.get_or_none(id=course_id).prefetch_related(
                 'modules',
@@ -62,6 +112,7 @@ class CourseContentService:
             return CourseContent(
                 id=course.id,
                 title=course.title,
+                content_version=course.content_version,
                 modules=[
                     {
                         "id": module.id,
@@ -75,6 +126,7 @@ class CourseContentService:
                                     {
                                         "id": block.id,
                                         "type": block.type,
+                                        "position": block.position,
                                         "level": block.level,
                                         "text": block.text,
                                         "language": block.language,
@@ -110,6 +162,144 @@ class CourseContentService:
                 detail=f"An error occurred while getting course content: {str(e)}"
             )
 
+    async def _get_outline(self, course_id: UUID) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        The course row and its cached structure (modules, lessons, block counts).
+
+        Costs one query while the structure is cached for the current content version.
+
+        Raises:
+            HTTPException: If course not found
+        """
+        course = await Course.filter(id=course_id).first().values("id", "title", "content_version")
+        if not course:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+        structure = await self._outlines.get_or_load(
+            (course_id, course["content_version"]),
+            lambda: self._load_outline(course_id)
+        )
+        return course, structure
+
+    @staticmethod
+    async def _load_outline(course_id: UUID) -> Dict[str, Any]:
+        modules = {
+            m["id"]: {"id": m["id"], "title": m["title"], "lessons": []}
+            for m in await CourseModule.filter(course_id=course_id).values("id", "title")
+        }
+        blocks_count = {
+            row["lesson_id"]: row["count"]
+            for row in await ContentBlock.filter(lesson__module__course_id=course_id).annotate(
+                count=Count("id")
+            ).group_by("lesson_id").values("lesson_id", "count")
+        }
+        for lesson in await Lesson.filter(module__course_id=course_id).values("id", "title", "type", "module_id"):
+            modules[lesson["module_id"]]["lessons"].append({
+                "id": lesson["id"],
+                "title": lesson["title"],
+                "type": lesson["type"],
+                "blocks_count": blocks_count.get(lesson["id"], 0),
+            })
+
+        # Reading order, for the "next lesson" prefetch hint
+        order = [(lesson["id"], module["id"]) for module in modules.values() for lesson in module["lessons"]]
+        lessons = {
+            lesson_id: {"module_id": module_id, "next_lesson_id": order[n + 1][0] if n + 1 < len(order) else None}
+            for n, (lesson_id, module_id) in enumerate(order)
+        }
+        return {"modules": list(modules.values()), "lessons": lessons}
+
+    async def get_course_outline(self, course_id: UUID, user_id: int) -> CourseOutline:
+        """
+        Get the course structure with the user's completion flags, without lesson content.
+        
+        Args:
+            course_id: UUID of the course
+            user_id: ID of the user
+            
+        Returns:
+            CourseOutline: Modules, lesson titles, block counts and completed lessons
+            
+        Raises:
+            HTTPException: If course not found
+        """
+        course, structure = await self._get_outline(course_id)
+        summary = await progress_projection.get(user_id, course_id)
+        completed = set(summary.completed_lessons) if summary else set()
+        return CourseOutline(
+            id=course["id"],
+            title=course["title"],
+            content_version=course["content_version"],
+            progress=summary.percent if summary else 0.0,
+            lessons_total=len(structure["lessons"]),
+            modules=[
+                {
+                    "id": module["id"],
+                    "title": module["title"],
+                    "lessons": [
+                        {**lesson, "completed": str(lesson["id"]) in completed}
+                        for lesson in module["lessons"]
+                    ]
+                }
+                for module in structure["modules"]
+            ]
+        )
+
+    async def get_lesson_version(self, course_id: UUID, lesson_id: UUID) -> Tuple[int, Dict[str, Any]]:
+        """
+        Check that a lesson belongs to a course, without loading the lesson.
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: The course's content version and the lesson's
+                ``module_id`` and ``next_lesson_id`` from the outline
+
+        Raises:
+            HTTPException: If course or lesson not found
+        """
+        course, structure = await self._get_outline(course_id)
+        lesson = structure["lessons"].get(lesson_id)
+        if lesson is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lesson not found"
+            )
+        return course["content_version"], lesson
+
+    async def get_lesson_snapshot(
+        self,
+        lesson_id: UUID,
+        content_version: int,
+        placement: Dict[str, Any]
+    ) -> CompressedSnapshot:
+        """
+        Get one lesson with its content blocks, rendered and cached per content version.
+        
+        Args:
+            lesson_id: UUID of the lesson
+            content_version: The course's current content version
+            placement: ``module_id`` and ``next_lesson_id`` from get_lesson_version
+            
+        Returns:
+            CompressedSnapshot: The rendered LessonContentResponse
+        """
+        async def load() -> CompressedSnapshot:
+            lesson = await Lesson.get(id=lesson_id).values("id", "title", "type", "content")
+            blocks = await ContentBlock.filter(lesson_id=lesson_id).values(*CONTENT_BLOCK_FIELDS)
+            content = LessonContentResponse(
+                **lesson,
+                **placement,
+                content_version=content_version,
+                content_blocks=blocks
+            )
+            return CompressedSnapshot(
+                render_json(content, LessonContentResponse),
+                minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+            )
+
+        return await self._lessons.get_or_load((lesson_id, content_version), load)
+
     async def complete_lesson(
         self,
         course_id: UUID,
@@ -131,49 +321,55 @@ class CourseContentService:
             HTTPException: If course, lesson or user not found
         """
         try:
-            # Get user
-            user = await User.get_or_none(id=request.user_id)
+            # Independent lookups run concurrently; the user usually comes from the identity map
+            user, course, lesson = await get_entities((User, request.user_id), (Course, course_id), (Lesson, lesson_id))
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User not found"
                 )
-            
-            # Get course and lesson
-            course = await Course.get_or_none(id=course_id)
             if not course:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Course not found"
                 )
-            
-            lesson = await Lesson.get_or_none(id=lesson_id)
             if not lesson:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Lesson not found"
                 )
             
-            # Get or create user progress
-            progress, created = await UserProgress.get_or_create(
-                user=user,
-                course=course,
-                defaults={
-                    "completed_lessons": [],
-                    "completed_practices": [],
-                    "progress": 0.0
-                }
-            )
-            
-            # Add lesson to completed lessons if not already there
-            if lesson_id not in progress.completed_lessons:
-                progress.completed_lessons.append(lesson_id)
-                
-                # Calculate new progress
-                total_lessons = await Lesson.filter(module__course=course).count()
-                progress.progress = (len(progress.completed_lessons) / total_lessons) * 100
+            # Get or create user progress; the row is locked so concurrent
+            # completions and progress syncs do not overwrite each other
+            async with in_transaction() as connection:
+                locked = UserProgress.filter(user_id=user.id, course_id=course.id).select_for_update().using_db(connection)
+                progress = await locked.first()
+                if progress is None:
+                    await UserProgress.bulk_create(
+                        [UserProgress(user_id=user.id, course_id=course.id, completed_lessons=[], completed_practices=[], progress=0.0)],
+                        ignore_conflicts=True,
+                        using_db=connection
+                    )
+                    progress = await locked.get()
                 
-                await progress.save()
+                # Add lesson to completed lessons if not already there
+                # (IDs are stored as strings, so compare as strings)
+                completed = str(lesson_id) not in map(str, progress.completed_lessons)
+                if completed:
+                    progress.completed_lessons.append(str(lesson_id))
+                    
+                    # Calculate new progress
+                    total_lessons = await Lesson.filter(module__course=course).using_db(connection).count()
+                    progress.progress = (len(progress.completed_lessons) / total_lessons) * 100
+                    progress.last_accessed_lesson_id = lesson_id
+                    
+                    await progress.save(using_db=connection)
+                    await progress_projection.record(progress, lessons_total=total_lessons, last_lesson_id=lesson_id, using_db=connection)
+            
+            if completed:
+                progress_projection.changed(user.id)
+                if progress.progress >= 100:
+                    certificate_service.enqueue(user.id, course.id)
             
             return CompleteLessonResponse(
                 success=True,
@@ -213,35 +409,27 @@ class CourseContentService:
             HTTPException: If course, lesson, practice or user not found
         """
         try:
-            # Get user
-            user = await User.get_or_none(id=request.user_id)
+            # Independent lookups run concurrently; the user usually comes from the identity map
+            (user, course, lesson), practice = await asyncio.gather(
+                get_entities((User, request.user_id), (Course, course_id), (Lesson, lesson_id)),
+                entity_cache.get(ContentBlock, practice_id)
+            )
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User not found"
                 )
-            
-            # Get course, lesson and practice
-            course = await Course.get_or_none(id=course_id)
             if not course:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Course not found"
                 )
-            
-            lesson = await Lesson.get_or_none(id=lesson_id)
             if not lesson:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Lesson not found"
                 )
-            
-            practice = await ContentBlock.get_or_none(
-                id=practice_id,
-                type="practice",
-                lesson=lesson
-            )
-            if not practice:
+            if not practice or practice.type != ContentBlockType.PRACTICE or practice.lesson_id != lesson_id:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Practice not found"
@@ -266,10 +454,15 @@ class CourseContentService:
             
             # Update progress if correct
             if is_correct:
-                progress = await UserProgress.get_or_none(user=user, course=course)
-                if progress and practice_id not in progress.completed_practices:
-                    progress.completed_practices.append(practice_id)
-                    await progress.save()
+                async with in_transaction() as connection:
+                    progress = await UserProgress.filter(user_id=user.id, course_id=course.id).select_for_update().using_db(connection).first()
+                    recorded = progress is not None and str(practice_id) not in map(str, progress.completed_practices)
+                    if recorded:
+                        progress.completed_practices.append(str(practice_id))
+                        await progress.save(using_db=connection)
+                        await progress_projection.record(progress, using_db=connection)
+                if recorded:
+                    progress_projection.changed(user.id)
             
             return ValidatePracticeResponse(
                 success=True,
@@ -288,17 +481,84 @@ class CourseContentService:
                 detail=f"An error occurred while validating practice: {str(e)}"
             )
 
+    async def get_practice_attempts(
+        self,
+        practice_id: UUID,
+        user_id: int,
+        limit: int = 20
+    ) -> PracticeAttemptsResponse:
+        """
+        Get the user's latest attempts at a practice.
+        
+        Args:
+            practice_id: UUID of the practice
+            user_id: ID of the user
+            limit: Number of recent attempts to return
+            
+        Returns:
+            PracticeAttemptsResponse: Recent attempts and the rollup of expired ones
+        """
+        try:
+            attempts, summary = await asyncio.gather(
+                practice_attempt_store.recent(user_id, practice_id, limit),
+                practice_attempt_store.summary(user_id, practice_id)
+            )
+            return PracticeAttemptsResponse(
+                practice_id=practice_id,
+                attempts=attempts,
+                rolled_up=PracticeAttemptRollup.model_validate(summary) if summary else None
+            )
+            
+        except Exception as e:
+            logger.error(f"Error getting practice attempts: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred while getting practice attempts: {str(e)}"
+            )
+
+    async def get_certificate(
+        self,
+        course_id: UUID,
+        user_id: int
+    ) -> CourseCertificateResponse:
+        """
+        Get the user's certificate for a course.
+        
+        Args:
+            course_id: UUID of the course
+            user_id: ID of the user
+            
+        Returns:
+            CourseCertificateResponse: The certificate and its download URL
+            
+        Raises:
+            HTTPException: If no certificate was issued
+        """
+        certificate = await Certificate.get_or_none(user_course__user_id=user_id, user_course__course_id=course_id)
+        if not certificate:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Certificate not found"
+            )
+        return CourseCertificateResponse(
+            id=certificate.id,
+            course_id=course_id,
+            issued_at=certificate.issued_at,
+            url=certificate.certificate_url
+        )
+
     async def get_course_progress(
         self,
         course_id: UUID,
-        user_id: UUID
+        user_id: int
     ) -> CourseProgress:
         """
         Get user's progress in a course.
         
         Args:
             course_id: UUID of the course
-            user_id: UUID of the user
+            user_id: ID of the user
             
         Returns:
             CourseProgress: User's progress in the course
@@ -307,39 +567,21 @@ class CourseContentService:
             HTTPException: If course or user not found
         """
         try:
-            # Get user
-            user = await User.get_or_none(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            # Get course
-            course = await Course.get_or_none(id=course_id)
-            if not course:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Course not found"
-                )
-            
-            # Get progress
-            progress = await UserProgress.get_or_none(user=user, course=course)
-            if not progress:
-                # Create new progress record
-                progress = await UserProgress.create(
-                    user=user,
-                    course=course,
-                    completed_lessons=[],
-                    completed_practices=[],
-                    progress=0.0
-                )
+            # One indexed lookup on the progress summary
+            summary = await progress_projection.get(user_id, course_id)
+            if not summary:
+                if not await entity_cache.get(Course, course_id):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Course not found"
+                    )
+                return CourseProgress(completed_lessons=[], completed_practices=[], progress=0.0)
             
             return CourseProgress(
-                completed_lessons=progress.completed_lessons,
-                completed_practices=progress.completed_practices,
-                progress=progress.progress,
-                last_accessed_lesson=progress.last_accessed_lesson.id if progress.last_accessed_lesson else None
+                completed_lessons=summary.completed_lessons,
+                completed_practices=summary.completed_practices,
+                progress=summary.percent,
+                last_accessed_lesson=summary.last_lesson_id
             )
             
         except HTTPException:
@@ -350,4 +592,197 @@ class CourseContentService:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error occurred while getting course progress: {str(e)}"
-            ) 
\ No newline at end of file
+            )
+
+    async def sync_progress(
+        self,
+        user_id: int,
+        request: ProgressSyncRequest
+    ) -> ProgressSyncResponse:
+        """
+        Apply a batch of offline progress events (lesson completions and practice answers).
+        
+        Events are applied in client time order. Repeated events (same
+        client_event_id, the same lesson twice, or the same practice answer at
+        the same time) are counted as duplicates; client_event_id is stored
+        with the practice attempt, so resending a batch does not record the
+        answers again. Events pointing at unknown
+        lessons or practices are rejected individually; the rest are written
+        in one transaction with bulk statements.
+        
+        Args:
+            user_id: ID of the user
+            request: ProgressSyncRequest with the events
+            
+        Returns:
+            ProgressSyncResponse: Counts and the resulting progress of every touched course
+        """
+        try:
+            # Deduplicate, oldest first
+            events = []
+            rejected: List[RejectedProgressEvent] = []
+            duplicates = 0
+            seen = set()
+            for index, event in sorted(enumerate(request.events), key=lambda item: item[1].occurred_at):
+                if event.type == ProgressEventType.PRACTICE_ANSWERED:
+                    if event.practice_id is None or event.answer is None:
+                        rejected.append(RejectedProgressEvent(index=index, detail="practice_id and answer are required"))
+                        continue
+                    key = event.client_event_id or (event.practice_id, event.answer, event.occurred_at)
+                else:
+                    key = (event.type, event.lesson_id)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                events.append((index, event))
+            
+            # Load everything the events refer to, one query per table
+            lesson_courses = {
+                row["id"]: row["course_id"]
+                for row in await Lesson.filter(id__in={e.lesson_id for _, e in events}).values(
+                    "id", course_id="module__course_id"
+                )
+            } if events else {}
+            practice_ids = {e.practice_id for _, e in events if e.practice_id}
+            practices = {
+                row["id"]: row
+                for row in await ContentBlock.filter(id__in=practice_ids, type=ContentBlockType.PRACTICE).values(
+                    "id", "lesson_id", "validation_regex"
+                )
+            } if practice_ids else {}
+            
+            valid = []
+            for index, event in events:
+                if lesson_courses.get(event.lesson_id) != event.course_id:
+                    rejected.append(RejectedProgressEvent(index=index, detail="Lesson not found in course"))
+                elif event.practice_id and (
+                    event.practice_id not in practices or practices[event.practice_id]["lesson_id"] != event.lesson_id
+                ):
+                    rejected.append(RejectedProgressEvent(index=index, detail="Practice not found in lesson"))
+                else:
+                    valid.append(event)
+            
+            course_ids = list(dict.fromkeys(e.course_id for e in valid))
+            lessons_total: Dict[UUID, int] = {}
+            if course_ids:
+                lessons_total = {
+                    row["course_id"]: row["total"]
+                    for row in await Lesson.filter(module__course_id__in=course_ids).annotate(
+                        total=Count("id")
+                    ).group_by("module__course_id").values("total", course_id="module__course_id")
+                }
+            
+            # Read, apply and write the progress rows under row locks, so lesson
+            # completions and other syncs running concurrently are not overwritten
+            progress: Dict[UUID, UserProgress] = {}
+            attempts: List[UserPracticeAttempt] = []
+            updated: List[UserProgress] = []
+            replayed = 0
+            async with in_transaction() as connection:
+                event_ids = [e.client_event_id for e in valid if e.practice_id and e.client_event_id]
+                if event_ids:
+                    # Answers already stored by an earlier sync are replays. The user row lock
+                    # serializes concurrent syncs of one user (the partitioned attempts table
+                    # cannot have a unique index without created_at)
+                    await User.filter(id=user_id).select_for_update().using_db(connection).values_list("id", flat=True)
+                    stored = set(await UserPracticeAttempt.filter(
+                        user_id=user_id, client_event_id__in=event_ids
+                    ).using_db(connection).values_list("client_event_id", flat=True))
+                    replayed = sum(1 for e in valid if e.practice_id and e.client_event_id in stored)
+                    valid = [e for e in valid if not (e.practice_id and e.client_event_id in stored)]
+                
+                # Lesson completions start the course's progress; create the missing rows first so they can be locked
+                started = list(dict.fromkeys(e.course_id for e in valid if e.type == ProgressEventType.LESSON_COMPLETED))
+                if started:
+                    await UserProgress.bulk_create(
+                        [
+                            UserProgress(user_id=user_id, course_id=course_id, completed_lessons=[], completed_practices=[], progress=0.0)
+                            for course_id in started
+                        ],
+                        ignore_conflicts=True,
+                        using_db=connection
+                    )
+                if course_ids:
+                    progress = {
+                        p.course_id: p
+                        for p in await UserProgress.filter(
+                            user_id=user_id, course_id__in=course_ids
+                        ).select_for_update().using_db(connection)
+                    }
+                
+                # Apply in memory
+                changed = set()
+                for event in valid:
+                    course_progress = progress.get(event.course_id)
+                    if event.type == ProgressEventType.LESSON_COMPLETED:
+                        if str(event.lesson_id) not in map(str, course_progress.completed_lessons):
+                            course_progress.completed_lessons.append(str(event.lesson_id))
+                            course_progress.last_accessed_lesson_id = event.lesson_id
+                            changed.add(event.course_id)
+                        continue
+                    
+                    # Validate answer using regex if provided
+                    regex = practices[event.practice_id]["validation_regex"]
+                    is_correct = bool(regex and re.match(regex, event.answer))
+                    attempts.append(UserPracticeAttempt(
+                        user_id=user_id,
+                        practice_id=event.practice_id,
+                        answer=event.answer,
+                        is_correct=is_correct,
+                        feedback=("Correct!" if is_correct else "Incorrect. Please try again.") if regex else None,
+                        client_event_id=event.client_event_id
+                    ))
+                    # As in validate_practice, a practice only counts once the course has progress
+                    if is_correct and course_progress and str(event.practice_id) not in map(str, course_progress.completed_practices):
+                        course_progress.completed_practices.append(str(event.practice_id))
+                        changed.add(event.course_id)
+                
+                now = datetime.now(timezone.utc)
+                updated = [progress[course_id] for course_id in changed]
+                for course_progress in updated:
+                    total = lessons_total.get(course_progress.course_id)
+                    course_progress.progress = (len(course_progress.completed_lessons) / total) * 100 if total else 0.0
+                    course_progress.updated_at = now
+                
+                if attempts:
+                    await UserPracticeAttempt.bulk_create(attempts, using_db=connection)
+                if updated:
+                    await UserProgress.bulk_update(
+                        updated,
+                        fields=["completed_lessons", "completed_practices", "progress", "last_accessed_lesson_id", "updated_at"],
+                        using_db=connection
+                    )
+                    await progress_projection.record_many(updated, lessons_total, using_db=connection)
+            
+            if updated:
+                progress_projection.changed(user_id)
+            for course_progress in updated:
+                if course_progress.progress >= 100:
+                    certificate_service.enqueue(user_id, course_progress.course_id)
+            
+            return ProgressSyncResponse(
+                applied=len(valid),
+                duplicates=duplicates + replayed,
+                rejected=sorted(rejected, key=lambda r: r.index),
+                courses=[
+                    SyncedCourseProgress(
+                        course_id=course_id,
+                        completed_lessons=progress[course_id].completed_lessons if course_id in progress else [],
+                        completed_practices=progress[course_id].completed_practices if course_id in progress else [],
+                        progress=progress[course_id].progress if course_id in progress else 0.0,
+                        last_accessed_lesson=progress[course_id].last_accessed_lesson_id if course_id in progress else None
+                    )
+                    for course_id in course_ids
+                ]
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error syncing progress: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred while syncing progress: {str(e)}"
+            )
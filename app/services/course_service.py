@@ -1,14 +1,138 @@
-from typing import List, Optional
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from fastapi import HTTPException, status
+from tortoise import BaseDBAsyncClient
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
 from app.models.course import Course, CourseModule, Lesson, CourseLevel
-from app.schemas.course import CourseCreate, CourseResponse
+from app.models.course_content import BLOCK_POSITION_GAP, ContentBlock
+from app.schemas.course import CourseCreate, CourseResponse, ContentUpdateResponse, LessonUpdate, ModuleUpdate
+from app.schemas.course_content import BlockPosition, BlockReorderResponse, ContentBlockUpdate
+from app.core.responses import parse_json, render_json
+from app.services.course_tree import fetch_course_list_json, json_tree_available
+from app.core.cache import TTLCache
+from app.core.compression import CompressedSnapshot
+from app.core.config import settings
+from app.core.entity_cache import entity_cache
+from app.core.invalidation import invalidation_bus
 import logging
 import traceback
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
+COURSE_LIST_TYPE = List[CourseResponse]
+
+def plan_block_positions(current: Dict[UUID, int], order: List[UUID]) -> Dict[UUID, int]:
+    """
+    New positions for putting blocks in ``order``, touching as few rows as possible.
+
+    The longest run of blocks that are already in increasing position order
+    keeps its positions; every other block gets a position in the gap
+    between its new neighbours. Only when a gap is too small is the whole
+    lesson renumbered.
+
+    Args:
+        current: Current position of every block
+        order: Every block ID, in the new order
+
+    Returns:
+        Dict[UUID, int]: New positions of the blocks that move
+    """
+    positions = [current[block_id] for block_id in order]
+
+    # Longest strictly increasing subsequence of positions (patience sorting)
+    tails: List[int] = []  # index into order of the smallest tail of each length
+    tail_positions: List[int] = []
+    previous: List[Optional[int]] = [None] * len(order)
+    for index, position in enumerate(positions):
+        length = bisect_left(tail_positions, position)
+        previous[index] = tails[length - 1] if length else None
+        if length == len(tails):
+            tails.append(index)
+            tail_positions.append(position)
+        else:
+            tails[length] = index
+            tail_positions[length] = position
+    kept = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        kept.add(index)
+        index = previous[index]
+
+    moved: Dict[UUID, int] = {}
+    run: List[int] = []
+    low: Optional[int] = None
+    for index in range(len(order) + 1):
+        if index < len(order) and index not in kept:
+            run.append(index)
+            continue
+        high = positions[index] if index < len(order) else None
+        if run:
+            if low is None and high is None:
+                slots = [(n + 1) * BLOCK_POSITION_GAP for n in range(len(run))]
+            elif high is None:
+                slots = [low + (n + 1) * BLOCK_POSITION_GAP for n in range(len(run))]
+            elif low is None:
+                slots = [high - (len(run) - n) * BLOCK_POSITION_GAP for n in range(len(run))]
+            elif high - low > len(run):
+                step = (high - low) // (len(run) + 1)
+                slots = [low + (n + 1) * step for n in range(len(run))]
+            else:
+                # No room between the neighbours: renumber the lesson
+                renumbered = {block_id: (n + 1) * BLOCK_POSITION_GAP for n, block_id in enumerate(order)}
+                return {block_id: p for block_id, p in renumbered.items() if current[block_id] != p}
+            for run_index, slot in zip(run, slots):
+                moved[order[run_index]] = slot
+            run = []
+        low = high
+    return moved
+
 class CourseService:
+    def __init__(self):
+        # Rendered course list, shared by every request until a course changes
+        self._courses_snapshot = TTLCache(maxsize=1, ttl=settings.COURSE_SNAPSHOT_TTL_SECONDS)
+        invalidation_bus.subscribe("courses", self._drop_courses_snapshot)
+
+    @staticmethod
+    def _course_to_dict(course: Course) -> dict:
+        """Build the CourseResponse payload from a course with prefetched modules and lessons"""
+        return {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "fullDescription": course.full_description,
+            "level": course.level,
+            "duration": course.duration,
+            "imageUrl": course.image_url,
+            "cover_image": course.cover_image,
+            "is_active": course.is_active,
+            "created_at": course.created_at,
+            "updated_at": course.updated_at,
+            "modules": [
+                {
+                    "id": module.id,
+                    "title": module.title,
+                    "lessons_count": module.lessons_count,
+                    "created_at": module.created_at,
+                    "updated_at": module.updated_at,
+                    "lessons": [
+                        {
+                            "id": lesson.id,
+                            "title": lesson.title,
+                            "type": lesson.type,
+                            "content": lesson.content,
+                            "created_at": lesson.created_at,
+                            "updated_at": lesson.updated_at
+                        }
+                        for lesson in module.lessons
+                    ]
+                }
+                for module in course.modules
+            ]
+        }
+
     async def get_all_courses(self) -> List[CourseResponse]:
         """
         Get all available courses with their modules and lessons.
@@ -17,47 +141,15 @@ class CourseService:
             List[CourseResponse]: List of all courses with their relationships
         """
         try:
+            if json_tree_available():
+                # One round trip on PostgreSQL (see app.services.course_tree)
+                return parse_json(await fetch_course_list_json(), COURSE_LIST_TYPE)
+
             # Fetch all courses with their relationships
             courses = await Course.all().prefetch_related('modules', 'modules__lessons')
             
             # Convert to response models
-            return [
-                CourseResponse.model_validate({
-                    "id": course.id,
-                    "title": course.title,
-                    "description": course.description,
-                    "fullDescription": course.full_description,
-                    "level": course.level,
-                    "duration": course.duration,
-                    "imageUrl": course.image_url,
-                    "cover_image": course.cover_image,
-                    "is_active": course.is_active,
-                    "created_at": course.created_at,
-                    "updated_at": course.updated_at,
-                    "modules": [
-                        {
-                            "id": module.id,
-                            "title": module.title,
-                            "lessons_count": module.lessons_count,
-                            "created_at": module.created_at,
-                            "updated_at": module.updated_at,
-                            "lessons": [
-                                {
-                                    "id": lesson.id,
-                                    "title": lesson.title,
-                                    "type": lesson.type,
-                                    "content": lesson.content,
-                                    "created_at": lesson.created_at,
-                                    "updated_at": lesson.updated_at
-                                }
-                                for lesson in module.lessons
-                            ]
-                        }
-                        for module in course.modules
-                    ]
-                })
-                for course in courses
-            ]
+            return [CourseResponse.model_validate(self._course_to_dict(course)) for course in courses]
         except Exception as e:
             logger.error(f"Error fetching courses: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
@@ -66,6 +158,46 @@ class CourseService:
                 detail=f"An error occurred while fetching courses: {str(e)}"
             )
 
+    async def get_all_courses_json(self) -> bytes:
+        """
+        Get all courses rendered as JSON bytes.
+        
+        The models are validated once here and serialized directly, so the
+        route can return them without FastAPI validating them again.
+        
+        Returns:
+            bytes: JSON array of CourseResponse objects
+        """
+        courses = await self.get_all_courses()
+        return render_json(courses, COURSE_LIST_TYPE)
+
+    async def get_courses_snapshot(self) -> CompressedSnapshot:
+        """
+        Get the cached course list snapshot, rebuilding it when stale.
+        
+        The snapshot body is rendered once and compressed at most once per
+        encoding, so repeated requests cost neither queries nor compression.
+        Concurrent misses share one rebuild, and a rebuild that overlaps a
+        course change is served but not kept.
+        
+        Returns:
+            CompressedSnapshot: Rendered (and lazily pre-compressed) course list
+        """
+        async def build() -> CompressedSnapshot:
+            return CompressedSnapshot(
+                await self.get_all_courses_json(),
+                minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+            )
+
+        return await self._courses_snapshot.get_or_load("courses", build)
+
+    def invalidate_courses_snapshot(self) -> None:
+        """Drop the cached course list, in every worker, after a course is created or changed"""
+        invalidation_bus.publish("courses")
+
+    def _drop_courses_snapshot(self, key: Optional[str]) -> None:
+        self._courses_snapshot.clear()
+
     async def create_course(self, course_data: CourseCreate) -> CourseResponse:
         """
         Create a new course with modules and lessons.
@@ -81,8 +213,10 @@ class CourseService:
         """
         try:
             # Log incoming data
-            logger.info(f"Creating course with data: {course_data.model_dump()}")
-            logger.info(f"Number of modules to create: {len(course_data.modules)}")
+            logger.info("Creating course %r with %d modules", course_data.title, len(course_data.modules))
+            # Full payload only at DEBUG: dumping the whole course tree is expensive
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Creating course with data: %s", course_data.model_dump())
 
             # Validate course title uniqueness
             existing_course = await Course.filter(title=course_data.title).first()
@@ -104,7 +238,7 @@ class CourseService:
                     cover_image=course_data.cover_image,
                     is_active=course_data.is_active
                 )
-                logger.info(f"Created course with ID: {course.id}")
+                logger.info("Created course with ID: %s", course.id)
 
             except Exception as e:
                 logger.error(f"Error creating course: {str(e)}")
@@ -114,8 +248,7 @@ class CourseService:
             # Create modules and lessons
             try:
                 for module_data in course_data.modules:
-                    logger.info(f"Creating module with title: {module_data.title}")
-                    logger.info(f"Number of lessons in module: {len(module_data.lessons)}")
+                    logger.debug("Creating module %r with %d lessons", module_data.title, len(module_data.lessons))
                     
                     # Create module
                     module = await CourseModule.create(
@@ -123,63 +256,32 @@ class CourseService:
                         lessons_count=len(module_data.lessons),
                         course=course  # Pass the course object directly
                     )
-                    logger.info(f"Created module with ID: {module.id}")
+                    logger.debug("Created module with ID: %s", module.id)
 
                     for lesson_data in module_data.lessons:
-                        logger.info(f"Creating lesson with title: {lesson_data.title}")
+                        logger.debug("Creating lesson with title: %r", lesson_data.title)
                         lesson = await Lesson.create(
                             title=lesson_data.title,
                             type=lesson_data.type,
                             content=lesson_data.content,
                             module=module  # Pass the module object directly
                         )
-                        logger.info(f"Created lesson with ID: {lesson.id} in module {module.id}")
+                        logger.debug("Created lesson with ID: %s in module %s", lesson.id, module.id)
             except Exception as e:
                 logger.error(f"Error creating modules/lessons: {str(e)}")
                 logger.error(f"Traceback: {traceback.format_exc()}")
                 raise
 
+            # Only now: a list rebuilt earlier would cache the course without its lessons
+            self.invalidate_courses_snapshot()
+
             # Fetch the complete course with relationships
             try:
                 course = await Course.get(id=course.id).prefetch_related('modules', 'modules__lessons')
-                logger.info(f"Successfully fetched course with relationships: {course.id}")
-                logger.info(f"Number of modules fetched: {len(course.modules)}")
+                logger.debug("Fetched course %s with %d modules", course.id, len(course.modules))
                 
                 # Convert to dictionary with proper structure
-                course_dict = {
-                    "id": course.id,
-                    "title": course.title,
-                    "description": course.description,
-                    "fullDescription": course.full_description,
-                    "level": course.level,
-                    "duration": course.duration,
-                    "imageUrl": course.image_url,
-                    "cover_image": course.cover_image,
-                    "is_active": course.is_active,
-                    "created_at": course.created_at,
-                    "updated_at": course.updated_at,
-                    "modules": [
-                        {
-                            "id": module.id,
-                            "title": module.title,
-                            "lessons_count": module.lessons_count,
-                            "created_at": module.created_at,
-                            "updated_at": module.updated_at,
-                            "lessons": [
-                                {
-                                    "id": lesson.id,
-                                    "title": lesson.title,
-                                    "type": lesson.type,
-                                    "content": lesson.content,
-                                    "created_at": lesson.created_at,
-                                    "updated_at": lesson.updated_at
-                                }
-                                for lesson in module.lessons
-                            ]
-                        }
-                        for module in course.modules
-                    ]
-                }
+                course_dict = self._course_to_dict(course)
                 
                 # Convert to Pydantic model
                 return CourseResponse.model_validate(course_dict)
@@ -196,4 +298,145 @@ class CourseService:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error occurred while creating the course: {str(e)}"
-            ) 
\ No newline at end of file
+            )
+
+    @staticmethod
+    def _changes(update: Any, required: tuple = ()) -> Dict[str, Any]:
+        """Fields sent in a PATCH body; 400 when it is empty or clears a required field"""
+        changes = update.model_dump(exclude_unset=True)
+        if not changes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No fields to update"
+            )
+        cleared = [field for field in required if field in changes and changes[field] is None]
+        if cleared:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Fields cannot be null: {', '.join(cleared)}"
+            )
+        return changes
+
+    @staticmethod
+    async def _bump_content_version(course_id: UUID, connection: BaseDBAsyncClient) -> int:
+        """Invalidate cached content of one course; returns its new content version"""
+        await Course.filter(id=course_id).using_db(connection).update(
+            content_version=F("content_version") + 1,
+            updated_at=datetime.now(timezone.utc)
+        )
+        # Queryset updates send no save signal
+        entity_cache.invalidate(Course, course_id)
+        return await Course.filter(id=course_id).using_db(connection).first().values_list("content_version", flat=True)
+
+    async def _save_changes(self, course_id: UUID, obj: Any, changes: Dict[str, Any]) -> ContentUpdateResponse:
+        obj.update_from_dict(changes)
+        async with in_transaction() as connection:
+            await obj.save(update_fields=[*changes, "updated_at"], using_db=connection)
+            content_version = await self._bump_content_version(course_id, connection)
+        self.invalidate_courses_snapshot()
+        return ContentUpdateResponse(
+            id=obj.id,
+            course_id=course_id,
+            content_version=content_version,
+            updated_fields=list(changes),
+            updated_at=obj.updated_at
+        )
+
+    async def update_module(self, course_id: UUID, module_id: UUID, update: ModuleUpdate) -> ContentUpdateResponse:
+        """
+        Partially update a module of a course.
+
+        Raises:
+            HTTPException: 404 if the module is not in the course, 400 for an empty update
+        """
+        changes = self._changes(update, required=("title",))
+        module = await CourseModule.get_or_none(id=module_id, course_id=course_id)
+        if not module:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Module not found"
+            )
+        return await self._save_changes(course_id, module, changes)
+
+    async def update_lesson(self, course_id: UUID, lesson_id: UUID, update: LessonUpdate) -> ContentUpdateResponse:
+        """
+        Partially update a lesson of a course.
+
+        Raises:
+            HTTPException: 404 if the lesson is not in the course, 400 for an empty update
+        """
+        changes = self._changes(update, required=("title", "type", "content"))
+        lesson = await Lesson.get_or_none(id=lesson_id, module__course_id=course_id)
+        if not lesson:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lesson not found"
+            )
+        return await self._save_changes(course_id, lesson, changes)
+
+    async def update_block(
+        self,
+        course_id: UUID,
+        lesson_id: UUID,
+        block_id: UUID,
+        update: ContentBlockUpdate
+    ) -> ContentUpdateResponse:
+        """
+        Partially update a content block of a lesson.
+
+        Raises:
+            HTTPException: 404 if the block is not in the lesson, 400 for an empty update
+        """
+        changes = self._changes(update, required=("type",))
+        if changes.get("src") is not None:
+            changes["src"] = str(changes["src"])
+        block = await ContentBlock.get_or_none(id=block_id, lesson_id=lesson_id, lesson__module__course_id=course_id)
+        if not block:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Content block not found"
+            )
+        return await self._save_changes(course_id, block, changes)
+
+    async def reorder_blocks(self, course_id: UUID, lesson_id: UUID, block_ids: List[UUID]) -> BlockReorderResponse:
+        """
+        Put the content blocks of a lesson in a new order.
+
+        Only blocks that actually move are written (see plan_block_positions),
+        so moving one block is a single-row update.
+
+        Raises:
+            HTTPException: 404 if the lesson is not in the course,
+                400 if ``block_ids`` is not exactly the lesson's blocks
+        """
+        if not await Lesson.exists(id=lesson_id, module__course_id=course_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lesson not found"
+            )
+        current = dict(await ContentBlock.filter(lesson_id=lesson_id).values_list("id", "position"))
+        if len(block_ids) != len(current) or set(block_ids) != set(current):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="block_ids must list every block of the lesson exactly once"
+            )
+
+        moved = plan_block_positions(current, block_ids)
+        if not moved:
+            content_version = await Course.filter(id=course_id).first().values_list("content_version", flat=True)
+            return BlockReorderResponse(content_version=content_version, moved=[])
+        async with in_transaction() as connection:
+            now = datetime.now(timezone.utc)
+            await ContentBlock.bulk_update(
+                [ContentBlock(id=block_id, position=position, updated_at=now) for block_id, position in moved.items()],
+                fields=["position", "updated_at"],
+                using_db=connection
+            )
+            content_version = await self._bump_content_version(course_id, connection)
+        for block_id in moved:
+            entity_cache.invalidate(ContentBlock, block_id)
+        self.invalidate_courses_snapshot()
+        return BlockReorderResponse(
+            content_version=content_version,
+            moved=[BlockPosition(id=block_id, position=position) for block_id, position in moved.items()]
+        )
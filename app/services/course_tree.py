@@ -0,0 +1,103 @@
+"""
+Course trees assembled by PostgreSQL in one round trip.
+
+The prefetch path loads courses, modules, lessons and content blocks with
+one query per level and builds the nested dicts in Python. On PostgreSQL
+the same tree can be produced by correlated ``json_agg`` subqueries as a
+single JSON document whose keys already match the response schemas; the
+services validate it with ``model_validate_json`` and never build ORM
+objects. Ordering matches the models' default ordering, so both paths
+return identical responses.
+"""
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+import orjson
+from tortoise import Tortoise
+
+from app.core.config import settings
+
+_LESSON = """
+    json_build_object(
+        'id', l.id, 'title', l.title, 'type', l.type, 'content', l.content,
+        'created_at', l.created_at, 'updated_at', l.updated_at
+    )"""
+
+_BLOCK = """
+    json_build_object(
+        'id', b.id, 'type', b.type, 'position', b.position, 'level', b.level, 'text', b.text,
+        'language', b.language, 'code', b.code, 'video_id', b.video_id, 'src', b.src, 'alt', b.alt,
+        'practice_id', b.practice_id, 'description', b.description, 'task_type', b.task_type,
+        'validation_regex', b.validation_regex, 'placeholder', b.placeholder,
+        'created_at', b.created_at, 'updated_at', b.updated_at
+    )"""
+
+# List[CourseResponse] (course_service.CourseService._course_to_dict)
+COURSE_LIST_SQL = f"""
+SELECT COALESCE(json_agg(json_build_object(
+    'id', c.id, 'title', c.title, 'description', c.description, 'fullDescription', c.full_description,
+    'level', c.level, 'duration', c.duration, 'imageUrl', c.image_url, 'cover_image', c.cover_image,
+    'is_active', c.is_active, 'created_at', c.created_at, 'updated_at', c.updated_at,
+    'modules', COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', m.id, 'title', m.title, 'lessons_count', m.lessons_count,
+            'created_at', m.created_at, 'updated_at', m.updated_at,
+            'lessons', COALESCE((
+                SELECT json_agg({_LESSON} ORDER BY l.id)
+                FROM "lessons" l WHERE l.module_id = m.id
+            ), '[]'::json)
+        ) ORDER BY m.id)
+        FROM "course_modules" m WHERE m.course_id = c.id
+    ), '[]'::json)
+) ORDER BY c.id), '[]'::json) AS "tree"
+FROM "courses" c
+"""
+
+# CourseContent (course_content_service.CourseContentService.get_course_content)
+COURSE_CONTENT_SQL = f"""
+SELECT json_build_object(
+    'id', c.id, 'title', c.title, 'content_version', c.content_version,
+    'modules', COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', m.id, 'title', m.title,
+            'lessons', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', l.id, 'title', l.title, 'content', l.content,
+                    'content_blocks', COALESCE((
+                        SELECT json_agg({_BLOCK} ORDER BY b.position, b.id)
+                        FROM "content_blocks" b WHERE b.lesson_id = l.id
+                    ), '[]'::json)
+                ) ORDER BY l.id)
+                FROM "lessons" l WHERE l.module_id = m.id
+            ), '[]'::json)
+        ) ORDER BY m.id)
+        FROM "course_modules" m WHERE m.course_id = c.id
+    ), '[]'::json)
+) AS "tree"
+FROM "courses" c
+WHERE c.id = $1
+"""
+
+def json_tree_available() -> bool:
+    """True when the single-query path can be used (PostgreSQL, and not disabled in settings)"""
+    if not settings.COURSE_TREE_JSON_AGG:
+        return False
+    return Tortoise.get_connection("default").capabilities.dialect == "postgres"
+
+async def _fetch_tree(sql: str, values: Optional[Sequence[Any]] = None) -> Optional[bytes]:
+    rows = await Tortoise.get_connection("default").execute_query_dict(sql, values)
+    if not rows or rows[0]["tree"] is None:
+        return None
+    tree = rows[0]["tree"]
+    # asyncpg hands json columns back as text unless a codec was registered
+    if isinstance(tree, str):
+        return tree.encode()
+    return tree if isinstance(tree, bytes) else orjson.dumps(tree)
+
+async def fetch_course_list_json() -> bytes:
+    """Every course with modules and lessons, as a JSON array of CourseResponse"""
+    return await _fetch_tree(COURSE_LIST_SQL) or b"[]"
+
+async def fetch_course_content_json(course_id: UUID) -> Optional[bytes]:
+    """One course with modules, lessons and content blocks as CourseContent JSON, None if not found"""
+    return await _fetch_tree(COURSE_CONTENT_SQL, [course_id])
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
+from uuid import UUID
 from tortoise.expressions import Q
 
 # Import models and schemas
@@ -55,7 +56,7 @@ async def list_courses(
     summary="Get course details by ID",
     description="Retrieve detailed information about a specific course, including its modules."
 )
-async def get_course_details(course_id: int):
+async def get_course_details(course_id: UUID):
     """Retrieve details for a specific course by its ID."""
     # Fetch the course and prefetch related modules in one query
     course = await Course.get_or_none(id=course_id).prefetch_related("modules")
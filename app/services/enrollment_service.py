@@ -0,0 +1,137 @@
+import logging
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+from uuid import UUID, uuid4
+
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.core.entity_cache import entity_cache
+from app.core.invalidation import invalidation_bus
+from app.models.course import Course, CourseStatus, Lesson, UserCourse
+from app.models.course_content import CourseProgressSummary
+from app.models.user import User
+from app.schemas.enrollment import BulkEnrollChunk, BulkEnrollSummary
+
+logger = logging.getLogger(__name__)
+
+class EnrollmentService:
+    """
+    Enrolls users into courses.
+
+    Enrollments are written with ``INSERT ... ON CONFLICT DO NOTHING`` on
+    the (user, course) unique pair, so concurrent or repeated enrollment
+    never fails and never creates a duplicate. Each enrollment also gets
+    its (empty) progress summary so the course shows up in the user's
+    course list right away.
+    """
+
+    def __init__(self, chunk_size: int = settings.BULK_ENROLL_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    async def course_exists(self, course_id: UUID) -> bool:
+        return await entity_cache.get(Course, course_id) is not None
+
+    @staticmethod
+    async def _lessons_total(course_id: UUID, using_db=None) -> int:
+        return await Lesson.filter(module__course_id=course_id).using_db(using_db).count()
+
+    @staticmethod
+    async def _insert(user_ids: List[int], course_id: UUID, lessons_total: int, connection) -> List[int]:
+        """Enroll users that are not enrolled yet (ON CONFLICT DO NOTHING); returns who was actually enrolled"""
+        if connection.capabilities.dialect == "postgres":
+            # RETURNING reports exactly the rows this statement inserted, also under concurrent enrollment
+            _, rows = await connection.execute_query(
+                f'INSERT INTO "{UserCourse._meta.db_table}" ("id", "user_id", "course_id", "progress", "status", "started_at", "last_accessed_at") '
+                "SELECT v.id, v.user_id, $3::uuid, 0, $4, $5::timestamptz, $5::timestamptz "
+                "FROM unnest($1::uuid[], $2::int[]) AS v(id, user_id) "
+                'ON CONFLICT ("user_id", "course_id") DO NOTHING RETURNING "user_id"',
+                [[uuid4() for _ in user_ids], user_ids, course_id, CourseStatus.IN_PROGRESS.value, datetime.now(timezone.utc)]
+            )
+            inserted = [row["user_id"] for row in rows]
+        else:
+            # Other databases (SQLite) run one write transaction at a time, so a read here is exact
+            enrolled = set(await UserCourse.filter(course_id=course_id, user_id__in=user_ids).using_db(connection).values_list("user_id", flat=True))
+            inserted = [user_id for user_id in user_ids if user_id not in enrolled]
+            await UserCourse.bulk_create(
+                [UserCourse(user_id=user_id, course_id=course_id) for user_id in inserted],
+                ignore_conflicts=True,
+                using_db=connection
+            )
+        if inserted:
+            await CourseProgressSummary.bulk_create(
+                [CourseProgressSummary(user_id=user_id, course_id=course_id, lessons_total=lessons_total) for user_id in inserted],
+                ignore_conflicts=True,
+                using_db=connection
+            )
+        return inserted
+
+    async def enroll(self, user_id: int, course_id: UUID) -> Optional[Tuple[UserCourse, bool]]:
+        """
+        Enroll a user into a course (idempotent).
+
+        Returns:
+            Optional[Tuple[UserCourse, bool]]: The enrollment and whether it was
+            created by this call, None if the course does not exist
+        """
+        if not await self.course_exists(course_id):
+            return None
+        enrollment = UserCourse(user_id=user_id, course_id=course_id)
+        async with in_transaction() as connection:
+            await UserCourse.bulk_create([enrollment], ignore_conflicts=True, using_db=connection)
+            current = await UserCourse.get(user_id=user_id, course_id=course_id).using_db(connection)
+            created = current.id == enrollment.id
+            if created:
+                await CourseProgressSummary.bulk_create(
+                    [CourseProgressSummary(user_id=user_id, course_id=course_id, lessons_total=await self._lessons_total(course_id, connection))],
+                    ignore_conflicts=True,
+                    using_db=connection
+                )
+        if created:
+            invalidation_bus.publish("user_courses", user_id)
+        return current, created
+
+    async def bulk_enroll(self, course_id: UUID, user_ids: Iterable[int]) -> AsyncIterator[Union[BulkEnrollChunk, BulkEnrollSummary]]:
+        """
+        Enroll many users, ``chunk_size`` at a time (one INSERT per table and
+        chunk, each chunk in its own transaction). The counts come from the
+        rows actually inserted, so concurrent enrollments are not double counted. Yields a result per chunk
+        and a summary at the end; a failing chunk is reported and skipped.
+        The course must exist (see ``course_exists()``).
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        lessons_total = await self._lessons_total(course_id)
+        summary = BulkEnrollSummary(requested=len(user_ids), enrolled=0, already_enrolled=0, unknown_users=0, failed_chunks=0)
+
+        for number, start in enumerate(range(0, len(user_ids), self.chunk_size), start=1):
+            chunk = user_ids[start:start + self.chunk_size]
+            try:
+                known = set(await User.filter(id__in=chunk).values_list("id", flat=True))
+                candidates = [user_id for user_id in chunk if user_id in known]
+                new = []
+                if candidates:
+                    async with in_transaction() as connection:
+                        new = await self._insert(candidates, course_id, lessons_total, connection)
+                    for user_id in new:
+                        invalidation_bus.publish("user_courses", user_id)
+            except Exception as e:
+                logger.exception("Bulk enrollment into course %s failed for chunk %s", course_id, number)
+                summary.failed_chunks += 1
+                yield BulkEnrollChunk(chunk=number, requested=len(chunk), enrolled=0, already_enrolled=0, error=str(e))
+                continue
+
+            unknown = [user_id for user_id in chunk if user_id not in known]
+            summary.enrolled += len(new)
+            summary.already_enrolled += len(candidates) - len(new)
+            summary.unknown_users += len(unknown)
+            yield BulkEnrollChunk(
+                chunk=number,
+                requested=len(chunk),
+                enrolled=len(new),
+                already_enrolled=len(candidates) - len(new),
+                unknown_user_ids=unknown
+            )
+        yield summary
+
+# Create a global instance
+enrollment_service = EnrollmentService()
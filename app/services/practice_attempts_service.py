@@ -0,0 +1,194 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from tortoise import Tortoise
+from tortoise.functions import Count, Max, Min
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.models.course_content import PracticeAttemptSummary, UserPracticeAttempt
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS_TABLE = "user_practice_attempts"
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+def add_months(moment: datetime, months: int) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def partition_name(month: datetime) -> str:
+    return f"{ATTEMPTS_TABLE}_p{month:%Y_%m}"
+
+class PracticeAttemptStore:
+    """
+    Storage management for practice attempts.
+
+    On PostgreSQL ``user_practice_attempts`` is partitioned by month on
+    ``created_at`` (plus a default partition); ``ensure_partitions()``
+    creates the partitions for the coming months. ``roll_up()`` compacts
+    whole months older than the retention period into
+    PracticeAttemptSummary rows (attempt count, first correct time) and
+    then drops those partitions. On other databases, and on a PostgreSQL
+    table that was created without the partitioning migration, the same
+    rollup deletes the rows instead.
+
+    Partitions are only created at startup and by the maintenance script,
+    so one of them has to run before a month begins; until then that
+    month's attempts land in the default partition.
+    """
+
+    def __init__(
+        self,
+        retention_days: int = settings.PRACTICE_ATTEMPT_RETENTION_DAYS,
+        months_ahead: int = settings.PRACTICE_ATTEMPT_PARTITIONS_AHEAD
+    ):
+        self.retention_days = retention_days
+        self.months_ahead = months_ahead
+        self._partitioned: Optional[bool] = None
+
+    @staticmethod
+    def _connection():
+        return Tortoise.get_connection("default")
+
+    async def partitioned(self) -> bool:
+        """Whether the attempts table is a partitioned PostgreSQL table (checked once)"""
+        if self._partitioned is None:
+            connection = self._connection()
+            if connection.capabilities.dialect != "postgres":
+                self._partitioned = False
+            else:
+                _, rows = await connection.execute_query(
+                    "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass($1)",
+                    [ATTEMPTS_TABLE]
+                )
+                self._partitioned = bool(rows)
+                if not self._partitioned:
+                    logger.warning(
+                        '"%s" is not partitioned (created without migrations?), monthly partitions are not managed',
+                        ATTEMPTS_TABLE
+                    )
+        return self._partitioned
+
+    async def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create the partitions of the current and the next ``months_ahead`` months.
+
+        Returns:
+            List[str]: Names of the partitions that were checked (nothing happens
+                unless the table is partitioned)
+        """
+        if not await self.partitioned():
+            return []
+        current = month_start(now or datetime.now(timezone.utc))
+        names = []
+        for offset in range(self.months_ahead + 1):
+            start = add_months(current, offset)
+            name = partition_name(start)
+            await self._connection().execute_script(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{ATTEMPTS_TABLE}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+            )
+            names.append(name)
+        return names
+
+    async def start(self) -> None:
+        """Create upcoming partitions (called from the app lifespan); a failure is logged, not raised"""
+        try:
+            await self.ensure_partitions()
+        except Exception as e:
+            logger.error(f"Could not create practice attempt partitions: {e}")
+
+    async def roll_up(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Compact every whole month older than the retention period.
+
+        Returns:
+            Dict[str, int]: Months processed, attempts rolled up, summaries written
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = month_start(now - timedelta(days=self.retention_days))
+        result = {"months": 0, "attempts": 0, "summaries": 0}
+
+        oldest = await UserPracticeAttempt.filter(created_at__lt=cutoff).order_by("created_at").first().values("created_at")
+        if not oldest:
+            return result
+        start = month_start(oldest["created_at"])
+        while start < cutoff:
+            end = add_months(start, 1)
+            attempts, summaries = await self._roll_up_month(start, end)
+            result["months"] += 1
+            result["attempts"] += attempts
+            result["summaries"] += summaries
+            start = end
+        logger.info("Rolled up %s practice attempts older than %s", result["attempts"], cutoff.date())
+        return result
+
+    async def _roll_up_month(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        window = UserPracticeAttempt.filter(created_at__gte=start, created_at__lt=end)
+        totals = await window.annotate(
+            count=Count("id"), first=Min("created_at"), last=Max("created_at")
+        ).group_by("user_id", "practice_id").values("user_id", "practice_id", "count", "first", "last")
+        correct = {
+            (row["user_id"], row["practice_id"]): row
+            for row in await window.filter(is_correct=True).annotate(
+                count=Count("id"), first=Min("created_at")
+            ).group_by("user_id", "practice_id").values("user_id", "practice_id", "count", "first")
+        }
+
+        async with in_transaction() as connection:
+            written = 0
+            for chunk_start in range(0, len(totals), 500):
+                written += await self._merge(totals[chunk_start:chunk_start + 500], correct, connection)
+            if await self.partitioned():
+                await connection.execute_script(f'DROP TABLE IF EXISTS "{partition_name(start)}"')
+            # Rows outside a monthly partition (the default partition, or an unpartitioned table)
+            await UserPracticeAttempt.filter(created_at__gte=start, created_at__lt=end).using_db(connection).delete()
+        return sum(row["count"] for row in totals), written
+
+    @staticmethod
+    async def _merge(rows: List[Dict[str, Any]], correct: Dict[tuple, Dict[str, Any]], connection) -> int:
+        """Add a month of aggregated attempts to the existing summaries"""
+        existing = {
+            (s.user_id, s.practice_id): s
+            for s in await PracticeAttemptSummary.filter(
+                user_id__in={r["user_id"] for r in rows},
+                practice_id__in={r["practice_id"] for r in rows}
+            ).using_db(connection)
+        }
+        summaries = []
+        for row in rows:
+            key = (row["user_id"], row["practice_id"])
+            summary = existing.get(key) or PracticeAttemptSummary(user_id=row["user_id"], practice_id=row["practice_id"])
+            hit = correct.get(key)
+            summary.attempts += row["count"]
+            summary.first_attempt_at = min(filter(None, (summary.first_attempt_at, row["first"])))
+            summary.last_attempt_at = max(filter(None, (summary.last_attempt_at, row["last"])))
+            if hit:
+                summary.correct_attempts += hit["count"]
+                summary.first_correct_at = min(filter(None, (summary.first_correct_at, hit["first"])))
+            summary.updated_at = datetime.now(timezone.utc)
+            summaries.append(summary)
+        await PracticeAttemptSummary.bulk_create(
+            summaries,
+            on_conflict=["user_id", "practice_id"],
+            update_fields=["attempts", "correct_attempts", "first_attempt_at", "first_correct_at", "last_attempt_at", "updated_at"],
+            using_db=connection
+        )
+        return len(summaries)
+
+    async def recent(self, user_id: int, practice_id: UUID, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest attempts of a user at a practice (served by the (user_id, practice_id, created_at) index)"""
+        return await UserPracticeAttempt.filter(user_id=user_id, practice_id=practice_id).order_by(
+            "-created_at"
+        ).limit(limit).values("id", "answer", "is_correct", "feedback", "created_at")
+
+    async def summary(self, user_id: int, practice_id: UUID) -> Optional[PracticeAttemptSummary]:
+        return await PracticeAttemptSummary.get_or_none(user_id=user_id, practice_id=practice_id)
+
+# Create a global instance
+practice_attempt_store = PracticeAttemptStore()
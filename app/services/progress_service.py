@@ -0,0 +1,229 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from tortoise import BaseDBAsyncClient
+from tortoise.expressions import Q
+
+from app.core.invalidation import invalidation_bus
+from app.models.course import Certificate, CourseStatus, Lesson, UserCourse
+from app.models.course_content import CourseProgressSummary, UserProgress
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Summary columns derived from UserProgress (has_certificate and started_at are kept on conflict)
+SUMMARY_PROGRESS_FIELDS = [
+    "status", "percent", "lessons_done", "lessons_total", "practices_done",
+    "completed_lessons", "completed_practices", "last_lesson_id", "updated_at",
+]
+
+class ProgressProjection:
+    """
+    Maintains CourseProgressSummary, the per-(user, course) progress read model.
+
+    Writers call ``record()`` after changing a UserProgress row and
+    ``certificate_issued()`` when a certificate is created; each is a single
+    UPDATE in the common case (an INSERT the first time). Readers get
+    everything a progress page needs from one indexed lookup on
+    (user_id, course_id) or user_id. Every write publishes
+    ``("user_courses", user_id)`` so the workers drop cached course lists;
+    writes made inside the caller's transaction (``using_db``) leave that
+    to the caller, who calls ``changed()`` once the transaction committed.
+    A course with a certificate stays completed even if its percentage
+    later drops (lessons added to the course).
+    """
+
+    async def record(
+        self,
+        progress: UserProgress,
+        lessons_total: Optional[int] = None,
+        last_lesson_id: Optional[UUID] = None,
+        using_db: Optional[BaseDBAsyncClient] = None
+    ) -> None:
+        """
+        Copy a freshly saved UserProgress row into the summary.
+
+        Args:
+            progress: The saved UserProgress row
+            lessons_total: Lessons in the course, when the caller just counted them
+            last_lesson_id: The lesson the user has just completed
+            using_db: Connection of the caller's transaction (so the summary is
+                written while the UserProgress row is still locked); the caller
+                then calls ``changed()`` after committing
+        """
+        values = self._values(progress)
+        if lessons_total is not None:
+            values["lessons_total"] = lessons_total
+        if last_lesson_id is not None:
+            values["last_lesson_id"] = last_lesson_id
+        await self._upsert(progress.user_id, progress.course_id, values, using_db=using_db)
+        if values["status"] != CourseStatus.COMPLETED:
+            await self._keep_certified_completed(Q(user_id=progress.user_id, course_id=progress.course_id), using_db)
+
+    async def record_many(
+        self,
+        progresses: List[UserProgress],
+        lessons_total: Dict[UUID, int],
+        using_db: Optional[BaseDBAsyncClient] = None
+    ) -> None:
+        """
+        ``record()`` for many UserProgress rows in one INSERT ... ON CONFLICT statement.
+
+        Args:
+            progresses: The saved UserProgress rows
+            lessons_total: Lessons per course ID
+            using_db: Connection of the caller's transaction (the caller calls
+                ``changed()`` after committing)
+        """
+        if not progresses:
+            return
+        summaries = [
+            CourseProgressSummary(
+                user_id=progress.user_id,
+                course_id=progress.course_id,
+                lessons_total=lessons_total.get(progress.course_id, 0),
+                last_lesson_id=progress.last_accessed_lesson_id,
+                **self._values(progress)
+            )
+            for progress in progresses
+        ]
+        await CourseProgressSummary.bulk_create(
+            summaries,
+            on_conflict=["user_id", "course_id"],
+            update_fields=SUMMARY_PROGRESS_FIELDS,
+            using_db=using_db
+        )
+        in_progress = [
+            Q(user_id=summary.user_id, course_id=summary.course_id)
+            for summary in summaries if summary.status != CourseStatus.COMPLETED
+        ]
+        if in_progress:
+            await self._keep_certified_completed(Q(*in_progress, join_type=Q.OR), using_db)
+        if using_db is None:
+            for user_id in {progress.user_id for progress in progresses}:
+                self.changed(user_id)
+
+    @staticmethod
+    def changed(user_id: int) -> None:
+        """Drop the user's cached course lists in every worker (after the summary change is committed)"""
+        invalidation_bus.publish("user_courses", user_id)
+
+    @staticmethod
+    async def _keep_certified_completed(rows: Q, using_db: Optional[BaseDBAsyncClient]) -> None:
+        # The upsert cannot keep the status conditionally, so put it back for certified courses
+        await CourseProgressSummary.filter(
+            rows, has_certificate=True, status=CourseStatus.IN_PROGRESS
+        ).using_db(using_db).update(status=CourseStatus.COMPLETED)
+
+    @staticmethod
+    def _values(progress: UserProgress) -> Dict[str, Any]:
+        return {
+            "percent": progress.progress,
+            "lessons_done": len(progress.completed_lessons),
+            "practices_done": len(progress.completed_practices),
+            "completed_lessons": [str(i) for i in progress.completed_lessons],
+            "completed_practices": [str(i) for i in progress.completed_practices],
+            "status": CourseStatus.COMPLETED if progress.progress >= 100 else CourseStatus.IN_PROGRESS,
+            "updated_at": datetime.now(timezone.utc),
+        }
+
+    async def certificate_issued(self, user_id: int, course_id: UUID) -> None:
+        """Mark the course as completed with a certificate"""
+        await self._upsert(user_id, course_id, {
+            "has_certificate": True,
+            "status": CourseStatus.COMPLETED,
+            "updated_at": datetime.now(timezone.utc),
+        })
+
+    async def _upsert(self, user_id: int, course_id: UUID, values: Dict[str, Any], using_db: Optional[BaseDBAsyncClient] = None) -> None:
+        # INSERT ... ON CONFLICT DO UPDATE: never fails on a row created concurrently, even inside a transaction
+        await CourseProgressSummary.bulk_create(
+            [CourseProgressSummary(user_id=user_id, course_id=course_id, **values)],
+            on_conflict=["user_id", "course_id"],
+            update_fields=list(values),
+            using_db=using_db
+        )
+        if using_db is None:
+            self.changed(user_id)
+
+    async def get(self, user_id: int, course_id: UUID) -> Optional[CourseProgressSummary]:
+        return await CourseProgressSummary.get_or_none(user_id=user_id, course_id=course_id)
+
+    async def for_user(self, user_id: int) -> List[Dict[str, Any]]:
+        """All summaries of a user with the course fields the course list shows, in-progress first, latest first"""
+        return await CourseProgressSummary.filter(user_id=user_id).order_by("-status", "-updated_at").values(
+            "course_id", "status", "percent", "has_certificate", "updated_at",
+            title="course__title",
+            cover_image="course__cover_image",
+            image_url="course__image_url"
+        )
+
+    async def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Recompute every summary from UserProgress, UserCourse and Certificate.
+
+        For backfilling after the migration and for data written around the
+        service (imports, fixtures). Works through users in keyset batches.
+
+        Returns:
+            int: Number of summaries written
+        """
+        lessons_total = Counter(await Lesson.all().values_list("module__course_id", flat=True))
+        written = 0
+        last_user_id = 0
+        while True:
+            user_ids = await User.filter(id__gt=last_user_id).order_by("id").limit(batch_size).values_list("id", flat=True)
+            if not user_ids:
+                invalidation_bus.publish("user_courses")
+                return written
+            last_user_id = user_ids[-1]
+
+            rows: Dict[tuple, Dict[str, Any]] = {}
+            enrollments = await UserCourse.filter(user_id__in=user_ids).values(
+                "id", "user_id", "course_id", "progress", "status", "started_at", "last_accessed_at"
+            )
+            certified = set(await Certificate.filter(
+                user_course_id__in=[e["id"] for e in enrollments]
+            ).values_list("user_course_id", flat=True))
+            for e in enrollments:
+                rows[(e["user_id"], e["course_id"])] = {
+                    "status": e["status"],
+                    "percent": e["progress"],
+                    "has_certificate": e["id"] in certified,
+                    "started_at": e["started_at"],
+                    "updated_at": e["last_accessed_at"],
+                }
+
+            for p in await UserProgress.filter(user_id__in=user_ids).values(
+                "user_id", "course_id", "progress", "completed_lessons", "completed_practices",
+                "last_accessed_lesson_id", "created_at", "updated_at"
+            ):
+                row = rows.setdefault((p["user_id"], p["course_id"]), {
+                    "status": CourseStatus.IN_PROGRESS, "has_certificate": False, "started_at": p["created_at"]
+                })
+                lessons = list(dict.fromkeys(str(i) for i in p["completed_lessons"] or []))
+                practices = list(dict.fromkeys(str(i) for i in p["completed_practices"] or []))
+                row.update(
+                    percent=p["progress"],
+                    lessons_done=len(lessons),
+                    practices_done=len(practices),
+                    completed_lessons=lessons,
+                    completed_practices=practices,
+                    last_lesson_id=p["last_accessed_lesson_id"],
+                    updated_at=max(filter(None, (row.get("updated_at"), p["updated_at"])))
+                )
+                if p["progress"] >= 100:
+                    row["status"] = CourseStatus.COMPLETED
+
+            await CourseProgressSummary.filter(user_id__in=user_ids).delete()
+            await CourseProgressSummary.bulk_create([
+                CourseProgressSummary(user_id=user_id, course_id=course_id, lessons_total=lessons_total[course_id], **row)
+                for (user_id, course_id), row in rows.items()
+            ])
+            written += len(rows)
+
+# Create a global instance
+progress_projection = ProgressProjection()
@@ -0,0 +1,60 @@
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Security, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.core.security import get_current_active_user
+from app.core.telegram import create_link_token
+from app.models.user import User
+from app.services.telegram_bot.service import update_dispatcher
+
+router = APIRouter()
+security = HTTPBearer()
+logger = logging.getLogger(__name__)
+
+LINK_TOKEN_TTL_SECONDS = 900
+
+@router.post("/webhook", include_in_schema=False)
+async def telegram_webhook(
+    request: Request,
+    secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token")
+):
+    """
+    Receive a bot update from Telegram
+
+    The update is queued and acknowledged right away; replies are sent by
+    the background workers. A full queue answers 503, so Telegram retries later.
+    """
+    if not settings.TELEGRAM_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Telegram webhook is disabled")
+    if not secret_token or not hmac.compare_digest(secret_token, settings.TELEGRAM_WEBHOOK_SECRET):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid secret token")
+
+    try:
+        update = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update must be a JSON object")
+    if not isinstance(update, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update must be a JSON object")
+
+    if not update_dispatcher.submit(update):
+        logger.warning("Telegram update queue is full, asking Telegram to retry")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Update queue is full")
+    return {"ok": True}
+
+@router.get("/link")
+async def telegram_link(
+    current_user: User = Depends(get_current_active_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """Deep link that connects the current account to the bot (valid for 15 minutes)"""
+    token = create_link_token(current_user.id, LINK_TOKEN_TTL_SECONDS)
+    return {
+        "token": token,
+        "url": f"https://t.me/{(settings.TELEGRAM_BOT_USERNAME or '').lstrip('@')}?start={token}",
+        "expires_in": LINK_TOKEN_TTL_SECONDS,
+        "linked": current_user.telegram_chat_id is not None
+    }
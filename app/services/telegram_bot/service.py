@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from tortoise.exceptions import IntegrityError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.telegram import verify_link_token
+from app.models.calendar import CalendarNote
+from app.models.course_content import CourseProgressSummary
+from app.models.user import User
+from app.services.telegram_service import telegram_service
+
+logger = logging.getLogger(__name__)
+
+# How many recent update_ids are remembered to drop Telegram's redeliveries
+RECENT_UPDATES = 10000
+
+START_LINKED = "✅ Аккаунт {name} привязан! Теперь уведомления будут приходить сюда.\n\n/today — события на сегодня\n/progress — прогресс по курсам"
+START_INVALID_LINK = "❌ Ссылка для привязки недействительна или устарела. Получите новую в профиле на сайте."
+START_UNKNOWN = "👋 Привет! Чтобы привязать аккаунт, откройте ссылку для Telegram из профиля на сайте."
+NOT_LINKED = "Аккаунт не привязан. Откройте ссылку для Telegram из профиля на сайте."
+TODAY_EMPTY = "📅 На сегодня событий нет."
+TODAY_HEADER = "📅 События на сегодня ({count}):"
+TODAY_LINE = "{time} — {title}"
+PROGRESS_EMPTY = "📚 Вы еще не начали ни одного курса."
+PROGRESS_HEADER = "📚 Ваш прогресс:"
+PROGRESS_LINE = "{title}: {percent}%"
+UNKNOWN_COMMAND = "Доступные команды:\n/today — события на сегодня\n/progress — прогресс по курсам"
+
+class UpdateDispatcher:
+    """
+    Processes webhook updates on a bounded queue with a fixed number of workers.
+
+    The webhook only enqueues (``submit``) and acknowledges; replies, DB reads
+    and Telegram calls happen here, at most ``workers`` at a time. Answers are
+    built from short-lived caches, so a burst of identical commands costs a
+    handful of queries instead of one per update.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.TELEGRAM_UPDATE_QUEUE_SIZE,
+        workers: int = settings.TELEGRAM_UPDATE_WORKERS,
+        cache_ttl: float = settings.TELEGRAM_BOT_CACHE_TTL_SECONDS
+    ):
+        self.queue_size = queue_size
+        self.worker_count = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._recent: Deque[int] = deque(maxlen=RECENT_UPDATES)
+        self._recent_set: Set[int] = set()
+        # chat id -> (user id, name), or None for chats without a linked account
+        self.chat_users = TTLCache(maxsize=50000, ttl=cache_ttl)
+        # user id -> rendered /progress answer
+        self.progress = TTLCache(maxsize=50000, ttl=cache_ttl)
+        # date -> rendered /today answer (calendar notes are shared by all users)
+        self.today = TTLCache(maxsize=4, ttl=cache_ttl)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"telegram-updates-{n}")
+            for n in range(self.worker_count)
+        ]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Finish queued updates (up to ``timeout`` seconds), then stop the workers"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %s unprocessed Telegram updates on shutdown", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Queue an update for processing.
+
+        Returns:
+            bool: False if the queue is full (the caller should make Telegram retry)
+        """
+        if not self.running:
+            return False
+        update_id = update.get("update_id")
+        if update_id in self._recent_set:
+            return True
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        if update_id is not None:
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_set.discard(self._recent[0])
+            self._recent.append(update_id)
+            self._recent_set.add(update_id)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self.handle(update)
+            except Exception:
+                logger.exception("Failed to process Telegram update %s", update.get("update_id"))
+            finally:
+                self._queue.task_done()
+
+    async def handle(self, update: Dict[str, Any]) -> None:
+        message = update.get("message") or {}
+        text = (message.get("text") or "").strip()
+        chat = message.get("chat") or {}
+        if not text.startswith("/") or chat.get("type") != "private":
+            return
+        chat_id = chat["id"]
+        command, _, argument = text.partition(" ")
+        # "/today@my_bot" in group-style syntax
+        command = command.split("@", 1)[0].lower()
+
+        if command == "/start":
+            reply = await self.handle_start(chat_id, (message.get("from") or {}).get("username"), argument.strip())
+        elif command == "/today":
+            reply = await self.handle_today(chat_id)
+        elif command == "/progress":
+            reply = await self.handle_progress(chat_id)
+        else:
+            reply = UNKNOWN_COMMAND
+        await telegram_service.send_message(str(chat_id), reply, chat_id=chat_id)
+
+    async def handle_start(self, chat_id: int, username: Optional[str], token: str) -> str:
+        """/start <token> links the account from a profile link; plain /start resolves a registered @username"""
+        if token:
+            user_id = verify_link_token(token)
+            user = await User.get_or_none(id=user_id) if user_id else None
+            # Deactivated accounts cannot be linked (linked_user() ignores them as well)
+            if not user or not user.is_active:
+                return START_INVALID_LINK
+            user.telegram_chat_id = chat_id
+            update_fields = ["telegram_chat_id", "updated_at"]
+            if not user.telegram_id:
+                user.telegram_id = f"@{username}" if username else str(chat_id)
+                update_fields.append("telegram_id")
+            try:
+                await user.save(update_fields=update_fields)
+            except IntegrityError:
+                # The Telegram ID belongs to another account; link the chat only
+                await User.filter(id=user.id).update(telegram_chat_id=chat_id)
+            if username:
+                await telegram_service.remember_chat_id(f"@{username}", chat_id)
+            self.chat_users.invalidate(chat_id)
+            return START_LINKED.format(name=user.name or user.email)
+
+        if username and await telegram_service.remember_chat_id(f"@{username}", chat_id):
+            self.chat_users.invalidate(chat_id)
+            user = await self.linked_user(chat_id)
+            if user:
+                return START_LINKED.format(name=user[1])
+        return START_UNKNOWN
+
+    async def linked_user(self, chat_id: int) -> Optional[tuple]:
+        async def load():
+            row = await User.filter(telegram_chat_id=chat_id, is_active=True).first().values("id", "name", "email")
+            return (row["id"], row["name"] or row["email"]) if row else None
+        return await self.chat_users.get_or_load(chat_id, load)
+
+    async def handle_today(self, chat_id: int) -> str:
+        if not await self.linked_user(chat_id):
+            return NOT_LINKED
+        today = datetime.now().date()
+
+        async def load():
+            notes = await CalendarNote.filter(
+                date__gte=datetime.combine(today, datetime.min.time()),
+                date__lte=datetime.combine(today, datetime.max.time())
+            ).order_by('date').values("title", "date")
+            if not notes:
+                return TODAY_EMPTY
+            lines = [TODAY_HEADER.format(count=len(notes))]
+            lines.extend(TODAY_LINE.format(time=n["date"].strftime("%H:%M"), title=n["title"]) for n in notes[:20])
+            return "\n".join(lines)
+
+        return await self.today.get_or_load(today, load)
+
+    async def handle_progress(self, chat_id: int) -> str:
+        user = await self.linked_user(chat_id)
+        if not user:
+            return NOT_LINKED
+        user_id = user[0]
+
+        async def load():
+            rows = await CourseProgressSummary.filter(user_id=user_id).order_by("-updated_at").limit(20).values(
+                "percent", title="course__title"
+            )
+            if not rows:
+                return PROGRESS_EMPTY
+            lines = [PROGRESS_HEADER]
+            lines.extend(PROGRESS_LINE.format(title=r["title"], percent=round(r["percent"])) for r in rows)
+            return "\n".join(lines)
+
+        return await self.progress.get_or_load(user_id, load)
+
+    def forget_user(self, key: Optional[str]) -> None:
+        """Drop the cached chat link and /progress answer of a changed user (``None``: of everyone)"""
+        if key is None:
+            self.chat_users.clear()
+            self.progress.clear()
+            return
+        user_id = int(key)
+        self.chat_users.evict(lambda chat_id, user: user is not None and user[0] == user_id)
+        self.progress.invalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers),
+            "chat_users": self.chat_users.stats(),
+            "progress": self.progress.stats(),
+            "today": self.today.stats(),
+        }
+
+# Create a global instance
+update_dispatcher = UpdateDispatcher()
+invalidation_bus.subscribe("user", update_dispatcher.forget_user)
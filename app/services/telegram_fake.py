@@ -0,0 +1,170 @@
+"""
+In-process stand-in for the Telegram Bot API.
+
+``FakeTelegramRequest`` plugs into ``telegram.Bot`` as its request backend,
+so the real serialization and error handling of python-telegram-bot run
+while nothing leaves the process. It simulates network latency, the bot-wide
+flood limit (429 with ``retry_after``), users who blocked the bot (403) and
+random server failures, and records every delivered message.
+
+Example:
+    fake = FakeTelegramRequest(latency=0.05, rate_limit=30)
+    service = TelegramService(bot=fake_bot(fake))
+    await service.send_message("123", "hello")
+    print(fake.stats())
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from telegram import Bot
+from telegram._utils.defaultvalue import DEFAULT_NONE
+from telegram.request import BaseRequest, RequestData
+
+FAKE_BOT_TOKEN = "123456:FAKE-TOKEN-FOR-LOCAL-TESTS"
+
+@dataclass
+class DeliveredMessage:
+    chat_id: int
+    text: str
+    received_at: float  # time.perf_counter() when the fake API accepted the call
+
+class FakeTelegramRequest(BaseRequest):
+    """
+    Bot API backend answering from memory.
+
+    Args:
+        latency: Seconds every call takes (network + Telegram processing)
+        jitter: Up to this many seconds are added at random to each call
+        rate_limit: Messages per second accepted bot-wide; above it calls get 429
+        retry_after: Seconds reported in the 429 response
+        failure_rate: Share of calls answered with 500 (raised as NetworkError)
+        blocked_chat_ids: Chats answering 403 (the user blocked the bot)
+        seed: Seed for jitter and failures, for repeatable runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        rate_limit: Optional[float] = 30.0,
+        retry_after: int = 1,
+        failure_rate: float = 0.0,
+        blocked_chat_ids: Iterable[int] = (),
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.failure_rate = failure_rate
+        self.blocked_chat_ids = set(blocked_chat_ids)
+        self._random = random.Random(seed)
+        self._accepted: Deque[float] = deque()  # acceptance times within the last second
+        self.delivered: List[DeliveredMessage] = []
+        self.by_chat: Dict[int, List[DeliveredMessage]] = defaultdict(list)
+        self.responses: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def reset(self) -> None:
+        self._accepted.clear()
+        self.delivered.clear()
+        self.by_chat.clear()
+        self.responses.clear()
+        self.max_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delivered": len(self.delivered),
+            "responses": dict(self.responses),
+            "max_in_flight": self.max_in_flight,
+        }
+
+    def _over_rate_limit(self, now: float) -> bool:
+        if not self.rate_limit:
+            return False
+        while self._accepted and now - self._accepted[0] >= 1.0:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.rate_limit:
+            return True
+        self._accepted.append(now)
+        return False
+
+    @staticmethod
+    def _reply(code: int, body: Dict[str, Any]) -> Tuple[int, bytes]:
+        return code, json.dumps(body).encode()
+
+    def _error(self, code: int, description: str, **parameters: Any) -> Tuple[int, bytes]:
+        self.responses[code] += 1
+        body: Dict[str, Any] = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return self._reply(code, body)
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=DEFAULT_NONE,
+        write_timeout=DEFAULT_NONE,
+        connect_timeout=DEFAULT_NONE,
+        pool_timeout=DEFAULT_NONE,
+    ) -> Tuple[int, bytes]:
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        finally:
+            self.in_flight -= 1
+
+        if endpoint == "getMe":
+            self.responses[200] += 1
+            return self._reply(200, {"ok": True, "result": {
+                "id": 123456, "is_bot": True, "first_name": "Fake bot", "username": "fake_bot"
+            }})
+        if endpoint != "sendMessage":
+            return self._error(404, f"Not Found: method {endpoint} is not simulated")
+
+        chat_id = int(params["chat_id"])
+        now = time.perf_counter()
+        if self._over_rate_limit(now):
+            return self._error(429, f"Too Many Requests: retry after {self.retry_after}", retry_after=self.retry_after)
+        if chat_id in self.blocked_chat_ids:
+            return self._error(403, "Forbidden: bot was blocked by the user")
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return self._error(500, "Internal Server Error")
+
+        message = DeliveredMessage(chat_id=chat_id, text=params.get("text", ""), received_at=now)
+        self.delivered.append(message)
+        self.by_chat[chat_id].append(message)
+        self.responses[200] += 1
+        return self._reply(200, {"ok": True, "result": {
+            "message_id": len(self.delivered),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text", ""),
+        }})
+
+def fake_bot(request: Optional[FakeTelegramRequest] = None) -> Bot:
+    """telegram.Bot whose API calls are answered by a FakeTelegramRequest"""
+    request = request or FakeTelegramRequest()
+    return Bot(token=FAKE_BOT_TOKEN, request=request, get_updates_request=FakeTelegramRequest(latency=0))
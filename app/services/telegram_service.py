@@ -1,191 +1,375 @@
 import asyncio
+import importlib.util
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, Optional
+import httpx
 from telegram import Bot
 from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
+from tortoise.expressions import Q
 from app.core.config import settings
+from app.core.telegram import parse_telegram_id
+from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# Calendar notification templates, built once: (with description, without description)
+_NOTIFICATION_CONFIGS = {
+    "created": {"emoji": "📅", "action": "создана", "color": "✅", "footer": "✨ Новая заметка успешно добавлена в ваш календарь!"},
+    "updated": {"emoji": "✏️", "action": "обновлена", "color": "🔄", "footer": None},
+    "deleted": {"emoji": "🗑️", "action": "удалена", "color": "❌", "footer": None},
+    "reminder": {"emoji": "⏰", "action": "напоминание", "color": "🔔", "footer": "⏰ Не забудьте про это событие!"},
+    "upcoming": {"emoji": "⏰", "action": "скоро начнется", "color": "🔔", "footer": "🎯 Событие скоро начнется!"}
+}
+
+def _calendar_templates(config: Dict[str, Optional[str]]) -> tuple[str, str]:
+    header = f"{config['color']} {config['emoji']} Заметка календаря {config['action']}!\n\n📋 **{{title}}**\n📆 {{date}}"
+    footer = f"\n\n{config['footer']}" if config["footer"] else ""
+    return header + "\n\n📝 {description}" + footer, header + footer
+
+NOTIFICATION_TEMPLATES = {kind: _calendar_templates(config) for kind, config in _NOTIFICATION_CONFIGS.items()}
+# Unknown types get the "created" header without its footer
+_FALLBACK_TEMPLATES = _calendar_templates({**_NOTIFICATION_CONFIGS["created"], "footer": None})
+
+DAILY_REMINDER_EMPTY = "🌅 Доброе утро!\n\nУ вас нет запланированных событий на сегодня. Хорошего дня! 😊"
+DAILY_REMINDER_HEADER = "🌅 Доброе утро!\n\n📅 У вас {count} событий на сегодня:\n"
+DAILY_REMINDER_LINE = "{index}. {title} - {time}"
+DAILY_REMINDER_MORE = "... и еще {count} событий"
+DAILY_REMINDER_FOOTER = "\n✨ Желаем продуктивного дня!"
+
+NOTE_REMINDER_TEMPLATE = """⏰ Напоминание!
+
+📋 **{title}**
+📆 {date}
+
+🔔 До события осталось {minutes} минут!
+Подготовьтесь заранее. 😊"""
+
+CERTIFICATE_TEMPLATE = """🎓 Поздравляем!
+
+Вы успешно завершили курс **{course}**.
+📜 Ваш сертификат: {url}"""
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+def build_bot(
+    token: Optional[str] = None,
+    base_url: Optional[str] = None,
+    pool_size: Optional[int] = None,
+    http_version: Optional[str] = None
+) -> Bot:
+    """
+    Create a Bot whose HTTP client is configured from Settings
+
+    One keep-alive connection pool (HTTP/2 when h2 is installed) is shared by
+    all sends, so bursts reuse warm connections instead of opening new TLS
+    sessions. Arguments override the corresponding settings.
+    """
+    pool_size = pool_size or settings.TELEGRAM_POOL_SIZE
+    if http_version is None:
+        http_version = "2" if settings.TELEGRAM_HTTP2 and HTTP2_AVAILABLE else "1.1"
+    request = HTTPXRequest(
+        connection_pool_size=pool_size,
+        connect_timeout=settings.TELEGRAM_CONNECT_TIMEOUT,
+        read_timeout=settings.TELEGRAM_READ_TIMEOUT,
+        write_timeout=settings.TELEGRAM_WRITE_TIMEOUT,
+        pool_timeout=settings.TELEGRAM_POOL_TIMEOUT,
+        http_version=http_version,
+        httpx_kwargs={"limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=settings.TELEGRAM_KEEPALIVE_EXPIRY
+        )}
+    )
+    return Bot(
+        token=token or settings.TELEGRAM_BOT_TOKEN,
+        base_url=base_url or settings.TELEGRAM_API_BASE_URL,
+        request=request
+    )
+
+class UnresolvedChatError(TelegramError):
+    """The recipient is known only by @username, which bots cannot message until the user writes to the bot"""
+
 class TelegramService:
-    def __init__(self):
-        """Initialize Telegram service with bot token"""
-        self.bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-        
-    async def send_message(self, telegram_id: str, message: str) -> bool:
+    def __init__(self, bot: Optional[Bot] = None):
+        """
+        Initialize Telegram service with bot token
+
+        Args:
+            bot: Bot to send through instead of one built from TELEGRAM_BOT_TOKEN
+                 (e.g. app.services.telegram_fake.fake_bot() for local runs)
+        """
+        self.bot = bot or build_bot()
+        # username (lower-case, without @) -> numeric chat id, learned from updates or users.telegram_chat_id
+        self._chat_ids: OrderedDict[str, int] = OrderedDict()
+        self._chat_id_cache_size = settings.TELEGRAM_CHAT_ID_CACHE_SIZE
+
+    async def start(self) -> None:
+        """
+        Open the bot's HTTP connection pool and check the token (called from the app lifespan)
+
+        A failure is logged, not raised: the API keeps working without Telegram.
+        """
+        try:
+            await self.bot.initialize()
+            logger.info("Telegram bot @%s ready", self.bot.username)
+        except Exception as e:
+            logger.error(f"Telegram bot initialization failed: {e}")
+
+    async def stop(self) -> None:
+        """Close the bot's HTTP connections (called from the app lifespan)"""
+        try:
+            await self.bot.shutdown()
+        except Exception as e:
+            logger.error(f"Telegram bot shutdown failed: {e}")
+
+    def resolve_chat_id(self, telegram_id: str, chat_id: Optional[int] = None) -> Optional[int]:
+        """
+        Convert a stored Telegram ID into a numeric chat_id for the Bot API
+
+        Args:
+            telegram_id: User's Telegram ID (username with @ or numeric ID)
+            chat_id: Already known chat id (users.telegram_chat_id), remembered for the username
+
+        Returns:
+            int chat id, or None for a username that has not been resolved yet
+        """
+        numeric_id, username = parse_telegram_id(telegram_id)
+        if numeric_id is not None:
+            return numeric_id
+        if chat_id is not None:
+            self._cache_chat_id(username, chat_id)
+            return chat_id
+        resolved = self._chat_ids.get(username)
+        if resolved is not None:
+            self._chat_ids.move_to_end(username)
+        return resolved
+
+    def _cache_chat_id(self, username: str, chat_id: int) -> None:
+        self._chat_ids[username] = chat_id
+        self._chat_ids.move_to_end(username)
+        if len(self._chat_ids) > self._chat_id_cache_size:
+            self._chat_ids.popitem(last=False)
+
+    async def remember_chat_id(self, telegram_id: str, chat_id: int) -> int:
+        """
+        Store the numeric chat id of a user known by username (e.g. from a /start update)
+
+        Args:
+            telegram_id: Username with or without @
+            chat_id: Numeric chat id reported by Telegram
+
+        Returns:
+            int: Number of users updated
+        """
+        numeric_id, username = parse_telegram_id(telegram_id)
+        if username is None:
+            return await User.filter(telegram_id=telegram_id).update(telegram_chat_id=numeric_id)
+        self._cache_chat_id(username, chat_id)
+        return await User.filter(
+            Q(telegram_id__iexact=username) | Q(telegram_id__iexact=f"@{username}")
+        ).update(telegram_chat_id=chat_id)
+
+    async def deliver(self, telegram_id: str, message: str, chat_id: Optional[int] = None) -> None:
+        """
+        Send a message and let Telegram errors propagate
+
+        Used by callers that handle flood control (RetryAfter) or blocked
+        users themselves, e.g. broadcasts.
+
+        Raises:
+            UnresolvedChatError: If the username has no known chat id (no request is made)
+            TelegramError: If the Bot API rejects the message
+        """
+        resolved = self.resolve_chat_id(telegram_id, chat_id)
+        if resolved is None:
+            raise UnresolvedChatError(f"No chat id known for {telegram_id}")
+        await self.bot.send_message(chat_id=resolved, text=message)
+
+    async def send_message(self, telegram_id: str, message: str, chat_id: Optional[int] = None) -> bool:
         """
         Send a generic message to a Telegram user
-        
+
         Args:
             telegram_id: User's Telegram ID (username with @ or numeric ID)
             message: Message text to send
-            
+            chat_id: Known numeric chat id of the user, if any
+
         Returns:
             bool: True if message was sent successfully, False otherwise
         """
         try:
-            # Remove @ symbol if present
-            clean_id = telegram_id.lstrip('@')
-            
-            # Try to convert to int if it's numeric, otherwise use as username
-            try:
-                chat_id = int(clean_id)
-            except ValueError:
-                chat_id = f"@{clean_id}"
-            
-            await self.bot.send_message(chat_id=chat_id, text=message)
-            logger.info(f"Message sent successfully to {telegram_id}")
+            await self.deliver(telegram_id, message, chat_id)
+            logger.info("Message sent successfully to %s", telegram_id)
             return True
-            
+
+        except UnresolvedChatError:
+            logger.info("Skipping message to %s: user has not started the bot yet", telegram_id)
+            return False
         except TelegramError as e:
             logger.error(f"Failed to send message to {telegram_id}: {e}")
             return False
         except Exception as e:
             logger.error(f"Unexpected error sending message to {telegram_id}: {e}")
             return False
-    
-    async def send_calendar_notification(
-        self, 
-        telegram_id: str, 
-        note_title: str, 
-        note_date: str, 
+
+    @staticmethod
+    def render_calendar_notification(
+        note_title: str,
+        note_date: str,
         note_description: Optional[str] = None,
         notification_type: str = "created"
+    ) -> str:
+        """Format a calendar notification from the precompiled templates"""
+        with_description, without_description = NOTIFICATION_TEMPLATES.get(notification_type, _FALLBACK_TEMPLATES)
+        if note_description:
+            return with_description.format(title=note_title, date=note_date, description=note_description)
+        return without_description.format(title=note_title, date=note_date)
+
+    @staticmethod
+    def render_daily_reminder(notes_count: int, upcoming_notes: list) -> str:
+        """Format the daily reminder (at most 5 notes are listed)"""
+        if notes_count == 0:
+            return DAILY_REMINDER_EMPTY
+        lines = [DAILY_REMINDER_HEADER.format(count=notes_count)]
+        for i, note in enumerate(upcoming_notes[:5], 1):  # Show max 5 notes
+            lines.append(DAILY_REMINDER_LINE.format(index=i, title=note['title'], time=note.get('time', 'Время не указано')))
+        if len(upcoming_notes) > 5:
+            lines.append(DAILY_REMINDER_MORE.format(count=len(upcoming_notes) - 5))
+        lines.append(DAILY_REMINDER_FOOTER)
+        return "\n".join(lines)
+
+    async def send_calendar_notification(
+        self,
+        telegram_id: str,
+        note_title: str,
+        note_date: str,
+        note_description: Optional[str] = None,
+        notification_type: str = "created",
+        chat_id: Optional[int] = None
     ) -> bool:
         """
         Send a calendar note notification
-        
+
         Args:
             telegram_id: User's Telegram ID
             note_title: Title of the calendar note
             note_date: Date/time of the note
             note_description: Optional description
             notification_type: Type of notification (created, updated, deleted, reminder)
-            
+            chat_id: Known numeric chat id of the user, if any
+
         Returns:
             bool: True if notification was sent successfully
         """
         try:
-            # Determine emoji and action text based on notification type
-            notification_configs = {
-                "created": {"emoji": "📅", "action": "создана", "color": "✅"},
-                "updated": {"emoji": "✏️", "action": "обновлена", "color": "🔄"},
-                "deleted": {"emoji": "🗑️", "action": "удалена", "color": "❌"},
-                "reminder": {"emoji": "⏰", "action": "напоминание", "color": "🔔"},
-                "upcoming": {"emoji": "⏰", "action": "скоро начнется", "color": "🔔"}
-            }
-            
-            config = notification_configs.get(notification_type, notification_configs["created"])
-            
-            # Create formatted message
-            message_parts = [
-                f"{config['color']} {config['emoji']} Заметка календаря {config['action']}!",
-                "",
-                f"📋 **{note_title}**",
-                f"📆 {note_date}"
-            ]
-            
-            if note_description:
-                message_parts.extend([
-                    "",
-                    f"📝 {note_description}"
-                ])
-            
-            # Add footer based on notification type
-            if notification_type == "reminder":
-                message_parts.extend([
-                    "",
-                    "⏰ Не забудьте про это событие!"
-                ])
-            elif notification_type == "upcoming":
-                message_parts.extend([
-                    "",
-                    "🎯 Событие скоро начнется!"
-                ])
-            elif notification_type == "created":
-                message_parts.extend([
-                    "",
-                    "✨ Новая заметка успешно добавлена в ваш календарь!"
-                ])
-            
-            message = "\n".join(message_parts)
-            
-            return await self.send_message(telegram_id, message)
-            
+            # Unresolved usernames cannot receive messages, skip before rendering
+            if self.resolve_chat_id(telegram_id, chat_id) is None:
+                logger.info("Skipping calendar notification to %s: no chat id", telegram_id)
+                return False
+
+            message = self.render_calendar_notification(note_title, note_date, note_description, notification_type)
+            return await self.send_message(telegram_id, message, chat_id)
+
         except Exception as e:
             logger.error(f"Failed to send calendar notification to {telegram_id}: {e}")
             return False
-    
-    async def send_daily_reminder(self, telegram_id: str, notes_count: int, upcoming_notes: list) -> bool:
+
+    async def send_daily_reminder(
+        self,
+        telegram_id: str,
+        notes_count: int,
+        upcoming_notes: list,
+        chat_id: Optional[int] = None
+    ) -> bool:
         """
         Send daily reminder with upcoming notes
-        
+
         Args:
             telegram_id: User's Telegram ID
             notes_count: Number of notes for today
             upcoming_notes: List of upcoming notes
-            
+            chat_id: Known numeric chat id of the user, if any
+
         Returns:
             bool: True if reminder was sent successfully
         """
         try:
-            if notes_count == 0:
-                message = "🌅 Доброе утро!\n\nУ вас нет запланированных событий на сегодня. Хорошего дня! 😊"
-            else:
-                message_parts = [
-                    "🌅 Доброе утро!",
-                    "",
-                    f"📅 У вас {notes_count} событий на сегодня:",
-                    ""
-                ]
-                
-                for i, note in enumerate(upcoming_notes[:5], 1):  # Show max 5 notes
-                    time_str = note.get('time', 'Время не указано')
-                    message_parts.append(f"{i}. {note['title']} - {time_str}")
-                
-                if len(upcoming_notes) > 5:
-                    message_parts.append(f"... и еще {len(upcoming_notes) - 5} событий")
-                
-                message_parts.extend([
-                    "",
-                    "✨ Желаем продуктивного дня!"
-                ])
-                
-                message = "\n".join(message_parts)
-            
-            return await self.send_message(telegram_id, message)
-            
+            if self.resolve_chat_id(telegram_id, chat_id) is None:
+                logger.info("Skipping daily reminder to %s: no chat id", telegram_id)
+                return False
+
+            message = self.render_daily_reminder(notes_count, upcoming_notes)
+            return await self.send_message(telegram_id, message, chat_id)
+
         except Exception as e:
             logger.error(f"Failed to send daily reminder to {telegram_id}: {e}")
             return False
-    
-    async def send_note_reminder(self, telegram_id: str, note_title: str, note_date: str, minutes_before: int = 30) -> bool:
+
+    async def send_note_reminder(
+        self,
+        telegram_id: str,
+        note_title: str,
+        note_date: str,
+        minutes_before: int = 30,
+        chat_id: Optional[int] = None
+    ) -> bool:
         """
         Send reminder before note time
-        
+
         Args:
             telegram_id: User's Telegram ID
             note_title: Title of the note
             note_date: Date/time of the note
             minutes_before: Minutes before the event
-            
+            chat_id: Known numeric chat id of the user, if any
+
         Returns:
             bool: True if reminder was sent successfully
         """
         try:
-            message = f"""⏰ Напоминание!
+            if self.resolve_chat_id(telegram_id, chat_id) is None:
+                logger.info("Skipping note reminder to %s: no chat id", telegram_id)
+                return False
 
-📋 **{note_title}**
-📆 {note_date}
+            message = NOTE_REMINDER_TEMPLATE.format(title=note_title, date=note_date, minutes=minutes_before)
+            return await self.send_message(telegram_id, message, chat_id)
 
-🔔 До события осталось {minutes_before} минут!
-Подготовьтесь заранее. 😊"""
-            
-            return await self.send_message(telegram_id, message)
-            
         except Exception as e:
             logger.error(f"Failed to send note reminder to {telegram_id}: {e}")
             return False
 
+    async def send_certificate_notification(
+        self,
+        telegram_id: str,
+        course_title: str,
+        certificate_url: str,
+        chat_id: Optional[int] = None
+    ) -> bool:
+        """
+        Send a notification about an issued course certificate
+
+        Args:
+            telegram_id: User's Telegram ID
+            course_title: Title of the completed course
+            certificate_url: Link to the certificate
+            chat_id: Known numeric chat id of the user, if any
+
+        Returns:
+            bool: True if notification was sent successfully
+        """
+        try:
+            if self.resolve_chat_id(telegram_id, chat_id) is None:
+                logger.info("Skipping certificate notification to %s: no chat id", telegram_id)
+                return False
+
+            message = CERTIFICATE_TEMPLATE.format(course=course_title, url=certificate_url)
+            return await self.send_message(telegram_id, message, chat_id)
+
+        except Exception as e:
+            logger.error(f"Failed to send certificate notification to {telegram_id}: {e}")
+            return False
+
 # Create a global instance
-telegram_service = TelegramService() 
\ No newline at end of file
+telegram_service = TelegramService()
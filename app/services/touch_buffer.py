@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.course import UserCourse
+from app.models.course_content import CourseProgressSummary, UserProgress
+
+logger = logging.getLogger(__name__)
+
+TOUCHES = registry.counter(
+    "touch_buffer_touches_total",
+    "Course access touches by result (buffered, coalesced, dropped)",
+    ["result"]
+)
+TOUCH_BUFFER_PENDING = registry.gauge(
+    "touch_buffer_pending",
+    "(user, course) pairs waiting to be written"
+)
+TOUCH_FLUSH_SECONDS = registry.histogram(
+    "touch_buffer_flush_seconds",
+    "Time to write one batch of touches"
+)
+TOUCH_DELAY_SECONDS = registry.histogram(
+    "touch_buffer_delay_seconds",
+    "Age of the oldest touch of a batch when it was written"
+)
+TOUCH_FLUSHED = registry.counter(
+    "touch_buffer_flushed_total",
+    "Touches written, by outcome (ok, failed)",
+    ["result"]
+)
+
+# Columns bumped by a touch; rows are only moved forward in time
+TOUCHED_COLUMNS = (
+    (UserCourse._meta.db_table, "last_accessed_at"),
+    (UserProgress._meta.db_table, "updated_at"),
+    (CourseProgressSummary._meta.db_table, "updated_at"),
+)
+
+# Rows per UPDATE (3 parameters each; asyncpg allows 32767)
+FLUSH_BATCH_SIZE = 1000
+
+Key = Tuple[int, UUID]
+
+class TouchBuffer:
+    """
+    Write-behind buffer for "user X opened course Y at T".
+
+    Reading course content only records the access in memory; repeated
+    touches of one (user, course) pair collapse into the latest one. Every
+    ``interval`` seconds (and on shutdown) the batch is written with one
+    ``UPDATE ... FROM (VALUES ...)`` per table on PostgreSQL, moving
+    ``UserCourse.last_accessed_at``, ``UserProgress.updated_at`` and the
+    progress summary forward. At most ``max_entries`` pairs are held;
+    beyond that new pairs are dropped (and counted) until the next flush.
+    Only existing rows are touched, nothing is enrolled. Cached user course
+    lists are not evicted by a flush: their order and ``lastAccessedAt``
+    catch up with the touches when the cache entry expires.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.TOUCH_FLUSH_INTERVAL_SECONDS,
+        max_entries: int = settings.TOUCH_BUFFER_MAX_ENTRIES
+    ):
+        self.interval = interval
+        self.max_entries = max_entries
+        self._pending: Dict[Key, datetime] = {}
+        self._oldest: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, user_id: int, course_id: UUID, at: Optional[datetime] = None) -> None:
+        """Record an access; written at the next flush"""
+        at = at or datetime.now(timezone.utc)
+        key = (user_id, course_id)
+        previous = self._pending.get(key)
+        if previous is not None:
+            TOUCHES.inc(result="coalesced")
+            if at > previous:
+                self._pending[key] = at
+            return
+        if len(self._pending) >= self.max_entries:
+            TOUCHES.inc(result="dropped")
+            if self._wake is not None:
+                self._wake.set()
+            return
+        if not self._pending:
+            self._oldest = time.monotonic()
+        self._pending[key] = at
+        TOUCHES.inc(result="buffered")
+        TOUCH_BUFFER_PENDING.set(len(self._pending))
+
+    def start(self) -> None:
+        """Start the periodic flush (called from the app lifespan)"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop(), name="touch-buffer")
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write what is left"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = self._wake = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write the buffered touches now. A failed batch is put back to be
+        retried with the next flush (as far as the buffer has room).
+
+        Returns:
+            int: Number of (user, course) pairs written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            oldest, self._oldest = self._oldest, None
+            TOUCH_BUFFER_PENDING.set(0)
+
+            started = time.monotonic()
+            try:
+                await self._write(list(pending.items()))
+            except asyncio.CancelledError:
+                # Stopped mid-write; stop() flushes again
+                self._restore(pending, oldest)
+                raise
+            except Exception as e:
+                logger.error("Failed to write %s course access touches: %s", len(pending), e)
+                TOUCH_FLUSHED.inc(len(pending), result="failed")
+                self._restore(pending, oldest)
+                return 0
+            finished = time.monotonic()
+            TOUCH_FLUSH_SECONDS.observe(finished - started)
+            if oldest is not None:
+                TOUCH_DELAY_SECONDS.observe(finished - oldest)
+            TOUCH_FLUSHED.inc(len(pending), result="ok")
+            return len(pending)
+
+    def _restore(self, pending: Dict[Key, datetime], oldest: Optional[float]) -> None:
+        for key, at in pending.items():
+            current = self._pending.get(key)
+            if current is not None:
+                self._pending[key] = max(current, at)
+            elif len(self._pending) < self.max_entries:
+                self._pending[key] = at
+        if self._pending:
+            self._oldest = min(filter(None, (oldest, self._oldest)), default=time.monotonic())
+        TOUCH_BUFFER_PENDING.set(len(self._pending))
+
+    async def _write(self, touches: List[Tuple[Key, datetime]]) -> None:
+        if Tortoise.get_connection("default").capabilities.dialect != "postgres":
+            await self._write_rows(touches)
+            return
+        async with in_transaction() as connection:
+            for start in range(0, len(touches), FLUSH_BATCH_SIZE):
+                batch = touches[start:start + FLUSH_BATCH_SIZE]
+                rows = ", ".join(
+                    f"(${n * 3 + 1}::int, ${n * 3 + 2}::uuid, ${n * 3 + 3}::timestamptz)" for n in range(len(batch))
+                )
+                values = [value for (user_id, course_id), at in batch for value in (user_id, course_id, at)]
+                for table, column in TOUCHED_COLUMNS:
+                    await connection.execute_query(
+                        f'UPDATE "{table}" AS t SET "{column}" = v.at '
+                        f"FROM (VALUES {rows}) AS v(user_id, course_id, at) "
+                        f'WHERE t.user_id = v.user_id AND t.course_id = v.course_id AND t."{column}" < v.at',
+                        values
+                    )
+
+    @staticmethod
+    async def _write_rows(touches: List[Tuple[Key, datetime]]) -> None:
+        # Other databases: one UPDATE per row and table
+        async with in_transaction() as connection:
+            for (user_id, course_id), at in touches:
+                await UserCourse.filter(user_id=user_id, course_id=course_id, last_accessed_at__lt=at).using_db(connection).update(last_accessed_at=at)
+                await UserProgress.filter(user_id=user_id, course_id=course_id, updated_at__lt=at).using_db(connection).update(updated_at=at)
+                await CourseProgressSummary.filter(user_id=user_id, course_id=course_id, updated_at__lt=at).using_db(connection).update(updated_at=at)
+
+# Create a global instance
+touch_buffer = TouchBuffer()
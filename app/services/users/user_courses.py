@@ -3,9 +3,11 @@ from typing import Optional
 import asyncio
 from datetime import datetime
 
+from app.core.identity_map import get_entity
+from app.core.invalidation import invalidation_bus
 from app.models.user import User
-from app.models.course import Course
-from app.models.user_course import UserCourse, Certificate, CourseStatus
+from app.models.course import CourseStatus
+from app.services.progress_service import progress_projection
 from app.schemas.user_course import (
     UserCoursesResponse, 
     UserCourseResponse, 
@@ -16,11 +18,19 @@ from app.schemas.user_course import (
 # Простое кэширование в памяти
 cache = {}
 
+def evict_user_courses(user_id: Optional[str]) -> None:
+    """Удалить из кэша списки курсов пользователя (всех пользователей при user_id=None)"""
+    prefix = "user_courses:" if user_id is None else f"user_courses:{user_id}:"
+    for key in [key for key in cache if key.startswith(prefix)]:
+        cache.pop(key, None)
+
+# Прогресс меняется в любом воркере (см. ProgressProjection)
+invalidation_bus.subscribe("user_courses", evict_user_courses)
+
 async def clear_cache_after(key: str, seconds: int):
     """Очистить запись в кэше через указанное количество секунд"""
     await asyncio.sleep(seconds)
-    if key in cache:
-        del cache[key]
+    cache.pop(key, None)
 
 async def get_user_courses_service(
     user_id: int,
@@ -51,8 +61,8 @@ async def get_user_courses_service(
             detail="Нет доступа к курсам другого пользователя"
         )
     
-    # Проверяем, существует ли пользователь
-    user = await User.get_or_none(id=user_id)
+    # Проверяем, существует ли пользователь (обычно уже загружен при авторизации)
+    user = await get_entity(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,54 +80,36 @@ async def get_user_courses_service(
     if response:
         response.headers["X-Cache"] = "MISS"
     
-    # Строим запрос
-    query = UserCourse.filter(user_id=user_id)
+    # Все курсы пользователя одним запросом к сводной таблице прогресса
+    # (уже отсортированы: сначала in_progress, затем по дате последнего доступа по убыванию)
+    summaries = await progress_projection.for_user(user_id)
     
     # Применяем фильтр статуса
+    selected = summaries
     if status and status != CourseFilterStatus.ALL:
-        query = query.filter(status=status.value)
-    
-    # Получаем общее количество до применения лимита и смещения
-    total_count = await query.count()
+        selected = [row for row in summaries if row["status"] == status.value]
     
-    # Получаем курсы пользователя с данными о курсе
-    user_courses = await query.prefetch_related('course').limit(limit).offset(offset).order_by(
-        # Сортировка: сначала in_progress, затем по дате последнего доступа по убыванию
-        "-status", "-last_accessed_at"
-    )
+    total_count = len(selected)
     
     # Формируем данные для ответа
-    courses_data = []
-    
-    for user_course in user_courses:
-        # У нас уже есть данные о курсе благодаря prefetch_related
-        course = user_course.course
-        
-        # Проверяем, есть ли сертификат
-        has_certificate = user_course.certificate_id is not None
-        
-        # Формируем данные о курсе
-        course_data = UserCourseResponse(
-            id=course.id,
-            title=course.title,
-            coverImage=course.cover_image or course.image_url or "",
-            status=user_course.status,
-            hasCertificate=has_certificate,
-            progress=user_course.progress,
-            lastAccessedAt=user_course.last_accessed_at
+    courses_data = [
+        UserCourseResponse(
+            id=row["course_id"],
+            title=row["title"],
+            coverImage=row["cover_image"] or row["image_url"] or "",
+            status=row["status"],
+            hasCertificate=row["has_certificate"],
+            progress=round(row["percent"]),
+            lastAccessedAt=row["updated_at"]
         )
-        
-        courses_data.append(course_data)
-    
-    # Получаем статистику пользователя
-    completed_courses = await UserCourse.filter(user_id=user_id, status=CourseStatus.COMPLETED).count()
-    active_courses = await UserCourse.filter(user_id=user_id, status=CourseStatus.IN_PROGRESS).count()
-    certificates = await Certificate.filter(user_course__user_id=user_id).count()
+        for row in selected[offset:offset + limit]
+    ]
     
+    # Статистика пользователя по тем же строкам
     user_stats = UserCoursesStats(
-        completedCourses=completed_courses,
-        activeCourses=active_courses,
-        certificates=certificates
+        completedCourses=sum(row["status"] == CourseStatus.COMPLETED for row in summaries),
+        activeCourses=sum(row["status"] == CourseStatus.IN_PROGRESS for row in summaries),
+        certificates=sum(row["has_certificate"] for row in summaries)
     )
     
     # Формируем итоговый ответ
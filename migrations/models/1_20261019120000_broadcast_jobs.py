@@ -0,0 +1,33 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "broadcast_jobs" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "message" TEXT NOT NULL,
+    "audience" VARCHAR(6) NOT NULL DEFAULT 'all',
+    "course_id" UUID,
+    "status" VARCHAR(9) NOT NULL DEFAULT 'pending',
+    "total_recipients" INT NOT NULL DEFAULT 0,
+    "sent_count" INT NOT NULL DEFAULT 0,
+    "failed_count" INT NOT NULL DEFAULT 0,
+    "last_user_id" INT NOT NULL DEFAULT 0,
+    "error" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "started_at" TIMESTAMPTZ,
+    "finished_at" TIMESTAMPTZ,
+    "heartbeat_at" TIMESTAMPTZ,
+    "created_by_id" INT REFERENCES "users" ("id") ON DELETE SET NULL
+);
+COMMENT ON COLUMN "broadcast_jobs"."audience" IS 'ALL: all\\nCOURSE: course\\nADMINS: admins';
+COMMENT ON COLUMN "broadcast_jobs"."status" IS 'PENDING: pending\\nRUNNING: running\\nCOMPLETED: completed\\nFAILED: failed\\nCANCELLED: cancelled';
+COMMENT ON COLUMN "broadcast_jobs"."last_user_id" IS 'Keyset cursor: every recipient with users.id <= last_user_id has been processed';
+COMMENT ON TABLE "broadcast_jobs" IS 'Telegram broadcast to a selected audience, processed in chunks and resumable';
+CREATE INDEX IF NOT EXISTS "idx_broadcast_j_status_6d0f3b" ON "broadcast_jobs" ("status");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "broadcast_jobs";"""
@@ -0,0 +1,12 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" ADD "telegram_chat_id" BIGINT;
+UPDATE "users" SET "telegram_chat_id" = CAST("telegram_id" AS BIGINT) WHERE "telegram_id" ~ '^[0-9]{1,18}$';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" DROP COLUMN "telegram_chat_id";"""
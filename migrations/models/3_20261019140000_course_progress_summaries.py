@@ -0,0 +1,29 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "course_progress_summaries" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "status" VARCHAR(11) NOT NULL DEFAULT 'in_progress',
+    "percent" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "lessons_done" INT NOT NULL DEFAULT 0,
+    "lessons_total" INT NOT NULL DEFAULT 0,
+    "practices_done" INT NOT NULL DEFAULT 0,
+    "completed_lessons" JSONB NOT NULL,
+    "completed_practices" JSONB NOT NULL,
+    "has_certificate" BOOL NOT NULL DEFAULT False,
+    "started_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "course_id" UUID NOT NULL REFERENCES "courses" ("id") ON DELETE CASCADE,
+    "last_lesson_id" UUID REFERENCES "lessons" ("id") ON DELETE SET NULL,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_course_prog_user_id_4971bb" UNIQUE ("user_id", "course_id")
+);
+COMMENT ON COLUMN "course_progress_summaries"."status" IS 'COMPLETED: completed\\nIN_PROGRESS: in_progress';
+COMMENT ON TABLE "course_progress_summaries" IS 'Read model of a user''s progress in a course, one row per (user, course).';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "course_progress_summaries";"""
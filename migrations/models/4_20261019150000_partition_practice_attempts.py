@@ -0,0 +1,70 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "user_practice_attempts" RENAME TO "user_practice_attempts_unpartitioned";
+CREATE TABLE "user_practice_attempts" (
+    "id" UUID NOT NULL,
+    "answer" TEXT NOT NULL,
+    "is_correct" BOOL NOT NULL,
+    "feedback" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "practice_id" UUID NOT NULL REFERENCES "content_blocks" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE,
+    PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+CREATE TABLE "user_practice_attempts_default" PARTITION OF "user_practice_attempts" DEFAULT;
+DO $$
+DECLARE
+    month TIMESTAMPTZ;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', COALESCE((SELECT MIN("created_at") FROM "user_practice_attempts_unpartitioned"), now()), 'UTC'),
+            date_trunc('month', now(), 'UTC') + interval '2 months',
+            interval '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF "user_practice_attempts" FOR VALUES FROM (%L) TO (%L)',
+            'user_practice_attempts_p' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END $$;
+INSERT INTO "user_practice_attempts" ("id", "answer", "is_correct", "feedback", "created_at", "practice_id", "user_id")
+    SELECT "id", "answer", "is_correct", "feedback", "created_at", "practice_id", "user_id" FROM "user_practice_attempts_unpartitioned";
+DROP TABLE "user_practice_attempts_unpartitioned";
+CREATE INDEX IF NOT EXISTS "idx_user_practi_user_id_5f023d" ON "user_practice_attempts" ("user_id", "practice_id", "created_at");
+CREATE TABLE IF NOT EXISTS "practice_attempt_summaries" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "attempts" INT NOT NULL DEFAULT 0,
+    "correct_attempts" INT NOT NULL DEFAULT 0,
+    "first_attempt_at" TIMESTAMPTZ,
+    "first_correct_at" TIMESTAMPTZ,
+    "last_attempt_at" TIMESTAMPTZ,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "practice_id" UUID NOT NULL REFERENCES "content_blocks" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_practice_at_user_id_2a2179" UNIQUE ("user_id", "practice_id")
+);
+COMMENT ON TABLE "practice_attempt_summaries" IS 'Attempts of a user at a practice that were rolled up and removed by the retention job';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "practice_attempt_summaries";
+ALTER TABLE "user_practice_attempts" RENAME TO "user_practice_attempts_partitioned";
+CREATE TABLE "user_practice_attempts" (
+    "id" UUID NOT NULL PRIMARY KEY,
+    "answer" TEXT NOT NULL,
+    "is_correct" BOOL NOT NULL,
+    "feedback" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "practice_id" UUID NOT NULL REFERENCES "content_blocks" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+);
+INSERT INTO "user_practice_attempts" SELECT "id", "answer", "is_correct", "feedback", "created_at", "practice_id", "user_id" FROM "user_practice_attempts_partitioned";
+DROP TABLE "user_practice_attempts_partitioned";"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "courses" ADD "content_version" INT NOT NULL DEFAULT 1;
+ALTER TABLE "content_blocks" ADD "position" BIGINT NOT NULL DEFAULT 0;
+UPDATE "content_blocks" AS b SET "position" = ordered."rank" * 1024
+    FROM (
+        SELECT "id", ROW_NUMBER() OVER (PARTITION BY "lesson_id" ORDER BY "created_at", "id") AS "rank"
+        FROM "content_blocks"
+    ) AS ordered
+    WHERE b."id" = ordered."id";
+CREATE INDEX IF NOT EXISTS "idx_content_blo_lesson__23b54f" ON "content_blocks" ("lesson_id", "position");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_content_blo_lesson__23b54f";
+ALTER TABLE "content_blocks" DROP COLUMN IF EXISTS "position";
+ALTER TABLE "courses" DROP COLUMN IF EXISTS "content_version";"""
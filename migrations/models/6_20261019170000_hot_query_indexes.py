@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_user_course_course__571787" ON "user_courses" ("course_id", "user_id");
+CREATE INDEX IF NOT EXISTS "idx_user_progre_course__dfbf2f" ON "user_progress" ("course_id", "user_id");
+CREATE INDEX IF NOT EXISTS "idx_course_prog_user_id_4898c1" ON "course_progress_summaries" ("user_id", "status", "updated_at");
+CREATE INDEX IF NOT EXISTS "idx_course_prog_course__8921b0" ON "course_progress_summaries" ("course_id", "percent");
+CREATE INDEX IF NOT EXISTS "idx_user_practi_practic_6f3689" ON "user_practice_attempts" ("practice_id", "user_id", "created_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_user_practi_practic_6f3689";
+DROP INDEX IF EXISTS "idx_course_prog_course__8921b0";
+DROP INDEX IF EXISTS "idx_course_prog_user_id_4898c1";
+DROP INDEX IF EXISTS "idx_user_progre_course__dfbf2f";
+DROP INDEX IF EXISTS "idx_user_course_course__571787";"""
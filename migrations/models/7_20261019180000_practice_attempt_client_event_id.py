@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "user_practice_attempts" ADD "client_event_id" VARCHAR(100);
+CREATE INDEX IF NOT EXISTS "idx_user_practi_user_id_4d7241" ON "user_practice_attempts" ("user_id", "client_event_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_user_practi_user_id_4d7241";
+ALTER TABLE "user_practice_attempts" DROP COLUMN "client_event_id";"""